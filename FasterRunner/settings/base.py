@@ -14,6 +14,7 @@ import os
 
 import datetime as datetime
 import djcelery
+from celery.schedules import crontab
 
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -228,6 +229,47 @@ CELERY_TASK_RESULT_EXPIRES = 7200
 CELERYD_CONCURRENCY = 1 if DEBUG else 5
 CELERYD_MAX_TASKS_PER_CHILD = 40
 
+CELERYBEAT_SCHEDULE = {
+    # 每天凌晨清理过期的访问记录
+    'purge_visits': {
+        'task': 'fastrunner.tasks.purge_visits',
+        'schedule': crontab(hour=2, minute=0),
+    },
+}
+
+# 访问记录缓冲: 每batch_size条或每flush_interval秒批量写入, 缓冲超过max_size时丢弃
+VISIT_BUFFER = {
+    'max_size': 10000,
+    'batch_size': 200,
+    'flush_interval': 5,
+}
+# 原始访问记录保留天数, 每日访问量在写入时已汇总到visit_daily
+VISIT_RETENTION_DAYS = 30
+
+# 报告记录数超过该值时, 查看报告只渲染概要, 请求/响应内容在展开时按需加载
+REPORT_LAZY_THRESHOLD = 200
+
+# 单次运行中同时执行的用例数, 1为顺序执行; 用例内的步骤始终按顺序执行
+RUNNER_CONCURRENCY = 1
+
+# 请求、定时任务或项目指定的并发数上限, 超出时按上限执行
+RUNNER_MAX_CONCURRENCY = 20
+
+# 进程内共享的HTTP连接池, 用例之间复用长连接并缓存DNS, 为None时每个用例单独建立连接
+# 例: {'pool_connections': 20, 'pool_maxsize': 20, 'dns_ttl': 60}
+RUNNER_HTTP_POOL = None
+
+# 单次运行在内存中保留的日志上限, 超出后丢弃最早的日志; 传入 log_file 时完整日志同时写入文件
+RUNNER_LOG_CAPTURE = {'max_records': 2000, 'max_bytes': 1024 * 1024}
+
+# 智能定时任务: 用例及其引用的API/配置/驱动代码/全局变量均未变更且上次成功时跳过,
+# 每条用例在该次数的调度中至少执行一次, 1为每次都执行
+SMART_SCHEDULE_FULL_RUN_INTERVAL = 10
+
+# mysql 下名称/URL搜索使用 FULLTEXT ngram 索引(建立时关闭停用词), 默认关闭使用 LIKE;
+# 开启后执行 python manage.py rebuild_search_index 建立索引
+SEARCH_MYSQL_FULLTEXT = False
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': True,
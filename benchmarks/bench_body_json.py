@@ -0,0 +1,148 @@
+"""
+主体信息 str(dict)+eval 与 JSON 字段的解析耗时对比
+
+    python benchmarks/bench_body_json.py --apis 100 --steps 300
+
+使用临时 sqlite 库写入样例数据, 分别统计
+    1. 接口列表: 100 条 API 主体信息解析 + Parse
+    2. 用例运行准备: 300 个步骤主体信息解析
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django
+from django.conf import settings
+
+
+def setup(db_path):
+    settings.configure(
+        SECRET_KEY='benchmark',
+        INSTALLED_APPS=[
+            'django.contrib.contenttypes',
+            'django.contrib.auth',
+            'fastuser',
+            'fastrunner',
+        ],
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': db_path}},
+        AUTH_USER_MODEL='fastuser.MyUser',
+        USE_TZ=False,
+    )
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def sample_body(index):
+    return {
+        "name": "api-{}".format(index),
+        "rig_id": None,
+        "times": 1,
+        "request": {
+            "url": "/api/v1/goods/{}/detail".format(index),
+            "method": "POST",
+            "verify": False,
+            "headers": {"Content-Type": "application/json", "token": "$token"},
+            "json": {"goodsCode": index, "page": 1, "size": 20, "tags": ["a", "b", "c"], "extra": None},
+        },
+        "desc": {
+            "header": {"Content-Type": "请求格式", "token": "用户登陆token"},
+            "data": {},
+            "files": {},
+            "params": {},
+            "variables": {"author": "作者", "goods": "商品"},
+            "extract": {"code": "业务码"},
+        },
+        "validate": [{"equals": ["status_code", 200]}, {"equals": ["content.code", 0]}],
+        "variables": [{"author": "tester"}, {"goods": index}],
+        "extract": [{"code": "content.code"}],
+        "setup_hooks": ["${get_sign($request)}"],
+        "teardown_hooks": [],
+    }
+
+
+def seed(apis, steps):
+    from fastrunner import models
+    project = models.Project.objects.create(name="benchmark", desc="benchmark", responsible="benchmark")
+    models.API.objects.bulk_create([
+        models.API(name="api-{}".format(i), body=sample_body(i), url="/api", method="POST",
+                   project=project, relation=1)
+        for i in range(apis)
+    ])
+    case = models.Case.objects.create(name="case", project=project, relation=1, length=steps)
+    models.CaseStep.objects.bulk_create([
+        models.CaseStep(name="step-{}".format(i), body=sample_body(i), url="/api", method="POST",
+                        case=case, step=i, source_api_id=i)
+        for i in range(steps)
+    ])
+    return case.id
+
+
+def timeit(func, repeat):
+    costs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        costs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(costs)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--apis', type=int, default=100)
+    arg_parser.add_argument('--steps', type=int, default=300)
+    arg_parser.add_argument('--repeat', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    db_dir = tempfile.mkdtemp()
+    setup(os.path.join(db_dir, 'benchmark.sqlite3'))
+
+    from django.db import connection
+    from fastrunner import models
+    from fastrunner.utils.parser import Parse
+
+    case_id = seed(args.apis, args.steps)
+
+    def raw_bodies(table, where=""):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT body FROM {} {}".format(table, where))
+            return [row[0] for row in cursor.fetchall()]
+
+    # 历史数据: 把JSON文本还原成 str(dict)
+    legacy_apis = [repr(models.API._meta.get_field('body').to_python(body)) for body in raw_bodies('api')]
+    legacy_steps = [repr(models.CaseStep._meta.get_field('body').to_python(body))
+                    for body in raw_bodies('case_step', "WHERE case_id = {}".format(case_id))]
+
+    def list_eval():
+        raw_bodies('api')
+        for body in legacy_apis:
+            Parse(eval(body)).parse_http()
+
+    def list_json():
+        for body in models.API.objects.values_list('body', flat=True):
+            Parse(body).parse_http()
+
+    def prepare_eval():
+        raw_bodies('case_step', "WHERE case_id = {}".format(case_id))
+        return [eval(body) for body in legacy_steps]
+
+    def prepare_json():
+        return list(models.CaseStep.objects.filter(case__id=case_id).order_by("step").values_list("body", flat=True))
+
+    results = [
+        ("list {} apis".format(args.apis), timeit(list_eval, args.repeat), timeit(list_json, args.repeat)),
+        ("prepare {} steps".format(args.steps), timeit(prepare_eval, args.repeat), timeit(prepare_json, args.repeat)),
+    ]
+
+    print("{:<20} {:>12} {:>12} {:>8}".format("case", "eval(ms)", "json(ms)", "speedup"))
+    for name, before, after in results:
+        print("{:<20} {:>12.2f} {:>12.2f} {:>7.1f}x".format(name, before, after, before / after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+提取/校验表达式: 每次重新解析 与 按表达式编译缓存 的耗时对比
+
+    python benchmarks/bench_extractors.py --steps 2000
+
+模拟 steps 个步骤, 每个步骤对同一响应执行一组常见的 extract/validate 表达式, 分别统计
+    1. delimiter: content.data.items.0.id 这类点号路径
+    2. jsonpath: $.data.items[0].id 这类仅由字段名和下标组成的简单 jsonpath
+    3. jsonpath(complex): $..id 这类需要 jsonpath 库求值的表达式
+    4. mixed: 以上表达式与 status_code/headers/正则 混合
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jsonpath
+import requests
+from loguru import logger
+
+from fastrunner.httprunner3 import response
+
+FIELDS = {
+    "delimiter": [
+        "content.code", "content.msg", "content.data.total", "content.data.items.0.id",
+        "content.data.items.0.user.name", "content.data.items.19.tags.1", "json.data.page.size"
+    ],
+    "jsonpath": [
+        "$.code", "$.msg", "$.data.total", "$.data.items[0].id",
+        "$.data.items[0].user.name", "$.data.items[19].tags[1]", "$.data.page.size"
+    ],
+    "jsonpath(complex)": [
+        "$..total", "$.data.items[*].id", "$..user.name"
+    ],
+    "mixed": [
+        "status_code", "headers.Content-Type", "content.code", "content.data.items.0.id",
+        "$.data.items[0].user.name", "$.data.page.size", "$..total", r'"msg": "(\w+)"'
+    ]
+}
+
+
+def make_response(items):
+    body = {
+        "code": 0,
+        "msg": "success",
+        "data": {
+            "total": items,
+            "page": {"index": 1, "size": items},
+            "items": [
+                {"id": i, "user": {"name": "user{}".format(i), "age": 20}, "tags": ["a", "b", "c"]}
+                for i in range(items)
+            ]
+        }
+    }
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.encoding = "utf-8"
+    resp.headers["Content-Type"] = "application/json"
+    resp._content = json.dumps(body).encode("utf-8")
+    return resp
+
+
+def legacy_extract_field(resp_obj, field):
+    """原实现: 每次提取都重新切分路径 / 调用 jsonpath 库 / 搜索正则, 并格式化完整响应体
+    """
+    if field.startswith("$"):
+        return jsonpath.jsonpath(resp_obj.json, field)
+    if response.text_extractor_regexp_compile.match(field):
+        return re.search(field, resp_obj.text).group(1)
+
+    try:
+        top_query, sub_query = field.split('.', 1)
+    except ValueError:
+        top_query, sub_query = field, None
+
+    if top_query == "status_code":
+        return resp_obj.status_code
+    if top_query == "headers":
+        return resp_obj.headers[sub_query]
+
+    json_content = resp_obj.json
+    "response body: {}\n".format(json_content)
+    for key in sub_query.split("."):
+        if isinstance(json_content, (list, str, bytes)):
+            json_content = json_content[int(key)]
+        else:
+            json_content = json_content[key]
+    return json_content
+
+
+def timeit(func, repeat):
+    costs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        costs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(costs)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--steps', type=int, default=2000)
+    arg_parser.add_argument('--items', type=int, default=20)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    resp_obj = response.ResponseObject(make_response(args.items))
+    for case, fields in FIELDS.items():
+        for field in fields:
+            legacy = legacy_extract_field(resp_obj, field)
+            compiled = resp_obj.extract_field(field)
+            assert legacy == compiled, (field, legacy, compiled)
+
+    print("{:<20} {:>12} {:>14} {:>10}".format("case", "legacy(ms)", "compiled(ms)", "speedup"))
+    for case, fields in FIELDS.items():
+        def legacy():
+            for _ in range(args.steps):
+                for field in fields:
+                    legacy_extract_field(resp_obj, field)
+
+        def compiled():
+            for _ in range(args.steps):
+                for field in fields:
+                    resp_obj.extract_field(field)
+
+        legacy_cost = timeit(legacy, args.repeat)
+        compiled_cost = timeit(compiled, args.repeat)
+        print("{:<20} {:>12.2f} {:>14.2f} {:>9.1f}x".format(
+            "{} x{}".format(case, len(fields)), legacy_cost, compiled_cost, legacy_cost / compiled_cost))
+
+
+if __name__ == '__main__':
+    main()
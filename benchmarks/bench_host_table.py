@@ -0,0 +1,88 @@
+"""
+批量运行API时的host替换: 逐条 parse_host 与 预编译 HostTable 的耗时对比
+
+    python benchmarks/bench_host_table.py --apis 300 3000 --lines 50
+
+构造 lines 行host配置、apis 条API (域名取自配置), 分别统计
+    1. legacy: 原 parse_host, 每条API遍历全部配置行并重新匹配 ip:port
+    2. host-table: 配置只解析一次, 同一域名只查找一次
+"""
+import argparse
+import copy
+import os
+import re
+import statistics
+import sys
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastrunner.utils.host import HostTable
+
+
+def legacy(ip, api):
+    """原 parse_host
+    """
+    parts = urlparse(api["request"]["url"])
+    host = parts.netloc
+    if host:
+        for content in ip:
+            content = content.strip()
+            if host in content and not content.startswith("#"):
+                ip = re.findall(r'\b(?:25[0-5]\.|2[0-4]\d\.|[01]?\d\d?\.){3}(?:25[0-5]|2[0-4]\d|[01]?\d\d?)\b:\d{0,5}',
+                                content)
+                if ip:
+                    api["request"].setdefault("headers", {})["Host"] = host
+                    api["request"]["url"] = api["request"]["url"].replace(host, ip[-1])
+    return api
+
+
+def make_data(api_count, line_count):
+    lines = ["# 测试环境"] + [
+        "10.0.{}.{}:8080 service{}.test.com".format(index // 250, index % 250, index) for index in range(line_count)
+    ]
+    apis = [
+        {"name": "api {}".format(index),
+         "request": {"url": "http://service{}.test.com/api/{}".format(index % line_count, index), "method": "GET"}}
+        for index in range(api_count)
+    ]
+    return lines, apis
+
+
+def timeit(func, apis, repeat):
+    costs = []
+    for _ in range(repeat):
+        test_case = copy.deepcopy(apis)
+        start = time.perf_counter()
+        func(test_case)
+        costs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(costs)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--apis', type=int, nargs='+', default=[300, 3000])
+    arg_parser.add_argument('--lines', type=int, default=50)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print("{:<8} {:>12} {:>16} {:>10}".format("apis", "legacy(ms)", "host-table(ms)", "speedup"))
+    for count in args.apis:
+        lines, apis = make_data(count, args.lines)
+        assert [legacy(lines, api) for api in copy.deepcopy(apis)] == \
+            [HostTable(lines).apply(api) for api in copy.deepcopy(apis)]
+
+        legacy_cost = timeit(lambda test_case: [legacy(lines, api) for api in test_case], apis, args.repeat)
+
+        def host_table(test_case):
+            table = HostTable(lines)
+            return [table.apply(api) for api in test_case]
+
+        host_table_cost = timeit(host_table, apis, args.repeat)
+        print("{:<8} {:>12.1f} {:>16.1f} {:>9.1f}x".format(
+            count, legacy_cost, host_table_cost, legacy_cost / host_table_cost))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+用例文件加载: 每次重新遍历目录并解析 与 磁盘解析缓存 的耗时对比
+
+    python benchmarks/bench_loader_cache.py --files 2000
+
+在临时目录下生成 files 个 YAML 用例文件 (分布在多级子目录中), 分别统计
+    1. legacy: os.walk 遍历目录, 纯 python yaml.SafeLoader 逐个解析
+    2. cold: 缓存为空时 load_folder_files + load_file (CSafeLoader 解析并写入缓存)
+    3. warm: 文件未修改时再次加载, 仅 stat 文件并读取缓存
+    4. changed: 修改 1% 的文件后再次加载, 仅重新解析修改过的文件
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yaml
+from loguru import logger
+
+from fastrunner.httprunner3.loader import filecache, load
+
+TEMPLATE = """config:
+    name: case {index}
+    base_url: http://127.0.0.1:8000
+    variables:
+        user: user{index}
+        password: "123456"
+teststeps:
+-   name: login
+    request:
+        url: /api/login
+        method: POST
+        json:
+            username: $user
+            password: $password
+    extract:
+        token: content.data.token
+    validate:
+    -   eq: [status_code, 200]
+    -   eq: [content.code, 0]
+-   name: query orders
+    request:
+        url: /api/orders?page={index}
+        method: GET
+        headers:
+            Authorization: Bearer $token
+    validate:
+    -   eq: [status_code, 200]
+    -   len_eq: [content.data.items, 20]
+"""
+
+
+def make_project(root, count):
+    folder = os.path.join(root, "testcases")
+    # mtime is set to the past, otherwise fast path is not trusted for files modified just now
+    past_ns = int((time.time() - 10) * 10 ** 9)
+    for index in range(count):
+        dir_path = os.path.join(folder, "module{}".format(index % 20), "sub{}".format(index % 3))
+        os.makedirs(dir_path, exist_ok=True)
+        file_path = os.path.join(dir_path, "case{}.yml".format(index))
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(TEMPLATE.format(index=index))
+        os.utime(file_path, ns=(past_ns, past_ns))
+
+    for dir_path, _, _ in os.walk(folder):
+        os.utime(dir_path, ns=(past_ns, past_ns))
+    return folder
+
+
+def legacy(folder):
+    contents = []
+    for dir_path, _, filenames in os.walk(folder):
+        for filename in filenames:
+            if filename.endswith(('.yml', '.yaml', '.json')):
+                with open(os.path.join(dir_path, filename), encoding="utf-8") as stream:
+                    contents.append(yaml.load(stream, Loader=yaml.SafeLoader))
+    return contents
+
+
+def cached(folder):
+    return [load.load_file(file_path) for file_path in load.load_folder_files(folder)]
+
+
+def touch(folder, ratio):
+    files = load.load_folder_files(folder)
+    for file_path in files[::int(1 / ratio)]:
+        with open(file_path, "a", encoding="utf-8") as f:
+            f.write("\n")
+
+
+def timeit(func, repeat, setup=None):
+    costs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        costs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(costs)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--files', type=int, default=2000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    root = tempfile.mkdtemp()
+    cache_dir = os.path.join(root, "cache")
+    try:
+        folder = make_project(root, args.files)
+        filecache.set_cache_dir(cache_dir)
+        assert sorted(map(str, legacy(folder))) == sorted(map(str, cached(folder)))
+
+        def clear_cache():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        results = [
+            ("legacy", timeit(lambda: legacy(folder), args.repeat)),
+            ("cold", timeit(lambda: cached(folder), args.repeat, setup=clear_cache)),
+            ("warm", timeit(lambda: cached(folder), args.repeat)),
+            ("changed 1%", timeit(lambda: cached(folder), args.repeat, setup=lambda: touch(folder, 0.01)))
+        ]
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print("yaml loader: {}".format(load.YamlLoader.__name__))
+    print("{:<12} {:>10} {:>10}".format("files={}".format(args.files), "cost(ms)", "speedup"))
+    for name, cost in results:
+        print("{:<12} {:>10.1f} {:>9.1f}x".format(name, cost, results[0][1] / cost))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+参数化用例集解析: 每行深拷贝 与 模板共享+写时复制 的内存/耗时对比
+
+    python benchmarks/bench_parameters_memory.py --rows 10000 --steps 10
+
+每种方式在独立子进程中执行, 分别统计
+    1. 解析耗时
+    2. tracemalloc 峰值 (解析过程中 Python 对象占用的内存)
+    3. 进程峰值 RSS
+"""
+import argparse
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastrunner.httprunner3 import parser, utils
+
+
+def make_testsuite(rows, steps):
+    """构造 rows 行参数, 每个用例 steps 个步骤的用例集
+    """
+    teststeps = [
+        {
+            "name": "step {} $uid".format(index),
+            "variables": {"page": index},
+            "api_def": {
+                "name": "api {}".format(index),
+                "request": {
+                    "url": "/api/v1/user/$uid/orders",
+                    "method": "POST",
+                    "headers": {"Content-Type": "application/json", "X-Token": "$token", "X-Device": "$device"},
+                    "json": {
+                        "page": "$page",
+                        "size": 20,
+                        "filters": {"status": ["paid", "shipped", "finished"], "keyword": "商品名称"},
+                        "remark": "x" * 64
+                    }
+                },
+                "extract": {"order_id": "content.data.items.0.id"},
+                "validate": [{"eq": ["status_code", 200]}, {"eq": ["content.code", 0]}]
+            }
+        }
+        for index in range(steps)
+    ]
+    return {
+        "config": {"name": "bench", "base_url": "http://127.0.0.1"},
+        "testcases": {
+            "orders of $uid": {
+                "testcase": "bench",
+                "variables": {"token": "token", "device": "device"},
+                "parameters": {"uid": list(range(rows))},
+                "testcase_def": {"config": {"name": "orders"}, "teststeps": teststeps}
+            }
+        }
+    }
+
+
+def legacy_parse(testsuite, project_mapping):
+    """原实现: 每行参数深拷贝用例后完整解析一次
+    """
+    testcase = testsuite["testcases"]["orders of $uid"]
+    parsed_testcase = testcase.pop("testcase_def")
+    parsed_testcase["config"]["name"] = "orders of $uid"
+    parsed_testcase["config"]["base_url"] = testsuite["config"]["base_url"]
+    parsed_testcase["type"] = "testcase"
+    parsed_config_variables = parser.parse_variables_mapping(testcase["variables"])
+
+    parsed_testcase_list = []
+    for parameter_variables in parser.parse_parameters(testcase["parameters"], parsed_config_variables):
+        testcase_copied = utils.deepcopy_dict(parsed_testcase)
+        testcase_copied["config"]["variables"] = utils.extend_variables(
+            utils.deepcopy_dict(parsed_config_variables),
+            parameter_variables
+        )
+        parsed_testcase_copied = parser._parse_testcase(testcase_copied, project_mapping)
+        parsed_testcase_copied["config"]["name"] = parser.parse_lazy_data(
+            parsed_testcase_copied["config"]["name"],
+            testcase_copied["config"]["variables"]
+        )
+        parsed_testcase_list.append(parsed_testcase_copied)
+    return parsed_testcase_list
+
+
+def overlay_parse(testsuite, project_mapping):
+    return parser.parse_tests({"project_mapping": project_mapping, "testsuites": [testsuite]})
+
+
+def run(mode, rows, steps):
+    """子进程中执行一种解析方式, 输出: 用例数 耗时(ms) tracemalloc峰值(MB) 峰值RSS(MB)
+    """
+    project_mapping = {"PWD": "", "functions": {}, "variables": {}, "env": {}}
+    testsuite = make_testsuite(rows, steps)
+    parse = legacy_parse if mode == "legacy" else overlay_parse
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    testcases = parse(testsuite, project_mapping)
+    cost = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # linux 下 ru_maxrss 单位为 KB
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(len(testcases), cost, peak / 1024 / 1024, rss)
+
+
+def measure(mode, rows, steps, repeat):
+    results = []
+    for _ in range(repeat):
+        output = subprocess.check_output([
+            sys.executable, os.path.abspath(__file__),
+            "--mode", mode, "--rows", str(rows), "--steps", str(steps)
+        ])
+        results.append([float(value) for value in output.split()])
+    return [statistics.median(column) for column in zip(*results)]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+    arg_parser.add_argument('--steps', type=int, default=10)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--mode', choices=['legacy', 'overlay'], help='仅供子进程使用')
+    args = arg_parser.parse_args()
+
+    if args.mode:
+        run(args.mode, args.rows[0], args.steps)
+        return
+
+    print("{:<12} {:<8} {:>10} {:>12} {:>12} {:>12}".format(
+        "rows", "mode", "cases", "parse(ms)", "traced(MB)", "rss(MB)"))
+    for rows in args.rows:
+        for mode in ("legacy", "overlay"):
+            count, cost, traced, rss = measure(mode, rows, args.steps, args.repeat)
+            print("{:<12} {:<8} {:>10} {:>12.1f} {:>12.1f} {:>12.1f}".format(
+                "{}x{}".format(rows, args.steps), mode, int(count), cost, traced, rss))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+变量解析: 多轮扫描 与 依赖图拓扑排序 的耗时对比
+
+    python benchmarks/bench_parse_variables.py --variables 500 1000
+
+分别统计
+    1. fan-in: 每个变量引用排在后面的若干基础变量, 多轮扫描需要 2 轮
+    2. chain: 变量按引用顺序倒排, 多轮扫描超过 len*4 次后报 VariableNotFound
+    3. step: 会话中已有 N 个全局变量时, 每个步骤初始化 3 个步骤变量
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastrunner.httprunner3 import exceptions, parser
+from fastrunner.httprunner3.context import SessionContext
+
+
+def legacy_parse_variables_mapping(variables_mapping):
+    """多轮扫描实现, 用于对比
+    """
+    run_times = 0
+    parsed_variables_mapping = {}
+
+    while len(parsed_variables_mapping) != len(variables_mapping):
+        for var_name in variables_mapping:
+            run_times += 1
+            if run_times > len(variables_mapping) * 4:
+                raise exceptions.VariableNotFound(var_name)
+            if var_name in parsed_variables_mapping:
+                continue
+
+            value = variables_mapping[var_name]
+            variables = parser.extract_variables(value)
+            if variables and any([_var_name not in parsed_variables_mapping for _var_name in variables]):
+                continue
+
+            parsed_variables_mapping[var_name] = parser.parse_lazy_data(value, parsed_variables_mapping)
+
+    return parsed_variables_mapping
+
+
+def legacy_init_test_variables(session_variables_mapping, variables_mapping):
+    variables_mapping = dict(variables_mapping)
+    variables_mapping.update(session_variables_mapping)
+    return legacy_parse_variables_mapping(variables_mapping)
+
+
+def sum_two(a, b):
+    return a + b
+
+
+FUNCTIONS = {"sum_two": sum_two}
+
+
+def fan_in(count):
+    bases = ["base_{}".format(i) for i in range(10)]
+    variables = {
+        "var_{}".format(i): "${{sum_two(${}, {})}}-$base_0".format(random.choice(bases), i)
+        for i in range(count)
+    }
+    variables.update({name: index for index, name in enumerate(bases)})
+    return parser.prepare_lazy_data(variables, FUNCTIONS, set(variables))
+
+
+def chain(count):
+    variables = {"var_0": 0}
+    for i in range(1, count):
+        variables["var_{}".format(i)] = "${{sum_two($var_{}, 1)}}".format(i - 1)
+    variables = dict(reversed(list(variables.items())))
+    return parser.prepare_lazy_data(variables, FUNCTIONS, set(variables))
+
+
+def timeit(func, repeat):
+    costs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            func()
+        except exceptions.VariableNotFound:
+            return None
+        costs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(costs)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--variables', type=int, nargs='+', default=[500, 1000])
+    arg_parser.add_argument('--steps', type=int, default=100)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    def fmt(cost):
+        return "{:>12}".format("failed") if cost is None else "{:>12.2f}".format(cost)
+
+    print("{:<20} {:>12} {:>12}".format("case", "legacy(ms)", "graph(ms)"))
+    for count in args.variables:
+        variables = fan_in(count)
+        print("{:<20} {} {}".format(
+            "fan-in {}".format(count),
+            fmt(timeit(lambda: legacy_parse_variables_mapping(variables), args.repeat)),
+            fmt(timeit(lambda: parser.parse_variables_mapping(variables), args.repeat))
+        ))
+
+        variables = chain(count)
+        print("{:<20} {} {}".format(
+            "chain {}".format(count),
+            fmt(timeit(lambda: legacy_parse_variables_mapping(variables), args.repeat)),
+            fmt(timeit(lambda: parser.parse_variables_mapping(variables), args.repeat))
+        ))
+
+        context = SessionContext(fan_in(count))
+        step_variables = parser.prepare_lazy_data(
+            {"a": "$base_1", "b": "${sum_two($a, 1)}", "c": "$var_1"},
+            FUNCTIONS, set(context.session_variables_mapping) | {"a", "b", "c"}
+        )
+
+        def legacy_steps():
+            for _ in range(args.steps):
+                legacy_init_test_variables(context.session_variables_mapping, step_variables)
+
+        def graph_steps():
+            for _ in range(args.steps):
+                context.init_test_variables(step_variables)
+
+        print("{:<20} {} {}".format(
+            "{} steps x {} vars".format(args.steps, count),
+            fmt(timeit(legacy_steps, args.repeat)),
+            fmt(timeit(graph_steps, args.repeat))
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+大体积JSON响应在 记录meta_data + 提取 + 校验 过程中的耗时对比
+
+    python benchmarks/bench_response_json.py --sizes 1 5 10
+
+分别统计
+    1. eager: 每个环节各自调用 resp.json(), 并且无论日志级别都拼接 debug 日志
+    2. lazy: 当前实现, response.load_json() 只解码一次, debug 日志只在开启时拼接
+日志级别为 INFO, 与平台运行时一致
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from loguru import logger
+
+from fastrunner.httprunner3 import client, response
+
+
+def make_response(size_mb):
+    """构造指定大小的JSON响应
+    """
+    item = {"id": 0, "name": "商品名称", "price": 12.5, "tags": ["a", "b", "c"], "desc": "x" * 64}
+    count = size_mb * 1024 * 1024 // len(json.dumps(item))
+    body = json.dumps({"code": 0, "msg": "success", "data": {"items": [dict(item, id=i) for i in range(count)]}})
+
+    request = requests.Request("POST", "http://localhost/api/list", json={"page": 1}).prepare()
+    resp = requests.Response()
+    resp._content = body.encode("utf-8")
+    resp.status_code = 200
+    resp.reason = "OK"
+    resp.url = request.url
+    resp.request = request
+    resp.encoding = "utf-8"
+    resp.headers["Content-Type"] = "application/json"
+    return resp
+
+
+def copy_response(resp):
+    new = requests.Response()
+    new.__dict__.update({key: value for key, value in resp.__dict__.items() if key != "_hrun_json"})
+    return new
+
+
+def eager(resp):
+    """每个环节各自解码响应体
+    """
+    record = {"response": {"headers": dict(resp.headers), "body": resp.json()}}
+    # 原实现无论日志级别都会拼接日志内容
+    "".join("{:<16} : {}\n".format(key, repr(value)) for key, value in record["response"].items())
+    resp.json()["code"]   # extract content.code
+    resp.json()["data"]   # validate_script response_json
+
+
+def lazy(resp):
+    client.get_req_resp_record(resp)
+    resp_obj = response.ResponseObject(resp)
+    resp_obj.extract_field("content.code")
+    resp_obj.json["data"]
+
+
+def timeit(func, source, repeat):
+    costs = []
+    for _ in range(repeat):
+        resp = copy_response(source)
+        start = time.perf_counter()
+        func(resp)
+        costs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(costs)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[1, 5, 10], help='响应体大小(MB)')
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    print("{:<10} {:>12} {:>12} {:>8}".format("size", "eager(ms)", "lazy(ms)", "speedup"))
+    for size in args.sizes:
+        source = make_response(size)
+        before = timeit(eager, source, args.repeat)
+        after = timeit(lazy, source, args.repeat)
+        print("{:<10} {:>12.2f} {:>12.2f} {:>7.1f}x".format("{}MB".format(size), before, after, before / after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+API/用例步骤搜索: 逐个关键字 LIKE '%keyword%' 与 FTS5 trigram 索引 的耗时对比
+
+    python benchmarks/bench_search_index.py --apis 100000 --steps 1000000
+
+在 sqlite 内存库中生成 apis 条 API、steps 条用例步骤, 按 search.sqlite_index_sql 建立索引, 分别统计
+    1. like: 原实现, 每个关键字 name LIKE ... OR url LIKE ..., 全表扫描
+    2. fts: 与 FTS5 索引按 rowid 关联, 按 bm25 相关度排序
+两种方式返回的结果集合一致
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastrunner.utils import search
+
+MODULES = ["user", "order", "goods", "cart", "payment", "coupon", "member", "stock", "report", "message"]
+ACTIONS = ["create", "update", "delete", "detail", "list", "export", "audit", "cancel", "refund", "query"]
+NAMES = ["新增", "修改", "删除", "详情", "列表", "导出", "审核", "取消", "退款", "查询"]
+
+# trigram 至少3个字符, 更短的关键字由 search_queryset 使用 LIKE
+KEYWORDS = ["order/refund", "payment", "order导出", "coupon审核 v12", "member/list/v12/9"]
+
+
+def make_rows(count, seed):
+    rng = random.Random(seed)
+    for index in range(1, count + 1):
+        module = rng.randrange(len(MODULES))
+        action = rng.randrange(len(ACTIONS))
+        version = rng.randrange(50)
+        name = "{}{} v{}".format(MODULES[module], NAMES[action], version)
+        url = "/api/{}/{}/v{}/{}".format(MODULES[module], ACTIONS[action], version, index)
+        yield index, name, url
+
+
+def make_db(tables):
+    db = sqlite3.connect(":memory:")
+    for seed, (table, count) in enumerate(tables.items()):
+        db.execute('CREATE TABLE "{}" (id integer PRIMARY KEY, name varchar(100), url text)'.format(table))
+        db.executemany('INSERT INTO "{}" VALUES (?, ?, ?)'.format(table), make_rows(count, seed))
+    db.commit()
+    return db
+
+
+def like(db, table, keywords):
+    where = " AND ".join("(name LIKE ? OR url LIKE ?)" for _ in keywords)
+    params = [value for keyword in keywords for value in ("%" + keyword + "%",) * 2]
+    sql = 'SELECT id FROM "{}" WHERE {} ORDER BY id DESC'.format(table, where)
+    return [row[0] for row in db.execute(sql, params)]
+
+
+def fts(db, table, keywords):
+    index = search.fts_table(table)
+    query = " AND ".join('"{}"'.format(keyword.replace('"', '""')) for keyword in keywords)
+    sql = 'SELECT "{table}".id FROM "{table}", {index} WHERE {index}.rowid = "{table}".id AND {index} MATCH ? ' \
+          'ORDER BY {index}.rank, "{table}".id DESC'.format(table=table, index=index)
+    return [row[0] for row in db.execute(sql, [query])]
+
+
+def timeit(func, repeat):
+    costs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        costs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(costs)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--apis', type=int, default=100000)
+    arg_parser.add_argument('--steps', type=int, default=1000000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    tables = {"api": args.apis, "case_step": args.steps}
+    db = make_db(tables)
+
+    start = time.perf_counter()
+    for table in tables:
+        for sql in search.sqlite_index_sql(table, search.SEARCH_INDEXES[table]):
+            db.execute(sql)
+    db.commit()
+    print("build index: {:.1f}ms".format((time.perf_counter() - start) * 1000))
+
+    print("{:<10} {:<18} {:>8} {:>10} {:>10} {:>10}".format(
+        "table", "keywords", "rows", "like(ms)", "fts(ms)", "speedup"))
+    for table in tables:
+        for keyword in KEYWORDS:
+            keywords = keyword.split()
+            assert set(like(db, table, keywords)) == set(fts(db, table, keywords))
+            like_cost = timeit(lambda: like(db, table, keywords), args.repeat)
+            fts_cost = timeit(lambda: fts(db, table, keywords), args.repeat)
+            print("{:<10} {:<18} {:>8} {:>10.1f} {:>10.1f} {:>9.1f}x".format(
+                table, keyword, len(like(db, table, keywords)), like_cost, fts_cost, like_cost / fts_cost))
+
+
+if __name__ == '__main__':
+    main()
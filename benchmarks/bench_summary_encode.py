@@ -0,0 +1,131 @@
+"""
+运行报告序列化: stringify_summary + parse_summary 多轮遍历 与 聚合时单轮转换 的耗时对比
+
+    python benchmarks/bench_summary_encode.py --records 2000
+
+构造 records 条步骤记录, 响应依次为 json / html / 图片 / 二进制, 分别统计
+    1. legacy: 聚合后 stringify_summary 转换, parse_summary 再次遍历并对每个 html 响应 prettify
+    2. single-pass: 聚合时 stringify_record 逐条转换, html 在查看报告时才格式化
+两种方式最后都按 save_summary 的方式逐条压缩为 JSON
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from requests.cookies import RequestsCookieJar, cookiejar_from_dict
+
+from fastrunner.httprunner3.report import stringify
+
+HTML = "<html><head><title>订单</title></head><body>{}</body></html>".format(
+    "".join("<div class='row'><span>{}</span><a href='/orders/{}'>详情</a></div>".format(i, i) for i in range(40))
+)
+
+
+def make_response(index):
+    kind = index % 4
+    if kind == 0:
+        return "application/json", {"code": 0, "data": {"id": index, "items": list(range(20))}}
+    elif kind == 1:
+        return "text/html; charset=utf-8", HTML
+    elif kind == 2:
+        return "image/png", bytes(range(256)) * 8
+    return "application/octet-stream", bytes(range(128, 256)) * 8
+
+
+def make_record(index):
+    content_type, body = make_response(index)
+    meta_datas = {
+        "name": "step {}".format(index),
+        "data": [{
+            "request": {
+                "url": "http://127.0.0.1/api/orders/{}".format(index),
+                "method": "POST",
+                "headers": {"Content-Type": "application/json", "X-Token": "token"},
+                "body": json.dumps({"id": index, "remark": "备注"}).encode("utf-8")
+            },
+            "response": {
+                "ok": True,
+                "url": "http://127.0.0.1/api/orders/{}".format(index),
+                "status_code": 200,
+                "reason": "OK",
+                "cookies": cookiejar_from_dict({"sid": str(index)}, RequestsCookieJar()),
+                "encoding": "utf-8" if "text" in content_type else None,
+                "headers": {"Content-Type": content_type, "Server": "nginx"},
+                "content_type": content_type,
+                "body": body
+            }
+        }],
+        "stat": {"response_time_ms": 12.5, "elapsed_ms": 11.2, "content_size": 512},
+        "validators": {"validate_extractor": [{"comparator": "equals", "check": "status_code", "expect": 200}]}
+    }
+    return {"name": "step {}".format(index), "status": "success", "attachment": "", "meta_datas": meta_datas}
+
+
+def compress(record):
+    return zlib.compress(json.dumps(record, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+def legacy(records):
+    """原实现: 聚合后整体 stringify, 再由 parse_summary 遍历并 prettify html 响应
+        原 parse_summary 读取 response["content"] 会因键不存在报错, 这里按 body 统计其应有的开销
+    """
+    for record in records:
+        meta_data = record["meta_datas"]["data"][0]
+        meta_data["validators"] = record["meta_datas"]["validators"]["validate_extractor"]
+        record["meta_data"] = meta_data
+    stringify.stringify_summary({"details": [{"name": "bench", "records": records}]})
+
+    for record in records:
+        response = record["meta_data"]["response"]
+        for key, value in response.items():
+            if isinstance(value, bytes):
+                response[key] = value.decode("utf-8", "replace")
+        if "text/html" in response["content_type"]:
+            response["body"] = BeautifulSoup(response["body"], features="html.parser").prettify()
+
+    return [compress(record) for record in records]
+
+
+def single_pass(records):
+    for record in records:
+        meta_datas_expanded = stringify.stringify_record(record)
+        meta_data = meta_datas_expanded[0]["data"][0]
+        meta_data["validators"] = meta_datas_expanded[0]["validators"]["validate_extractor"]
+        record["meta_data"] = meta_data
+
+    return [compress(record) for record in records]
+
+
+def timeit(func, count, repeat):
+    costs = []
+    for _ in range(repeat):
+        records = [make_record(index) for index in range(count)]
+        start = time.perf_counter()
+        func(records)
+        costs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(costs)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--records', type=int, nargs='+', default=[2000])
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    print("{:<10} {:>12} {:>16} {:>10}".format("records", "legacy(ms)", "single-pass(ms)", "speedup"))
+    for count in args.records:
+        legacy_cost = timeit(legacy, count, args.repeat)
+        single_pass_cost = timeit(single_pass, count, args.repeat)
+        print("{:<10} {:>12.1f} {:>16.1f} {:>9.1f}x".format(
+            count, legacy_cost, single_pass_cost, legacy_cost / single_pass_cost))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,21 @@
+import contextlib
+import contextvars
 import os
-import sys
 import unittest
 import json
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
 
-from . import (__version__, exceptions, loader, parser,
-                        report, runner, utils)
+from . import (__version__, cache, client, exceptions, loader, logcapture, parser,
+                        pool, report, runner, utils)
+from .report.stringify import stringify_record
+
+
+@contextlib.contextmanager
+def _no_log_capture():
+    """ do nothing, contextlib.nullcontext() is not available before python 3.7.
+    """
+    yield
 
 
 class HttpRunner(object):
@@ -17,20 +27,30 @@ class HttpRunner(object):
                 failfast=True,
                 save_tests=True,
                 log_level="INFO",
-                log_file="test.log"
+                log_file="test.log",
+                concurrency=4
             )
             summary = runner.run(path_or_tests)
 
     """
 
-    def __init__(self, failfast=False, save_tests=False, log_level="WARNING", log_file=None):
+    def __init__(self, failfast=False, save_tests=False, log_level="WARNING", log_file=None,
+                 concurrency=1, http_pool=None, chunk_size=500, log_capture=None):
         """ initialize HttpRunner.
 
         Args:
             failfast (bool): stop the test run on the first error or failure.
             save_tests (bool): save loaded/parsed tests to JSON file.
-            log_level (str): logging level.
-            log_file (str): log file path.
+            log_level (str): logging level of stdout.
+            log_file (str): log file path, all logs of each run are also written to this file.
+            concurrency (int): max number of testcases running at the same time.
+                teststeps inside one testcase are always executed in order.
+            http_pool (dict): options of pool.get_adapter(), testcases share keep-alive
+                connections of one process-wide pool. None to create connections per testcase.
+            chunk_size (int): number of testcases parsed and loaded ahead of running,
+                parameterized testcases are generated chunk by chunk.
+            log_capture (dict): options of logcapture.LogCapture(), logs of each run are kept in
+                self.log_capture, e.g. {"max_records": 2000, "max_bytes": 1048576}
 
         """
 
@@ -40,18 +60,19 @@ class HttpRunner(object):
             "resultclass": report.HtmlTestResult
         }
 
-        logger.remove()
-        log_level = log_level.upper()
-        logger.add(sys.stdout, level=log_level)
-        # print ('-----------log_file',log_file)
-        self.trace = logger.add(log_file)
-        # if log_file:
-        #     logger.add(log_file, level=log_level)
-
+        # loguru handlers are installed once, logs are dispatched to the run of current context
+        logcapture.install()
+        self.log_level = log_level.upper()
+        self.log_file = log_file
+        self.log_capture_options = log_capture or {}
+        self.log_capture = None
 
         self.unittest_runner = unittest.TextTestRunner(**kwargs)
         self.test_loader = unittest.TestLoader()
         self.save_tests = save_tests
+        self.concurrency = max(int(concurrency or 1), 1)
+        self.http_pool = http_pool
+        self.chunk_size = max(int(chunk_size or 1), 1)
         self._summary = None
         self.test_path = None
 
@@ -99,7 +120,10 @@ class HttpRunner(object):
         test_suite = unittest.TestSuite()
         for testcase in testcases:
             config = testcase.get("config", {})
-            test_runner = runner.Runner(config)
+            http_client_session = None
+            if self.http_pool is not None:
+                http_client_session = client.HttpSession(pool.get_adapter(**self.http_pool))
+            test_runner = runner.Runner(config, http_client_session)
             TestSequense = type('TestSequense', (unittest.TestCase,), {})
 
             tests = testcase.get("teststeps", [])
@@ -126,39 +150,88 @@ class HttpRunner(object):
 
         return test_suite
 
-    def _run_suite(self, test_suite):
-        """ run tests in test_suite
+    def _run_testcase(self, index, testcase):
+        """ run one loaded testcase, each testcase owns its Runner and HttpSession.
 
         Args:
-            test_suite: unittest.TestSuite()
+            index (int): testcase index in this run.
+            testcase: loaded unittest testcase.
 
         Returns:
-            list: tests_results
+            unittest.TestResult
 
         """
-        tests_results = []
-
-        for index, testcase in enumerate(test_suite):
-            log_handler = None
-            if self.save_tests:
-                logs_file_abs_path = utils.prepare_log_file_abs_path(
-                    self.test_path, f"testcase_{index+1}.log"
-                )
-                log_handler = logger.add(logs_file_abs_path, level="DEBUG")
+        log_scope = _no_log_capture()
+        if self.save_tests:
+            # only collect logs emitted in the context running this testcase
+            log_scope = logcapture.log_capture(
+                level="DEBUG",
+                console_level=self.log_level,
+                max_records=0,
+                spill_file=utils.prepare_log_file_abs_path(self.test_path, f"testcase_{index+1}.log")
+            )
 
+        with log_scope:
             testcase_name = testcase.config.get("name")
             logger.info(f"Start to run testcase: {testcase_name}")
+            return self.unittest_runner.run(testcase)
+
+    @staticmethod
+    def _order_results(tests_results):
+        """ order (testcase, result) pairs the same way as sequential running:
+            failed testcases first (latest failure on top), then successful ones.
+
+        Args:
+            tests_results (iterable): (testcase, result) pairs in test suite order.
 
-            result = self.unittest_runner.run(testcase)
+        Returns:
+            list: ordered tests_results
+
+        """
+        ordered_results = []
+        for testcase, result in tests_results:
             if result.wasSuccessful():
-                tests_results.append((testcase, result))
+                ordered_results.append((testcase, result))
             else:
-                tests_results.insert(0, (testcase, result))
+                ordered_results.insert(0, (testcase, result))
+
+        return ordered_results
+
+    def _run_suite(self, test_suite, offset=0):
+        """ run tests in test_suite, testcases are dispatched to a thread pool
+            when concurrency is greater than 1.
+
+        Args:
+            test_suite: unittest.TestSuite()
+            offset (int): number of testcases run before this suite in the same run,
+                test suites are loaded and run chunk by chunk.
 
-            if self.save_tests and log_handler:
-                logger.remove(log_handler)
+        Returns:
+            list: (testcase, result) pairs in test suite order
 
-        return tests_results
+        """
+        testcases = list(test_suite)
+        for index, testcase in enumerate(testcases, offset):
+            # index in the whole run, logs of testcase are saved to testcase_{index+1}.log
+            setattr(testcase, "index", index)
+        max_workers = min(self.concurrency, len(testcases))
+
+        if max_workers > 1:
+            # run each testcase in a copy of current context to share the function cache
+            # and template stats of this run
+            context = contextvars.copy_context()
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(
+                    lambda testcase: context.copy().run(self._run_testcase, testcase.index, testcase),
+                    testcases
+                ))
+        else:
+            results = [
+                self._run_testcase(testcase.index, testcase)
+                for testcase in testcases
+            ]
+
+        return list(zip(testcases, results))
 
     def _aggregate(self, tests_results):
         """ aggregate results
@@ -192,27 +265,39 @@ class HttpRunner(object):
                 summary["stat"]["testcases"]["fail"] += 1
 
             summary["success"] &= testcase_summary["success"]
-            testcase_summary["name"] = testcase.config.get("name")
+            testcase_summary["name"] = testcase.config.get("name") or f"testcase {index}"
             testcase_summary["in_out"] = utils.get_testcase_io(testcase)
+            if "case_id" in testcase.config:
+                # id of the platform testcase, parameterized testcases share the same id
+                testcase_summary["case_id"] = testcase.config["case_id"]
 
             report.aggregate_stat(summary["stat"]["teststeps"], testcase_summary["stat"])
             report.aggregate_stat(summary["time"], testcase_summary["time"])
 
             if self.save_tests:
                 logs_file_abs_path = utils.prepare_log_file_abs_path(
-                    self.test_path, f"testcase_{index+1}.log"
+                    self.test_path, f"testcase_{testcase.index+1}.log"
                 )
                 testcase_summary["log"] = logs_file_abs_path
 
 
-            for index,each in enumerate(testcase_summary['records']):
-                meta_data = each["meta_datas"]["data"][0]
-                meta_data["validators"] = each["meta_datas"]["validators"]["validate_extractor"]
-                testcase_summary['records'][index]['meta_data'] = meta_data
-
+            # records are stringified as soon as they are aggregated, the summary is serializable
+            # without further passes; html responses are prettified when the report is viewed.
+            for record in testcase_summary["records"]:
+                meta_datas_expanded = stringify_record(record)
+                if not meta_datas_expanded:
+                    continue
+                meta_data = meta_datas_expanded[0]["data"][0]
+                meta_data["validators"] = meta_datas_expanded[0].get("validators", {}).get("validate_extractor", [])
+                record["meta_data"] = meta_data
 
             testcase_summary["HRUN-Request-ID"] = testcase.runner.hrun_request_id
             summary["details"].append(testcase_summary)
+
+        if self.http_pool is not None:
+            summary["connection_pool"] = pool.summarize_stats(
+                testcase.runner.http_client_session.pool_stats for testcase, _ in tests_results
+            )
         return summary
 
     def _aggregate2(self, tests_results):
@@ -230,12 +315,12 @@ class HttpRunner(object):
             "details": []
         }
 
-        for tests_result in tests_results:
+        for index, tests_result in enumerate(tests_results):
             testcase, result = tests_result
 
             testcase_summary = report.get_summary(result)
             summary["success"] &= testcase_summary["success"]
-            testcase_summary["name"] = testcase.config.get("name")
+            testcase_summary["name"] = testcase.config.get("name") or f"testcase {index}"
             testcase_summary["base_url"] = testcase.config.get("request", {}).get("base_url", "")
 
             in_out = utils.get_testcase_io(testcase)
@@ -251,6 +336,11 @@ class HttpRunner(object):
 
             testcase_summary["HRUN-Request-ID"] = testcase.runner.hrun_request_id
             summary["details"].append(testcase_summary)
+
+        if self.http_pool is not None:
+            summary["connection_pool"] = pool.summarize_stats(
+                testcase.runner.http_client_session.pool_stats for testcase, _ in tests_results
+            )
         # print (summary["details"])
         return summary
 
@@ -310,8 +400,26 @@ class HttpRunner(object):
 
 
     def run_tests(self, tests_mapping):
-        """ run testcase/testsuite data
+        """ run testcase/testsuite data, results of cached functions are shared within this run only.
+            template cache hits/misses in summary are counted for this run only.
+            logs of this run are kept in self.log_capture, including runs failed with exception.
         """
+        log_capture_options = dict(self.log_capture_options)
+        log_capture_options.setdefault("console_level", self.log_level)
+        log_capture_options.setdefault("spill_file", self.log_file)
+
+        with logcapture.log_capture(**log_capture_options) as log_capture, \
+                cache.function_cache_scope() as function_cache, \
+                cache.template_stats_scope() as template_stats:
+            self.log_capture = log_capture
+            summary = self._run_tests(tests_mapping)
+            summary["function_cache"] = function_cache.stats()
+            summary["template_cache"] = template_stats.stats()
+
+        summary["log_capture"] = log_capture.stats()
+        return summary
+
+    def _run_tests(self, tests_mapping):
 
         self.test_path = tests_mapping.get("project_mapping", {}).get("test_path", "")
         if self.save_tests:
@@ -320,9 +428,29 @@ class HttpRunner(object):
                 utils.prepare_log_file_abs_path(self.test_path, "loaded.json")
             )
 
-        # parse tests
+        # parse tests, parameterized testcases are generated lazily
         self.exception_stage = "parse tests"
-        parsed_testcases = parser.parse_tests(tests_mapping)
+        parsed_testcases = parser.iter_parse_tests(tests_mapping)
+
+        if self.save_tests:
+            parsed_testcases = list(parsed_testcases)
+            utils.dump_json_file(
+                parsed_testcases,
+                utils.prepare_log_file_abs_path(self.test_path, "parsed.json")
+            )
+
+        # parse, add and run tests chunk by chunk, only one chunk of testcases
+        # is waiting to run at the same time.
+        tests_results = []
+        for chunk in utils.iter_chunks(parsed_testcases, self.chunk_size):
+            # add tests to test suite
+            self.exception_stage = "add tests to test suite"
+            test_suite = self._add_tests(chunk)
+
+            # run test suite
+            self.exception_stage = "run test suite"
+            tests_results.extend(self._run_suite(test_suite, offset=len(tests_results)))
+            self.exception_stage = "parse tests"
 
         parse_failed_testfiles = parser.get_parse_failed_testfiles()
         if parse_failed_testfiles:
@@ -332,33 +460,13 @@ class HttpRunner(object):
                 utils.prepare_log_file_abs_path(self.test_path, "parse_failed.json")
             )
 
-        if len(parsed_testcases) == 0:
+        if len(tests_results) == 0:
             logger.error("failed to parse all cases, abort.")
             raise exceptions.ParseTestsFailure
 
-        if self.save_tests:
-            utils.dump_json_file(
-                parsed_testcases,
-                utils.prepare_log_file_abs_path(self.test_path, "parsed.json")
-            )
-
-
-        # add tests to test suite
-        print (parsed_testcases)
-        self.exception_stage = "add tests to test suite"
-        test_suite = self._add_tests(parsed_testcases)
-
-        # run test suite
-        self.exception_stage = "run test suite"
-        results = self._run_suite(test_suite)
-
         # aggregate results
         self.exception_stage = "aggregate results"
-        self._summary = self._aggregate(results)
-
-        # generate html report
-        self.exception_stage = "generate html report"
-        report.stringify_summary(self._summary)
+        self._summary = self._aggregate(self._order_results(tests_results))
 
         if self.save_tests:
             utils.dump_json_file(
@@ -371,7 +479,6 @@ class HttpRunner(object):
                 vars_out,
                 utils.prepare_log_file_abs_path(self.test_path, "io.json")
             )
-        logger.remove(self.trace)
         return self._summary
 
     def get_vars_out(self):
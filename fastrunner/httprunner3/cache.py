@@ -0,0 +1,204 @@
+# encoding: utf-8
+
+import contextlib
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+
+_missing = object()
+
+# function cache of current run, see function_cache_scope()
+_function_cache = contextvars.ContextVar("function_cache", default=None)
+
+# template cache counter of current run, see template_stats_scope()
+_template_stats = contextvars.ContextVar("template_stats", default=None)
+
+
+class LRUCache(object):
+    """ thread safe LRU cache with hit/miss counters and optional expiration.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        """ init LRUCache.
+
+        Args:
+            maxsize (int): max number of items, the least recently used item is evicted when full.
+            ttl (int): default seconds before an item expires, None for never.
+
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _missing)
+            if item is not _missing and item[1] is not None and item[1] <= time.time():
+                del self._data[key]
+                item = _missing
+
+            if item is _missing:
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, ttl=None):
+        """ put value into cache.
+
+        Args:
+            key: hashable key
+            value: value to cache
+            ttl (int): seconds before value expires, default to self.ttl
+
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expire_at = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._data[key] = (value, expire_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, factory, ttl=None):
+        """ get cached value, or call factory() and cache its result.
+            factory is called outside the lock, exceptions are not cached.
+        """
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = factory()
+            self.put(key, value, ttl)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """ get cache counters.
+
+        Returns:
+            dict: {"hits": int, "misses": int, "size": int, "maxsize": int}
+
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize
+        }
+
+
+class HitCounter(object):
+    """ thread safe hit/miss counter of one run, for caches shared between runs.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        """ get counters of this run.
+
+        Returns:
+            dict: {"hits": int, "misses": int, "hit_rate": float}
+
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0
+        }
+
+
+def cacheable(func=None, ttl=None):
+    """ mark a pure function so its results are reused within one run.
+        results are keyed by function and arguments, never shared between runs.
+
+    Args:
+        func (function): function to mark
+        ttl (int): seconds before a result expires, None to keep it for the whole run
+
+    Examples:
+        >>> # debugtalk.py
+        >>> from fastrunner.httprunner3.cache import cacheable
+        >>> @cacheable(ttl=300)
+        >>> def get_token(user):
+        >>>     return login(user)["token"]
+
+    """
+    def decorator(function):
+        function.__hrun_cacheable__ = True
+        function.__hrun_cache_ttl__ = ttl
+        return function
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def is_cacheable(func):
+    return getattr(func, "__hrun_cacheable__", False)
+
+
+def get_function_cache():
+    """ get function cache of current run, None if not running in function_cache_scope().
+    """
+    return _function_cache.get()
+
+
+@contextlib.contextmanager
+def function_cache_scope(maxsize=1024, ttl=None):
+    """ create function cache for one run, threads should run with contextvars.copy_context()
+        to share it.
+
+    Args:
+        maxsize (int): max number of cached results.
+        ttl (int): default seconds before a result expires.
+
+    """
+    function_cache = LRUCache(maxsize=maxsize, ttl=ttl)
+    token = _function_cache.set(function_cache)
+    try:
+        yield function_cache
+    finally:
+        _function_cache.reset(token)
+
+
+def get_template_stats():
+    """ get template cache counter of current run, None if not running in template_stats_scope().
+    """
+    return _template_stats.get()
+
+
+@contextlib.contextmanager
+def template_stats_scope():
+    """ count template cache lookups of one run, the template cache itself is shared by all runs.
+        threads should run with contextvars.copy_context() to share the counter.
+    """
+    counter = HitCounter()
+    token = _template_stats.set(counter)
+    try:
+        yield counter
+    finally:
+        _template_stats.reset(token)
@@ -10,21 +10,23 @@ from requests import Request, Response
 from requests.exceptions import (InvalidSchema, InvalidURL, MissingSchema,
                                  RequestException)
 
-from fastrunner.httprunner3 import response
-from fastrunner.httprunner3.utils import lower_dict_keys, omit_long_data
+from fastrunner.httprunner3 import pool, response
+from fastrunner.httprunner3.utils import omit_long_data
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 
+def _format_req_resp(req_resp_dict, r_type):
+    msg = f"\n================== {r_type} details ==================\n"
+    for key, value in req_resp_dict[r_type].items():
+        msg += "{:<16} : {}\n".format(key, repr(value))
+    return msg
+
+
 def get_req_resp_record(resp_obj):
     """ get request and response info from Response() object.
+        json body is decoded once and shared with ResponseObject, see response.load_json().
     """
-    def log_print(req_resp_dict, r_type):
-        msg = f"\n================== {r_type} details ==================\n"
-        for key, value in req_resp_dict[r_type].items():
-            msg += "{:<16} : {}\n".format(key, repr(value))
-        logger.debug(msg)
-
     req_resp_dict = {
         "request": {},
         "response": {}
@@ -37,17 +39,16 @@ def get_req_resp_record(resp_obj):
 
     request_body = resp_obj.request.body
     if request_body:
-        request_content_type = lower_dict_keys(
-            req_resp_dict["request"]["headers"]
-        ).get("content-type")
+        # PreparedRequest.headers is case insensitive
+        request_content_type = resp_obj.request.headers.get("content-type")
         if request_content_type and "multipart/form-data" in request_content_type:
             # upload file type
             req_resp_dict["request"]["body"] = "upload file stream (OMITTED)"
         else:
             req_resp_dict["request"]["body"] = request_body
 
-    # log request details in debug mode
-    log_print(req_resp_dict, "request")
+    # log request details in debug mode, message is built only when debug level is enabled
+    logger.opt(lazy=True).debug("{}", lambda: _format_req_resp(req_resp_dict, "request"))
 
     # record response info
     req_resp_dict["response"]["ok"] = resp_obj.ok
@@ -56,11 +57,9 @@ def get_req_resp_record(resp_obj):
     req_resp_dict["response"]["reason"] = resp_obj.reason
     req_resp_dict["response"]["cookies"] = resp_obj.cookies or {}
     req_resp_dict["response"]["encoding"] = resp_obj.encoding
-    resp_headers = dict(resp_obj.headers)
-    req_resp_dict["response"]["headers"] = resp_headers
+    req_resp_dict["response"]["headers"] = dict(resp_obj.headers)
 
-    lower_resp_headers = lower_dict_keys(resp_headers)
-    content_type = lower_resp_headers.get("content-type", "")
+    content_type = resp_obj.headers.get("content-type", "")
     req_resp_dict["response"]["content_type"] = content_type
 
     if "image" in content_type:
@@ -72,14 +71,14 @@ def get_req_resp_record(resp_obj):
             if isinstance(resp_obj, response.ResponseObject):
                 req_resp_dict["response"]["body"] = resp_obj.json
             else:
-                req_resp_dict["response"]["body"] = resp_obj.json()
+                req_resp_dict["response"]["body"] = response.load_json(resp_obj)
         except ValueError:
             # only record at most 512 text charactors
             resp_text = resp_obj.text
             req_resp_dict["response"]["body"] = omit_long_data(resp_text)
 
     # log response details in debug mode
-    log_print(req_resp_dict, "response")
+    logger.opt(lazy=True).debug("{}", lambda: _format_req_resp(req_resp_dict, "response"))
 
     return req_resp_dict
 
@@ -101,10 +100,28 @@ class HttpSession(requests.Session):
     This is a slightly extended version of `python-request <http://python-requests.org>`_'s
     :py:class:`requests.Session` class and mostly this class works exactly the same.
     """
-    def __init__(self):
+    def __init__(self, adapter=None):
+        """ initialize HttpSession.
+
+        Args:
+            adapter (HTTPAdapter): shared transport adapter, e.g. pool.get_adapter().
+                cookies and meta_data are still owned by this session.
+
+        """
         super(HttpSession, self).__init__()
+        self.shared_adapter = adapter
+        self.pool_stats = {"requests": 0, "new_connections": 0, "dns_hits": 0, "dns_misses": 0}
+        if adapter is not None:
+            self.mount("http://", adapter)
+            self.mount("https://", adapter)
         self.init_meta_data()
 
+    def close(self):
+        """ close session, the shared adapter is kept open for other sessions.
+        """
+        if self.shared_adapter is None:
+            super(HttpSession, self).close()
+
     def init_meta_data(self):
         """ initialize meta_data, it will store detail data of request and response
         """
@@ -190,7 +207,13 @@ class HttpSession(requests.Session):
         self.meta_data["data"][0]["request"].update(kwargs)
 
         start_timestamp = time.time()
-        response = self._send_request_safe_mode(method, url, **kwargs)
+        if self.shared_adapter is None:
+            response = self._send_request_safe_mode(method, url, **kwargs)
+        else:
+            before = pool.thread_stats()
+            response = self._send_request_safe_mode(method, url, **kwargs)
+            for key, value in pool.thread_stats().items():
+                self.pool_stats[key] += value - before[key]
         response_time_ms = round((time.time() - start_timestamp) * 1000, 2)
 
         # get the length of the content, but if the argument stream is set to True, we take
@@ -233,10 +256,7 @@ class HttpSession(requests.Session):
         Safe mode has been removed from requests 1.x.
         """
         try:
-            msg = "processed request:\n"
-            msg += f"> {method} {url}\n"
-            msg += f"> kwargs: {kwargs}"
-            logger.debug(msg)
+            logger.debug("processed request:\n> {} {}\n> kwargs: {}", method, url, kwargs)
             return requests.Session.request(self, method, url, **kwargs)
         except (MissingSchema, InvalidSchema, InvalidURL):
             raise
@@ -36,8 +36,16 @@ class SessionContext(object):
         """
         variables_mapping = variables_mapping or {}
         variables_mapping = utils.ensure_mapping_format(variables_mapping)
-        variables_mapping.update(self.session_variables_mapping)
-        parsed_variables_mapping = parser.parse_variables_mapping(variables_mapping)
+        # session variables are evaluated already and override teststep variables,
+        # only evaluate teststep variables on top of them.
+        variables_mapping = {
+            key: value
+            for key, value in variables_mapping.items()
+            if key not in self.session_variables_mapping
+        }
+        parsed_variables_mapping = parser.parse_variables_mapping(
+            variables_mapping, self.session_variables_mapping
+        )
 
         self.test_variables_mapping = {}
         # priority: extracted variable > teststep variable
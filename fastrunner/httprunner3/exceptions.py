@@ -60,6 +60,17 @@ class VariableNotFound(NotFoundError):
     pass
 
 
+class VariableCircularReference(VariableNotFound):
+    """ variables reference each other, e.g. {"a": "$b", "b": "$a"}
+    """
+
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super(VariableCircularReference, self).__init__(
+            "circular reference: " + " -> ".join(cycle)
+        )
+
+
 class EnvNotFound(NotFoundError):
     pass
 
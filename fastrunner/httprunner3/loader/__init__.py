@@ -12,7 +12,7 @@ HttpRunner loader
 from fastrunner.httprunner3.loader.check import is_test_path, is_test_content, JsonSchemaChecker
 from fastrunner.httprunner3.loader.locate import get_project_working_directory as get_pwd, \
     init_project_working_directory as init_pwd
-from fastrunner.httprunner3.loader.load import load_csv_file, load_builtin_functions
+from fastrunner.httprunner3.loader.load import load_csv_file, iter_csv_file, load_builtin_functions
 from fastrunner.httprunner3.loader.buildup import load_cases, load_project_data
 
 __all__ = [
@@ -22,6 +22,7 @@ __all__ = [
     "get_pwd",
     "init_pwd",
     "load_csv_file",
+    "iter_csv_file",
     "load_builtin_functions",
     "load_project_data",
     "load_cases"
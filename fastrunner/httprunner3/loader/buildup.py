@@ -4,8 +4,8 @@ import os
 from loguru import logger
 # from fastrunner.httprunner3 import logger
 from httprunner import exceptions, utils
-from httprunner.loader.check import JsonSchemaChecker
-from httprunner.loader.load import load_module_functions, load_file, load_dot_env_file, \
+from fastrunner.httprunner3.loader.check import JsonSchemaChecker
+from fastrunner.httprunner3.loader.load import load_module_functions, load_file, load_dot_env_file, \
     load_folder_files
 from httprunner.loader.locate import init_project_working_directory, get_project_working_directory
 
@@ -42,16 +42,28 @@ with io.open(testsuite_schema_v2_path, encoding='utf-8') as f:
     testsuite_schema_v2 = json.load(f)
 
 
+# validators are created once for each schema, jsonschema.validate() checks schema itself on every call
+_validators = {}
+
+
+def _get_validator(scheme):
+    validator = _validators.get(id(scheme))
+    if validator is None:
+        validator_class = jsonschema.validators.validator_for(scheme)
+        validator_class.check_schema(scheme)
+        validator = _validators[id(scheme)] = validator_class(scheme, resolver=resolver)
+    return validator
+
+
 class JsonSchemaChecker(object):
 
     @staticmethod
     def validate_format(content, scheme):
         """ check api/testcase/testsuite format if valid
         """
-        try:
-            jsonschema.validate(content, scheme, resolver=resolver)
-        except jsonschema.exceptions.ValidationError as ex:
-            logger.error(str(ex))
+        error = jsonschema.exceptions.best_match(_get_validator(scheme).iter_errors(content))
+        if error is not None:
+            logger.error(str(error))
             raise exceptions.FileFormatError
 
         return True
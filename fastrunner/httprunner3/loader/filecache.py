@@ -0,0 +1,264 @@
+# encoding: utf-8
+
+""" on-disk cache of parsed test files, so repeat runs only parse changed files.
+
+Each source file has one pickled entry under cache dir, validated in two steps:
+
+    fast path: mtime and size of source file are unchanged, source file is not read
+    content hash: source file is read and hashed, parsed content is reused if sha256 is unchanged
+
+Folder listings are cached per directory and validated by directory mtime, only changed
+directories are listed again.
+
+Cache is disabled unless env HRUN_LOADER_CACHE_DIR is set. Entries are unpickled when loaded,
+so cache dir must be owned by current user with mode 0700, otherwise cache is disabled.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+from loguru import logger
+
+CACHE_VERSION = 1
+CACHE_DIR_ENV = "HRUN_LOADER_CACHE_DIR"
+
+# files modified shortly before they are cached may be modified again within the same
+# mtime tick, fast path is not trusted for them and content hash is checked instead.
+RACY_INTERVAL_NS = 2 * 10 ** 9
+
+
+def default_cache_dir():
+    """ get cache dir from env HRUN_LOADER_CACHE_DIR.
+
+    Returns:
+        str: cache dir, None if cache is disabled.
+
+    """
+    return os.environ.get(CACHE_DIR_ENV) or None
+
+
+def is_private_dir(dir_path):
+    """ check dir is owned by current user and not accessible by others, missing dir is created with mode 0700.
+    """
+    try:
+        os.makedirs(dir_path, mode=0o700, exist_ok=True)
+        stat_result = os.stat(dir_path)
+    except OSError:
+        return False
+
+    if hasattr(os, "getuid") and stat_result.st_uid != os.getuid():
+        return False
+    return not stat_result.st_mode & 0o077
+
+
+class FileCache(object):
+    """ parse cache of test files, errors of cache dir are ignored and files are parsed as usual.
+    """
+
+    def __init__(self, cache_dir):
+        """ init FileCache.
+
+        Args:
+            cache_dir (str): dir to store cache entries, None to disable cache.
+
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # (cache_dir, whether cache_dir is private), checked once for each cache_dir
+        self._checked = (None, False)
+
+    @property
+    def enabled(self):
+        if not self.cache_dir:
+            return False
+
+        cache_dir, private = self._checked
+        if cache_dir != self.cache_dir:
+            cache_dir = self.cache_dir
+            private = is_private_dir(cache_dir)
+            if not private:
+                logger.warning(f"loader cache dir {cache_dir} should be owned by current user with mode 0700, "
+                               f"loader cache is disabled.")
+            self._checked = (cache_dir, private)
+        return private
+
+    def _entry_path(self, kind, path):
+        key = hashlib.sha1(f"{kind}:{os.path.abspath(path)}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pickle")
+
+    @staticmethod
+    def _read_entry(entry_path):
+        try:
+            with open(entry_path, "rb") as f:
+                entry = pickle.load(f)
+        except Exception:
+            return None
+
+        if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+            return None
+        return entry
+
+    @staticmethod
+    def _write_entry(entry_path, entry):
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            entry["version"] = CACHE_VERSION
+            # time.time_ns() is not available before python 3.7
+            entry["cached_at_ns"] = int(time.time() * 10 ** 9)
+            os.makedirs(os.path.dirname(entry_path), mode=0o700, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _is_fresh(entry, stat_result):
+        return entry["mtime_ns"] == stat_result.st_mtime_ns \
+            and stat_result.st_mtime_ns + RACY_INTERVAL_NS < entry["cached_at_ns"]
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def load(self, file_path, parse, kind="file"):
+        """ load parsed content of file, parse is only called when file content is changed.
+
+        Args:
+            file_path (str): source file path
+            parse (callable): parse(data) => content, data is bytes of source file,
+                exceptions raised by parse are not cached.
+            kind (str): parser kind, files parsed by different parsers are cached separately.
+
+        Returns:
+            parsed content returned by parse.
+
+        """
+        if not self.enabled:
+            with open(file_path, "rb") as f:
+                return parse(f.read())
+
+        entry_path = self._entry_path(kind, file_path)
+        entry = self._read_entry(entry_path)
+        stat_result = os.stat(file_path)
+
+        if entry and entry["size"] == stat_result.st_size and self._is_fresh(entry, stat_result):
+            self._count(True)
+            return entry["content"]
+
+        with open(file_path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+
+        if entry and entry["sha256"] == digest:
+            self._count(True)
+            content = entry["content"]
+        else:
+            self._count(False)
+            content = parse(data)
+
+        self._write_entry(entry_path, {
+            "mtime_ns": stat_result.st_mtime_ns,
+            "size": stat_result.st_size,
+            "sha256": digest,
+            "content": content
+        })
+        return content
+
+    def list_folder(self, folder_path, suffixes, recursive=True):
+        """ list files endswith suffixes in folder, in the same order as os.walk().
+
+        Args:
+            folder_path (str): folder path
+            suffixes (tuple): file suffixes, e.g. ('.yml', '.yaml', '.json')
+            recursive (bool): list files recursively if True
+
+        Returns:
+            list: file paths joined with folder_path
+
+        """
+        entry = None
+        entry_path = None
+        if self.enabled:
+            entry_path = self._entry_path(f"folder:{suffixes}:{recursive}", folder_path)
+            entry = self._read_entry(entry_path)
+
+        cached_dirs = entry["dirs"] if entry else {}
+        dirs = {}
+        changed = entry is None
+        file_list = []
+
+        pending = [""]
+        while pending:
+            rel_dir = pending.pop()
+            dir_path = os.path.join(folder_path, rel_dir) if rel_dir else folder_path
+            try:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                changed = True
+                continue
+
+            cached = cached_dirs.get(rel_dir)
+            if cached and cached[0] == mtime_ns and mtime_ns + RACY_INTERVAL_NS < entry["cached_at_ns"]:
+                filenames, subdirs = cached[1], cached[2]
+            else:
+                changed = True
+                filenames, subdirs = self._scan_dir(dir_path, suffixes)
+
+            dirs[rel_dir] = (mtime_ns, filenames, subdirs)
+            file_list.extend(os.path.join(dir_path, filename) for filename in filenames)
+
+            if not recursive:
+                break
+            # top-down, walk the first subdir first like os.walk()
+            pending.extend(os.path.join(rel_dir, subdir) for subdir in reversed(subdirs))
+
+        if self.enabled:
+            self._count(not changed)
+            if changed or set(dirs) != set(cached_dirs):
+                self._write_entry(entry_path, {"dirs": dirs})
+
+        return file_list
+
+    @staticmethod
+    def _scan_dir(dir_path, suffixes):
+        filenames = []
+        subdirs = []
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+
+                    if not is_dir:
+                        if entry.name.endswith(suffixes):
+                            filenames.append(entry.name)
+                    elif not entry.is_symlink():
+                        # symlinks to directories are not followed, the same as os.walk()
+                        subdirs.append(entry.name)
+        except OSError:
+            pass
+
+        return filenames, subdirs
+
+
+file_cache = FileCache(default_cache_dir())
+
+
+def set_cache_dir(cache_dir):
+    """ change cache dir of file_cache, None to disable cache.
+    """
+    file_cache.cache_dir = cache_dir
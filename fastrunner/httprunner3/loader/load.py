@@ -11,39 +11,41 @@ from httprunner import builtin
 from httprunner import exceptions, utils
 from httprunner.loader.locate import get_project_working_directory
 
-try:
-    # PyYAML version >= 5.1
-    # ref: https://github.com/yaml/pyyaml/wiki/PyYAML-yaml.load(input)-Deprecation
-    yaml.warnings({'YAMLLoadWarning': False})
-except AttributeError:
-    pass
+from fastrunner.httprunner3.loader.filecache import file_cache
+
+# libyaml based loader is much faster, fall back to pure python loader if libyaml is not installed
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+TEST_FILE_SUFFIXES = ('.yml', '.yaml', '.json')
+
+
+def _parse_yaml_content(data, yaml_file):
+    try:
+        return yaml.load(data.decode('utf-8'), Loader=YamlLoader)
+    except yaml.YAMLError as ex:
+        logger.error(str(ex))
+        raise exceptions.FileFormatError
+
+
+def _parse_json_content(data, json_file):
+    try:
+        return json.loads(data.decode('utf-8'))
+    except json.JSONDecodeError:
+        err_msg = f"JSONDecodeError: JSON file format error: {json_file}"
+        logger.error(err_msg)
+        raise exceptions.FileFormatError(err_msg)
 
 
 def _load_yaml_file(yaml_file):
-    """ load yaml file and check file content format
+    """ load yaml file and check file content format, parsed content is cached by file_cache
     """
-    with io.open(yaml_file, 'r', encoding='utf-8') as stream:
-        try:
-            yaml_content = yaml.load(stream)
-        except yaml.YAMLError as ex:
-            logger.error(str(ex))
-            raise exceptions.FileFormatError
-
-        return yaml_content
+    return file_cache.load(yaml_file, lambda data: _parse_yaml_content(data, yaml_file), kind="yaml")
 
 
 def _load_json_file(json_file):
-    """ load json file and check file content format
+    """ load json file and check file content format, parsed content is cached by file_cache
     """
-    with io.open(json_file, encoding='utf-8') as data_file:
-        try:
-            json_content = json.load(data_file)
-        except json.JSONDecodeError:
-            err_msg = f"JSONDecodeError: JSON file format error: {json_file}"
-            logger.error(err_msg)
-            raise exceptions.FileFormatError(err_msg)
-
-        return json_content
+    return file_cache.load(json_file, lambda data: _parse_json_content(data, json_file), kind="json")
 
 
 def load_csv_file(csv_file):
@@ -70,6 +72,10 @@ def load_csv_file(csv_file):
         ]
 
     """
+    return list(iter_csv_file(csv_file))
+
+
+def _locate_csv_file(csv_file):
     if not os.path.isabs(csv_file):
         pwd = get_project_working_directory()
         # make compatible with Windows/Linux
@@ -79,14 +85,24 @@ def load_csv_file(csv_file):
         # file path not exist
         raise exceptions.CSVNotFound(csv_file)
 
-    csv_content_list = []
+    return csv_file
+
 
+def _iter_csv_rows(csv_file):
     with io.open(csv_file, encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)
         for row in reader:
-            csv_content_list.append(row)
+            yield row
 
-    return csv_content_list
+
+def iter_csv_file(csv_file):
+    """ same as load_csv_file, but rows are read one by one while iterating.
+
+    Raises:
+        exceptions.CSVNotFound: raised at once if csv file not exists.
+
+    """
+    return _iter_csv_rows(_locate_csv_file(csv_file))
 
 
 def load_file(file_path):
@@ -126,25 +142,24 @@ def load_folder_files(folder_path, recursive=True):
     if not os.path.exists(folder_path):
         return []
 
-    file_list = []
+    return file_cache.list_folder(folder_path, TEST_FILE_SUFFIXES, recursive)
 
-    for dirpath, dirnames, filenames in os.walk(folder_path):
-        filenames_list = []
 
-        for filename in filenames:
-            if not filename.endswith(('.yml', '.yaml', '.json')):
-                continue
-
-            filenames_list.append(filename)
+def _parse_dot_env_content(data):
+    env_variables_mapping = {}
 
-        for filename in filenames_list:
-            file_path = os.path.join(dirpath, filename)
-            file_list.append(file_path)
+    for line in io.StringIO(data.decode('utf-8')):
+        # maxsplit=1
+        if "=" in line:
+            variable, value = line.split("=", 1)
+        elif ":" in line:
+            variable, value = line.split(":", 1)
+        else:
+            raise exceptions.FileFormatError(".env format error")
 
-        if not recursive:
-            break
+        env_variables_mapping[variable.strip()] = value.strip()
 
-    return file_list
+    return env_variables_mapping
 
 
 def load_dot_env_file(dot_env_path):
@@ -170,19 +185,7 @@ def load_dot_env_file(dot_env_path):
         return {}
 
     logger.info(f"Loading environment variables from {dot_env_path}")
-    env_variables_mapping = {}
-
-    with io.open(dot_env_path, 'r', encoding='utf-8') as fp:
-        for line in fp:
-            # maxsplit=1
-            if "=" in line:
-                variable, value = line.split("=", 1)
-            elif ":" in line:
-                variable, value = line.split(":", 1)
-            else:
-                raise exceptions.FileFormatError(".env format error")
-
-            env_variables_mapping[variable.strip()] = value.strip()
+    env_variables_mapping = file_cache.load(dot_env_path, _parse_dot_env_content, kind="env")
 
     utils.set_os_environ(env_variables_mapping)
     return env_variables_mapping
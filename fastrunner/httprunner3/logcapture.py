@@ -0,0 +1,181 @@
+# encoding: utf-8
+
+""" per-run log capture.
+
+loguru handlers are process-wide, adding and removing them for each run breaks runs executed
+at the same time. Instead two handlers are installed once, and dispatch records to the run
+bound to current context:
+
+    console: stdout, filtered by console level of current run
+    capture: LogCapture of current run, a bounded ring buffer with optional file spill
+
+Threads running testcases of a run should run with contextvars.copy_context() to share its capture.
+"""
+
+import collections
+import contextlib
+import contextvars
+import os
+import sys
+import threading
+
+from loguru import logger
+
+DEFAULT_CONSOLE_LEVEL = "WARNING"
+
+# log capture of current run, see log_capture()
+_current_capture = contextvars.ContextVar("log_capture", default=None)
+_default_console_level_no = logger.level(DEFAULT_CONSOLE_LEVEL).no
+
+_install_lock = threading.Lock()
+_installed = False
+
+
+class LogCapture(object):
+    """ thread safe log buffer of one run, only the latest lines are kept when it is full.
+    """
+
+    def __init__(self, level="DEBUG", console_level=DEFAULT_CONSOLE_LEVEL, max_records=2000,
+                 max_bytes=1024 * 1024, max_line_length=8192, spill_file=None, parent=None):
+        """ init LogCapture.
+
+        Args:
+            level (str): min level of captured records.
+            console_level (str): min level of records printed to stdout.
+            max_records (int): max number of lines kept in memory, 0 to keep nothing.
+            max_bytes (int): max total length of lines kept in memory.
+            max_line_length (int): lines longer than this are truncated in memory, not in spill file.
+            spill_file (str): all captured lines are also written to this file if specified.
+            parent (LogCapture): captured lines are also passed to parent capture.
+
+        """
+        self.level_no = logger.level(level.upper()).no
+        self.console_level_no = logger.level(console_level.upper()).no
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.max_line_length = max_line_length
+        self.spill_file = spill_file
+        self.parent = parent
+        self.total = 0
+        self.dropped = 0
+        self._lines = collections.deque()
+        self._bytes = 0
+        self._spill = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        if self.spill_file:
+            os.makedirs(os.path.dirname(os.path.abspath(self.spill_file)), exist_ok=True)
+            self._spill = open(self.spill_file, "a", encoding="utf-8")
+
+    def close(self):
+        with self._lock:
+            if self._spill:
+                self._spill.close()
+                self._spill = None
+
+    def write(self, line):
+        with self._lock:
+            self.total += 1
+            if self._spill:
+                self._spill.write(line)
+
+            if len(line) > self.max_line_length:
+                line = line[:self.max_line_length] + " ...(truncated)\n"
+            self._lines.append(line)
+            self._bytes += len(line)
+
+            while self._lines and (len(self._lines) > self.max_records or self._bytes > self.max_bytes):
+                self._bytes -= len(self._lines.popleft())
+                self.dropped += 1
+
+    def lines(self):
+        """ get lines kept in memory, the same format as lines read from log file.
+
+        Returns:
+            list: lines ended with "\\n", oldest lines are dropped when capture is full.
+
+        """
+        with self._lock:
+            lines = list(self._lines)
+
+        if self.dropped:
+            lines.insert(0, f"... {self.dropped} earlier lines dropped, {self.total} lines in total\n")
+        return lines
+
+    def stats(self):
+        """ get capture counters.
+
+        Returns:
+            dict: {"total": int, "dropped": int, "kept": int, "bytes": int, "spill_file": str}
+
+        """
+        return {
+            "total": self.total,
+            "dropped": self.dropped,
+            "kept": len(self._lines),
+            "bytes": self._bytes,
+            "spill_file": self.spill_file
+        }
+
+
+def _console_filter(record):
+    capture = _current_capture.get()
+    console_level_no = capture.console_level_no if capture else _default_console_level_no
+    return record["level"].no >= console_level_no
+
+
+def _capture_filter(record):
+    return _current_capture.get() is not None
+
+
+def _capture_sink(message):
+    level_no = message.record["level"].no
+    line = str(message)
+    capture = _current_capture.get()
+    while capture is not None:
+        if level_no >= capture.level_no:
+            capture.write(line)
+        capture = capture.parent
+
+
+def install():
+    """ replace loguru handlers with console and capture handlers, only the first call takes effect.
+    """
+    global _installed
+
+    with _install_lock:
+        if _installed:
+            return
+
+        logger.remove()
+        logger.add(sys.stdout, level=0, filter=_console_filter)
+        logger.add(_capture_sink, level=0, filter=_capture_filter)
+        _installed = True
+
+
+def get_log_capture():
+    """ get log capture of current run, None if not running in log_capture().
+    """
+    return _current_capture.get()
+
+
+@contextlib.contextmanager
+def log_capture(**kwargs):
+    """ capture logs emitted in current context, nested captures also pass lines to the outer one.
+
+    Args:
+        kwargs: options of LogCapture().
+
+    """
+    install()
+
+    kwargs.setdefault("parent", _current_capture.get())
+    capture = LogCapture(**kwargs)
+    capture.open()
+    token = _current_capture.set(capture)
+    try:
+        yield capture
+    finally:
+        _current_capture.reset(token)
+        capture.close()
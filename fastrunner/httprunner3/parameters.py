@@ -0,0 +1,231 @@
+# encoding: utf-8
+
+""" lazy parameterization: parameter rows are converted on demand and cartesian products
+are generated one row at a time, optionally reduced by a sampling strategy.
+
+Sampling is configured in the parameters block with the reserved key SAMPLING_KEY:
+
+    "parameters": [
+        {"user_agent": ["iOS/10.1", "iOS/10.2"]},
+        {"username-password": "${parameterize(account.csv)}"},
+        {"__sampling__": {"strategy": "pairwise", "limit": 100}}
+    ]
+"""
+
+import itertools
+import random
+
+from fastrunner.httprunner3 import exceptions
+
+SAMPLING_KEY = "__sampling__"
+
+# first: first N rows in product order
+# random: N rows picked uniformly from the whole product, kept in product order
+# pairwise: rows covering every value pair of any two parameters
+SAMPLING_STRATEGIES = ("first", "random", "pairwise")
+
+
+class ParameterRows(object):
+    """ re-iterable rows of one parameter, e.g. "username-password".
+        rows are converted on each iteration, so rows read from a csv file are never kept in memory.
+    """
+
+    def __init__(self, parameter_name, source, evaluated=False):
+        """ init ParameterRows.
+
+        Args:
+            parameter_name (str): parameter names joined by "-"
+            source (list/callable): row values, or a callable returning a new iterator of row values
+            evaluated (bool): rows are returned by function or csv file, dict rows are
+                subset by parameter names.
+
+        """
+        self.parameter_name_list = parameter_name.split("-")
+        self.source = source
+        self.evaluated = evaluated
+
+    def __iter__(self):
+        content = self.source() if callable(self.source) else self.source
+        for item in content:
+            yield self._to_dict(item)
+
+    def _to_dict(self, item):
+        if self.evaluated and isinstance(item, dict):
+            # {"username-password": "${get_account()}"}
+            # get_account() => [{"username": "user1", "password": "111111"}]
+            return {key: item[key] for key in self.parameter_name_list}
+
+        if not isinstance(item, (list, tuple)):
+            # "2.8.5" => ["2.8.5"]
+            item = [item]
+
+        # ["username", "password"], ["user1", "111111"] => {"username": "user1", "password": "111111"}
+        return dict(zip(self.parameter_name_list, item))
+
+
+def _merge(items):
+    merged = {}
+    for item in items:
+        merged.update(item)
+    return merged
+
+
+def iter_cartesian_product(*args):
+    """ generate cartesian product lazily, in the same order as utils.gen_cartesian_product().
+
+    Args:
+        args (list of iterable): rows of each parameter, all but the first one are iterated
+            once per row of the former, so they should be re-iterable, e.g. list or ParameterRows.
+
+    Returns:
+        iterator: merged dict of each product row
+
+    """
+    if not args:
+        return
+
+    def _product(index, merged):
+        if index == len(args):
+            yield merged
+            return
+        for item in args[index]:
+            yield from _product(index + 1, dict(merged, **item))
+
+    yield from _product(0, {})
+
+
+def pairwise_indices(sizes):
+    """ generate rows covering every value pair of any two parameters, in-parameter-order algorithm.
+
+    Args:
+        sizes (list): number of values of each parameter
+
+    Returns:
+        list: rows of value indexes, e.g. [(0, 1, 0), (1, 0, 1)]
+
+    """
+    if not sizes or 0 in sizes:
+        return []
+    if len(sizes) <= 2:
+        return list(itertools.product(*[range(size) for size in sizes]))
+
+    # grow from the largest parameters, map columns back at the end
+    order = sorted(range(len(sizes)), key=lambda index: -sizes[index])
+    ordered_sizes = [sizes[index] for index in order]
+    rows = [list(row) for row in itertools.product(range(ordered_sizes[0]), range(ordered_sizes[1]))]
+
+    for column, size in enumerate(ordered_sizes[2:], 2):
+        uncovered = {
+            (former, value, new_value)
+            for former in range(column)
+            for value in range(ordered_sizes[former])
+            for new_value in range(size)
+        }
+
+        # horizontal growth: pick the value covering most uncovered pairs for each row
+        for row in rows:
+            start = sum(value for value in row if value is not None)
+            best_value, best_gain = 0, -1
+            for offset in range(size):
+                new_value = (start + offset) % size
+                gain = sum(
+                    (former, row[former], new_value) in uncovered
+                    for former in range(column)
+                    if row[former] is not None
+                )
+                if gain > best_gain:
+                    best_value, best_gain = new_value, gain
+                    if gain == column:
+                        break
+            row.append(best_value)
+            for former in range(column):
+                uncovered.discard((former, row[former], best_value))
+
+        # vertical growth: add rows for pairs still uncovered, free slots are reused
+        added = {}
+        for former, value, new_value in sorted(uncovered):
+            for row in added.get(new_value, []):
+                if row[former] is None:
+                    row[former] = value
+                    break
+            else:
+                row = [None] * column + [new_value]
+                row[former] = value
+                added.setdefault(new_value, []).append(row)
+                rows.append(row)
+
+    indexes = []
+    for row in rows:
+        original = [0] * len(sizes)
+        for column, value in enumerate(row):
+            original[order[column]] = value or 0
+        indexes.append(tuple(original))
+    return indexes
+
+
+def _check_sampling(sampling):
+    if not isinstance(sampling, dict):
+        raise exceptions.ParamsError(f"parameters sampling should be dict, got: {sampling}")
+
+    strategy = sampling.get("strategy", "first")
+    if strategy not in SAMPLING_STRATEGIES:
+        raise exceptions.ParamsError(
+            f"parameters sampling strategy should be one of {SAMPLING_STRATEGIES}, got: {strategy}")
+
+    limit = sampling.get("limit")
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 0):
+        raise exceptions.ParamsError(f"parameters sampling limit should be int >= 0, got: {limit}")
+    if strategy == "random" and limit is None:
+        raise exceptions.ParamsError("parameters sampling limit is required by random strategy")
+
+    return strategy, limit, sampling.get("seed")
+
+
+def sample_product(factors, sampling=None):
+    """ generate cartesian product of factors reduced by sampling.
+
+    Args:
+        factors (list of iterable): rows of each parameter
+        sampling (dict): {"strategy": "first", "limit": 100, "seed": 1}, None for the whole product
+
+    Returns:
+        iterator: merged dict of each product row
+
+    """
+    if not sampling:
+        return iter_cartesian_product(*factors)
+
+    strategy, limit, seed = _check_sampling(sampling)
+    if strategy == "first":
+        return itertools.islice(iter_cartesian_product(*factors), limit)
+
+    # random & pairwise need random access to rows of each parameter,
+    # only rows of each parameter are loaded, the product is never materialized.
+    factors = [list(factor) for factor in factors]
+    sizes = [len(factor) for factor in factors]
+
+    if strategy == "random":
+        total = 1
+        for size in sizes:
+            total *= size
+        indexes = sorted(random.Random(seed).sample(range(total), min(limit, total)))
+        rows = (_decode_index(index, sizes) for index in indexes)
+    else:
+        rows = pairwise_indices(sizes)
+        if limit is not None:
+            rows = rows[:limit]
+
+    return (
+        _merge(factor[value] for factor, value in zip(factors, row))
+        for row in rows
+    )
+
+
+def _decode_index(index, sizes):
+    """ decode index of product row to value indexes, the last parameter changes fastest.
+    """
+    row = []
+    for size in reversed(sizes):
+        index, value = divmod(index, size)
+        row.append(value)
+    return row[::-1]
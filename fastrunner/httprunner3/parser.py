@@ -8,7 +8,8 @@ import re
 
 from loguru import logger
 
-from fastrunner.httprunner3 import exceptions, utils, loader
+from fastrunner.httprunner3 import cache, exceptions, utils, loader
+from fastrunner.httprunner3 import parameters as params
 
 # use $$ to escape $ notation
 dolloar_regex_compile = re.compile(r"\$\$")
@@ -160,14 +161,56 @@ def parse_parameters(parameters, variables_mapping=None, functions_mapping=None)
         ]
         >>> parse_parameters(parameters)
 
+    """
+    return list(iter_parameters(parameters, variables_mapping, functions_mapping))
+
+
+def _csv_file_of(parameter_content, variables_mapping, functions_mapping):
+    """ get csv file path if parameter content is a single ${parameterize(file)} call, else None.
+    """
+    if not isinstance(parameter_content, str):
+        return None
+
+    lazy_content = prepare_lazy_data(parameter_content, functions_mapping, set(variables_mapping.keys()))
+    if not isinstance(lazy_content, LazyString) or lazy_content._string != "{}":
+        return None
+
+    lazy_function = lazy_content._args[0]
+    if not isinstance(lazy_function, LazyFunction) or lazy_function.func_name != "load_csv_file":
+        return None
+
+    return parse_lazy_data(lazy_function.get_args(), variables_mapping)[0]
+
+
+def iter_parameters(parameters, variables_mapping=None, functions_mapping=None):
+    """ parse parameters and generate cartesian product lazily, rows of csv files are streamed.
+        the product can be reduced by parameters.SAMPLING_KEY, see parameters.sample_product().
+
+    Args:
+        parameters (list/dict): same as parse_parameters()
+        variables_mapping (dict): variables mapping loaded from testcase config
+        functions_mapping (dict): functions mapping loaded from debugtalk.py
+
+    Returns:
+        iterator: parameter variables of each product row
+
+    Examples:
+        >>> parameters = [
+            {"user_agent": ["iOS/10.1", "iOS/10.2", "iOS/10.3"]},
+            {"username-password": "${parameterize(account.csv)}"},
+            {"__sampling__": {"strategy": "random", "limit": 10, "seed": 1}}
+        ]
+        >>> iter_parameters(parameters)
+
     """
     variables_mapping = variables_mapping or {}
     functions_mapping = functions_mapping or {}
-    parsed_parameters_list = []
+    parsed_variables_mapping = None
+    factors = []
 
-    parameters = utils.ensure_mapping_format(parameters)
+    parameters = dict(utils.ensure_mapping_format(parameters))
+    sampling = parameters.pop(params.SAMPLING_KEY, None)
     for parameter_name, parameter_content in parameters.items():
-        parameter_name_list = parameter_name.split("-")
 
         if isinstance(parameter_content, list):
             # (1) data list
@@ -175,58 +218,37 @@ def parse_parameters(parameters, variables_mapping=None, functions_mapping=None)
             #       => [{"app_version": "2.8.5", "app_version": "2.8.6"}]
             # e.g. {"username-password": [["user1", "111111"], ["test2", "222222"]}
             #       => [{"username": "user1", "password": "111111"}, {"username": "user2", "password": "222222"}]
-            parameter_content_list = []
-            for parameter_item in parameter_content:
-                if not isinstance(parameter_item, (list, tuple)):
-                    # "2.8.5" => ["2.8.5"]
-                    parameter_item = [parameter_item]
-
-                # ["app_version"], ["2.8.5"] => {"app_version": "2.8.5"}
-                # ["username", "password"], ["user1", "111111"] => {"username": "user1", "password": "111111"}
-                parameter_content_dict = dict(zip(parameter_name_list, parameter_item))
+            factors.append(params.ParameterRows(parameter_name, parameter_content))
+            continue
 
-                parameter_content_list.append(parameter_content_dict)
-        else:
-            # (2) & (3)
-            parsed_variables_mapping = parse_variables_mapping(
-                variables_mapping
-            )
-            parsed_parameter_content = eval_lazy_data(
-                parameter_content,
-                parsed_variables_mapping,
-                functions_mapping
-            )
-            if not isinstance(parsed_parameter_content, list):
-                raise exceptions.ParamsError("parameters syntax error!")
-
-            parameter_content_list = []
-            for parameter_item in parsed_parameter_content:
-                if isinstance(parameter_item, dict):
-                    # get subset by parameter name
-                    # {"app_version": "${gen_app_version()}"}
-                    # gen_app_version() => [{'app_version': '2.8.5'}, {'app_version': '2.8.6'}]
-                    # {"username-password": "${get_account()}"}
-                    # get_account() => [
-                    #       {"username": "user1", "password": "111111"},
-                    #       {"username": "user2", "password": "222222"}
-                    # ]
-                    parameter_dict = {key: parameter_item[key] for key in parameter_name_list}
-                elif isinstance(parameter_item, (list, tuple)):
-                    # {"username-password": "${get_account()}"}
-                    # get_account() => [("user1", "111111"), ("user2", "222222")]
-                    parameter_dict = dict(zip(parameter_name_list, parameter_item))
-                elif len(parameter_name_list) == 1:
-                    # {"user_agent": "${get_user_agent()}"}
-                    # get_user_agent() => ["iOS/10.1", "iOS/10.2"]
-                    parameter_dict = {
-                        parameter_name_list[0]: parameter_item
-                    }
+        # (2) & (3)
+        if parsed_variables_mapping is None:
+            parsed_variables_mapping = parse_variables_mapping(variables_mapping)
+
+        csv_file = _csv_file_of(parameter_content, parsed_variables_mapping, functions_mapping)
+        if csv_file is not None:
+            # raise CSVNotFound at once, then read csv file again for each row of former
+            # parameters instead of keeping it in memory
+            loader.iter_csv_file(csv_file)
+            factors.append(params.ParameterRows(
+                parameter_name, lambda csv_file=csv_file: loader.iter_csv_file(csv_file), evaluated=True))
+            continue
 
-                parameter_content_list.append(parameter_dict)
+        parsed_parameter_content = eval_lazy_data(
+            parameter_content,
+            parsed_variables_mapping,
+            functions_mapping
+        )
+        if not isinstance(parsed_parameter_content, list):
+            raise exceptions.ParamsError("parameters syntax error!")
 
-        parsed_parameters_list.append(parameter_content_list)
+        # {"app_version": "${gen_app_version()}"}
+        # gen_app_version() => [{'app_version': '2.8.5'}, {'app_version': '2.8.6'}]
+        # {"username-password": "${get_account()}"}
+        # get_account() => [("user1", "111111"), ("user2", "222222")]
+        factors.append(params.ParameterRows(parameter_name, parsed_parameter_content, evaluated=True))
 
-    return utils.gen_cartesian_product(*parsed_parameters_list)
+    return params.sample_product(factors, sampling)
 
 
 def get_uniform_comparator(comparator):
@@ -510,6 +532,106 @@ def parse_function_params(params):
     return function_meta
 
 
+TemplatePlan = collections.namedtuple("TemplatePlan", ["lazy", "string", "args"])
+""" compiled template of raw string, shared by all LazyString of the same raw string.
+    lazy (bool): whether raw string contains variable or function.
+    string (str): format string, functions and variables are replaced with {}.
+    args (tuple): ("variable", var_name) or ("function", (func_name, args, kwargs_items)).
+"""
+
+TEMPLATE_CACHE_MAX_LENGTH = 4096
+template_cache = cache.LRUCache(maxsize=10000)
+""" compiled templates, keyed by raw string.
+    functions and variables are resolved by each LazyString, so the plan does not depend on them.
+"""
+
+
+def _escape_braces(origin_string):
+    return origin_string.replace("{", "{{").replace("}", "}}")
+
+
+def _compile_template(raw_string):
+    if not is_var_or_func_exist(raw_string):
+        return TemplatePlan(False, raw_string.replace("$$", "$"), ())
+
+    args = []
+    match_start_position = raw_string.index("$", 0)
+    string = _escape_braces(raw_string[0:match_start_position])
+
+    while match_start_position < len(raw_string):
+
+        # Notice: notation priority
+        # $$ > ${func($a, $b)} > $var
+
+        # search $$
+        dollar_match = dolloar_regex_compile.match(raw_string, match_start_position)
+        if dollar_match:
+            match_start_position = dollar_match.end()
+            string += "$"
+            continue
+
+        # search function like ${func($a, $b)}
+        func_match = function_regex_compile.match(raw_string, match_start_position)
+        if func_match:
+            function_meta = parse_function_params(func_match.group(2))
+            args.append(("function", (
+                func_match.group(1),
+                tuple(function_meta["args"]),
+                tuple(function_meta["kwargs"].items())
+            )))
+            match_start_position = func_match.end()
+            string += "{}"
+            continue
+
+        # search variable like ${var} or $var
+        var_match = variable_regex_compile.match(raw_string, match_start_position)
+        if var_match:
+            args.append(("variable", var_match.group(1) or var_match.group(2)))
+            match_start_position = var_match.end()
+            string += "{}"
+            continue
+
+        curr_position = match_start_position
+        try:
+            # find next $ location
+            match_start_position = raw_string.index("$", curr_position + 1)
+            remain_string = raw_string[curr_position:match_start_position]
+        except ValueError:
+            remain_string = raw_string[curr_position:]
+            # break while loop
+            match_start_position = len(raw_string)
+
+        string += _escape_braces(remain_string)
+
+    return TemplatePlan(True, string, tuple(args))
+
+
+def compile_template(raw_string):
+    """ compile raw string to TemplatePlan, each distinct raw string is compiled once.
+
+    Args:
+        raw_string (str): e.g. "ABC${func2($a, $b)}DE$c"
+
+    Returns:
+        TemplatePlan: e.g. TemplatePlan(True, "ABC{}DE{}", (("function", ("func2", ("$a", "$b"), ())), ("variable", "c")))
+
+    """
+    if "$" not in raw_string:
+        return TemplatePlan(False, raw_string, ())
+    if len(raw_string) > TEMPLATE_CACHE_MAX_LENGTH:
+        # large bodies rarely repeat, do not keep them in cache
+        return _compile_template(raw_string)
+
+    plan = template_cache.get(raw_string)
+    counter = cache.get_template_stats()
+    if counter is not None:
+        counter.count(plan is not None)
+    if plan is None:
+        plan = _compile_template(raw_string)
+        template_cache.put(raw_string, plan)
+    return plan
+
+
 class LazyFunction(object):
     """ call function lazily.
     """
@@ -528,7 +650,6 @@ class LazyFunction(object):
         """
         self.functions_mapping = functions_mapping or {}
         self.check_variables_set = check_variables_set or set()
-        self.cache_key = None
         self.__parse(function_meta)
 
     def __parse(self, function_meta):
@@ -585,23 +706,32 @@ class LazyFunction(object):
 
         return f"LazyFunction({self.func_name}({args_string}))"
 
-    def __prepare_cache_key(self, args, kwargs):
-        return self.func_name, repr(args), repr(kwargs)
-
-    def to_value(self, variables_mapping=None):
+    def to_value(self, variables_mapping=None, cached=False, args=None):
         """ parse lazy data with evaluated variables mapping.
             Notice: variables_mapping should not contain any variable or function.
+
+        Args:
+            variables_mapping (dict): evaluated variables mapping
+            cached (bool): reuse result of the same call in current run, functions marked
+                with cache.cacheable() are always cached.
+            args (list): call with these args instead of the parsed ones, e.g. evaluated
+                validator args, the LazyFunction itself is left unchanged.
+
         """
         variables_mapping = variables_mapping or {}
-        args = parse_lazy_data(self._args, variables_mapping)
+        args = parse_lazy_data(self._args if args is None else args, variables_mapping)
         kwargs = parse_lazy_data(self._kwargs, variables_mapping)
-        self.cache_key = self.__prepare_cache_key(args, kwargs)
-        return self._func(*args, **kwargs)
 
+        function_cache = cache.get_function_cache()
+        if function_cache is None or not (cached or cache.is_cacheable(self._func)):
+            return self._func(*args, **kwargs)
 
-cached_functions_mapping = {}
-""" cached function calling results.
-"""
+        cache_key = (self.func_name, id(self._func), repr(args), repr(kwargs))
+        return function_cache.get_or_set(
+            cache_key,
+            lambda: self._func(*args, **kwargs),
+            getattr(self._func, "__hrun_cache_ttl__", None)
+        )
 
 
 class LazyString(object):
@@ -619,7 +749,7 @@ class LazyString(object):
         self.__parse(raw_string)
 
     def __parse(self, raw_string):
-        """ parse raw string, replace function and variable with {}
+        """ parse raw string with its compiled template plan
 
         Args:
             raw_string(str): string with functions or varialbes
@@ -627,75 +757,28 @@ class LazyString(object):
 
         Returns:
             string: "ABC{}DE{}"
-            args: ["${func2($a, $b)}", "$c"]
+            args: [LazyFunction(func2($a, $b)), "c"]
 
         """
+        plan = compile_template(raw_string)
+        # plain strings are not escaped in the plan, escape them for str.format
+        self._string = plan.string if plan.lazy else _escape_braces(plan.string)
         self._args = []
 
-        def escape_braces(origin_string):
-            return origin_string.replace("{", "{{").replace("}", "}}")
-
-        try:
-            match_start_position = raw_string.index("$", 0)
-            begin_string = raw_string[0:match_start_position]
-            self._string = escape_braces(begin_string)
-        except ValueError:
-            self._string = escape_braces(raw_string)
-            return
-
-        while match_start_position < len(raw_string):
-
-            # Notice: notation priority
-            # $$ > ${func($a, $b)} > $var
-
-            # search $$
-            dollar_match = dolloar_regex_compile.match(raw_string, match_start_position)
-            if dollar_match:
-                match_start_position = dollar_match.end()
-                self._string += "$"
-                continue
-
-            # search function like ${func($a, $b)}
-            func_match = function_regex_compile.match(raw_string, match_start_position)
-            if func_match:
-                function_meta = {
-                    "func_name": func_match.group(1)
-                }
-                function_meta.update(parse_function_params(func_match.group(2)))
+        for arg_type, arg in plan.args:
+            if arg_type == "function":
+                func_name, args, kwargs = arg
                 lazy_func = LazyFunction(
-                    function_meta,
+                    {"func_name": func_name, "args": list(args), "kwargs": dict(kwargs)},
                     self.functions_mapping,
                     self.check_variables_set
                 )
                 self._args.append(lazy_func)
-                match_start_position = func_match.end()
-                self._string += "{}"
-                continue
-
-            # search variable like ${var} or $var
-            var_match = variable_regex_compile.match(raw_string, match_start_position)
-            if var_match:
-                var_name = var_match.group(1) or var_match.group(2)
+            else:
                 # check if any variable undefined in check_variables_set
-                if var_name not in self.check_variables_set:
-                    raise exceptions.VariableNotFound(var_name)
-
-                self._args.append(var_name)
-                match_start_position = var_match.end()
-                self._string += "{}"
-                continue
-
-            curr_position = match_start_position
-            try:
-                # find next $ location
-                match_start_position = raw_string.index("$", curr_position + 1)
-                remain_string = raw_string[curr_position:match_start_position]
-            except ValueError:
-                remain_string = raw_string[curr_position:]
-                # break while loop
-                match_start_position = len(raw_string)
-
-            self._string += escape_braces(remain_string)
+                if arg not in self.check_variables_set:
+                    raise exceptions.VariableNotFound(arg)
+                self._args.append(arg)
 
     def __repr__(self):
         return f"LazyString({self.raw_string})"
@@ -709,12 +792,7 @@ class LazyString(object):
         args = []
         for arg in self._args:
             if isinstance(arg, LazyFunction):
-                if self.cached and arg.cache_key and arg.cache_key in cached_functions_mapping:
-                    value = cached_functions_mapping[arg.cache_key]
-                else:
-                    value = arg.to_value(variables_mapping)
-                    cached_functions_mapping[arg.cache_key] = value
-                args.append(value)
+                args.append(arg.to_value(variables_mapping, self.cached))
             else:
                 # variable
                 var_value = get_mapping_variable(arg, variables_mapping)
@@ -769,11 +847,12 @@ def prepare_lazy_data(content, functions_mapping=None, check_variables_set=None,
 
     elif isinstance(content, str):
         # content is in string format here
-        if not is_var_or_func_exist(content):
+        plan = compile_template(content)
+        if not plan.lazy:
             # content is neither variable nor function
             # replace $$ notation with $ and consider it as normal char.
             # e.g. abc => abc, abc$$def => abc$def, abc$$$$def$$h => abc$$def$h
-            return content.replace("$$", "$")
+            return plan.string
 
         functions_mapping = functions_mapping or {}
         check_variables_set = check_variables_set or set()
@@ -849,8 +928,55 @@ def extract_variables(content):
     return set()
 
 
-def parse_variables_mapping(variables_mapping):
+def _sort_variables(variables_mapping, dependencies):
+    """ sort variables so that each variable comes after the variables it references,
+        independent variables keep their order in variables_mapping.
+
+    Args:
+        variables_mapping (dict): variables to sort
+        dependencies (dict): {var_name: set of referenced var names in variables_mapping}
+
+    Returns:
+        list: sorted variable names
+
+    Raises:
+        exceptions.VariableCircularReference: variables reference each other.
+
+    """
+    sorted_names = []
+    # 1: visiting, 2: visited
+    state = {}
+
+    for root in variables_mapping:
+        if root in state:
+            continue
+
+        # iterative depth first search, path holds (var_name, iterator of its dependencies)
+        state[root] = 1
+        path = [(root, iter(dependencies[root]))]
+        while path:
+            var_name, children = path[-1]
+            for child in children:
+                child_state = state.get(child)
+                if child_state == 1:
+                    cycle = [name for name, _ in path]
+                    cycle = cycle[cycle.index(child):] + [child]
+                    raise exceptions.VariableCircularReference(cycle)
+                if child_state is None:
+                    state[child] = 1
+                    path.append((child, iter(dependencies[child])))
+                    break
+            else:
+                state[var_name] = 2
+                sorted_names.append(var_name)
+                path.pop()
+
+    return sorted_names
+
+
+def parse_variables_mapping(variables_mapping, resolved_mapping=None):
     """ eval each prepared variable and function in variables_mapping.
+        variables are evaluated once each, in the order of their references.
 
     Args:
         variables_mapping (dict):
@@ -863,6 +989,8 @@ def parse_variables_mapping(variables_mapping):
                 "c": {"key": LazyString($b)},
                 "d": [LazyString($a), 3]
             }
+        resolved_mapping (dict): evaluated variables that can be referenced,
+            they are not evaluated again and not included in result.
 
     Returns:
         dict: parsed variables_mapping should not contain any variable or function.
@@ -876,49 +1004,63 @@ def parse_variables_mapping(variables_mapping):
                 "d": [1, 3]
             }
 
-    """
-    run_times = 0
-    parsed_variables_mapping = {}
-
-    while len(parsed_variables_mapping) != len(variables_mapping):
-        for var_name in variables_mapping:
-
-            run_times += 1
-            if run_times > len(variables_mapping) * 4:
-                not_found_variables = {
-                    key: variables_mapping[key]
-                    for key in variables_mapping
-                    if key not in parsed_variables_mapping
-                }
-                raise exceptions.VariableNotFound(not_found_variables)
-
-            if var_name in parsed_variables_mapping:
-                continue
+    Raises:
+        exceptions.VariableNotFound: variable references itself or undefined variable.
+        exceptions.VariableCircularReference: variables reference each other.
 
-            value = variables_mapping[var_name]
-            variables = extract_variables(value)
-
-            # check if reference variable itself
-            if var_name in variables:
-                # e.g.
-                # var_name = "token"
-                # variables_mapping = {"token": LazyString($token)}
-                # var_name = "key"
-                # variables_mapping = {"key": [LazyString($key), 2]}
-                raise exceptions.VariableNotFound(var_name)
-
-            if variables:
-                # reference other variable, or function call with other variable
-                # e.g. {"varA": "123$varB", "varB": "456$varC"}
-                # e.g. {"varC": "${sum_two($a, $b)}"}
-                if any([_var_name not in parsed_variables_mapping for _var_name in variables]):
-                    # reference variable not parsed
-                    continue
+    """
+    resolved_mapping = resolved_mapping or {}
+    dependencies = {}
+    missing = {}
+
+    for var_name, value in variables_mapping.items():
+        variables = extract_variables(value)
+
+        # check if reference variable itself
+        if var_name in variables:
+            # e.g.
+            # var_name = "token"
+            # variables_mapping = {"token": LazyString($token)}
+            # var_name = "key"
+            # variables_mapping = {"key": [LazyString($key), 2]}
+            raise exceptions.VariableNotFound(var_name)
+
+        dependencies[var_name] = {
+            _var_name for _var_name in variables if _var_name in variables_mapping
+        }
+        if any(_var_name not in variables_mapping and _var_name not in resolved_mapping
+               for _var_name in variables):
+            missing[var_name] = value
+
+    if missing:
+        # variables referencing undefined variables, directly or indirectly
+        not_found = set(missing)
+        changed = True
+        while changed:
+            changed = False
+            for var_name, _var_names in dependencies.items():
+                if var_name not in not_found and _var_names & not_found:
+                    not_found.add(var_name)
+                    changed = True
+
+        raise exceptions.VariableNotFound({
+            key: variables_mapping[key]
+            for key in variables_mapping
+            if key in not_found
+        })
 
-            parsed_value = parse_lazy_data(value, parsed_variables_mapping)
-            parsed_variables_mapping[var_name] = parsed_value
+    parsed_variables_mapping = {}
+    context_mapping = dict(resolved_mapping)
+    for var_name in _sort_variables(variables_mapping, dependencies):
+        parsed_value = parse_lazy_data(variables_mapping[var_name], context_mapping)
+        parsed_variables_mapping[var_name] = parsed_value
+        context_mapping[var_name] = parsed_value
 
-    return parsed_variables_mapping
+    # keep the order of variables_mapping
+    return {
+        var_name: parsed_variables_mapping[var_name]
+        for var_name in variables_mapping
+    }
 
 
 def _extend_with_api(test_dict, api_def_dict):
@@ -1053,7 +1195,7 @@ def __prepare_config(config, project_mapping, session_variables_set=None):
     # get config variables
     raw_config_variables = config.pop("variables", {})
 
-    override_variables = utils.deepcopy_dict(project_mapping.get("variables", {}))
+    override_variables = project_mapping.get("variables", {})
     functions = project_mapping.get("functions", {})
 
     if isinstance(raw_config_variables, str) and function_regex_compile.match(
@@ -1260,6 +1402,68 @@ def _parse_testcase(testcase, project_mapping, session_variables_set=None):
         return None
 
 
+def _overlay_teststeps(tests, overlay_variables):
+    """ copy parsed teststeps on write: request, validate, extract, etc. are shared with
+        the template, only variables are chained with overlay_variables.
+        each teststep gets its own front map, runtime writes (e.g. output variables of
+        former nested testcase) do not leak into sibling teststeps.
+    """
+    overlaid_tests = []
+    for test_dict in tests:
+        test_dict = dict(test_dict)
+        if "variables" in test_dict:
+            test_dict["variables"] = collections.ChainMap({}, overlay_variables, test_dict["variables"])
+        if "teststeps" in test_dict:
+            # nested testcase
+            test_dict["config"] = dict(test_dict["config"])
+            test_dict["config"]["variables"] = collections.ChainMap(
+                {}, overlay_variables, test_dict["config"].get("variables", {}))
+            test_dict["teststeps"] = _overlay_teststeps(test_dict["teststeps"], overlay_variables)
+        overlaid_tests.append(test_dict)
+
+    return overlaid_tests
+
+
+def _overlay_parameters(template, parameter_variables, config_variables, project_mapping):
+    """ build parsed testcase of one parameter row from the parsed template testcase.
+
+    Args:
+        template (dict): parsed testcase of the first parameter row
+        parameter_variables (dict): parameter row, e.g. {"uid": 101}
+        config_variables (dict): parsed testcase config variables
+        project_mapping (dict): project variables override parameters
+
+    Returns:
+        dict: parsed testcase, variables of config and teststeps are chained as
+            parameter row => template.
+
+    """
+    override_variables = project_mapping.get("variables", {})
+    row_variables = {
+        key: value
+        for key, value in parameter_variables.items()
+        if key not in override_variables
+    }
+    template_config = template["config"]
+    row_variables = prepare_lazy_data(
+        row_variables,
+        project_mapping.get("functions", {}),
+        set(template_config.get("variables", {}).keys()),
+        cached=True
+    )
+
+    config = dict(template_config)
+    config["variables"] = collections.ChainMap({}, row_variables, template_config.get("variables", {}))
+    config["name"] = parse_lazy_data(
+        template_config["name"],
+        collections.ChainMap(override_variables, parameter_variables, config_variables)
+    )
+    parsed_testcase = dict(template)
+    parsed_testcase["config"] = config
+    parsed_testcase["teststeps"] = _overlay_teststeps(template["teststeps"], row_variables)
+    return parsed_testcase
+
+
 def __get_parsed_testsuite_testcases(testcases, testsuite_config, project_mapping):
     """ override testscases with testsuite config variables, base_url and verify.
 
@@ -1302,11 +1506,13 @@ def __get_parsed_testsuite_testcases(testcases, testsuite_config, project_mappin
                 "functions": {}
             }
 
+    Returns:
+        generator: parsed testcases, parameterized testcases are generated row by row.
+
     """
     testsuite_base_url = testsuite_config.get("base_url")
     testsuite_config_variables = testsuite_config.get("variables", {})
     functions = project_mapping.get("functions", {})
-    parsed_testcase_list = []
 
     for testcase_name, testcase in testcases.items():
 
@@ -1344,51 +1550,55 @@ def __get_parsed_testsuite_testcases(testcases, testsuite_config, project_mappin
 
         # parse parameters
         if "parameters" in testcase and testcase["parameters"]:
-            cartesian_product_parameters = parse_parameters(
+            cartesian_product_parameters = iter_parameters(
                 testcase["parameters"],
                 parsed_config_variables,
                 functions
             )
 
+            # parse testcase once with the first parameter row as template,
+            # other rows share it and only store their own parameter values.
+            template = None
             for parameter_variables in cartesian_product_parameters:
-                # deepcopy to avoid influence between parameters
-                testcase_copied = utils.deepcopy_dict(parsed_testcase)
-                parsed_config_variables_copied = utils.deepcopy_dict(parsed_config_variables)
-                testcase_copied["config"]["variables"] = utils.extend_variables(
-                    parsed_config_variables_copied,
-                    parameter_variables
-                )
-                parsed_testcase_copied = _parse_testcase(testcase_copied, project_mapping)
-                if not parsed_testcase_copied:
-                    continue
-                parsed_testcase_copied["config"]["name"] = parse_lazy_data(
-                    parsed_testcase_copied["config"]["name"],
-                    testcase_copied["config"]["variables"]
-                )
-                parsed_testcase_list.append(parsed_testcase_copied)
+                if template is None:
+                    parsed_testcase["config"]["variables"] = utils.extend_variables(
+                        dict(parsed_config_variables),
+                        parameter_variables
+                    )
+                    template = _parse_testcase(parsed_testcase, project_mapping)
+                    if not template:
+                        break
+
+                yield _overlay_parameters(template, parameter_variables, parsed_config_variables, project_mapping)
 
         else:
             parsed_testcase = _parse_testcase(parsed_testcase, project_mapping)
             if not parsed_testcase:
                 continue
-            parsed_testcase_list.append(parsed_testcase)
-
-    return parsed_testcase_list
+            yield parsed_testcase
 
 
 def _parse_testsuite(testsuite, project_mapping):
+    """ parse testsuite, testcases are generated lazily.
+    """
     testsuite.setdefault("config", {})
     prepared_config = __prepare_config(testsuite["config"], project_mapping)
-    parsed_testcase_list = __get_parsed_testsuite_testcases(
+    return __get_parsed_testsuite_testcases(
         testsuite["testcases"],
         prepared_config,
         project_mapping
     )
-    return parsed_testcase_list
 
 
 def parse_tests(tests_mapping):
-    """ parse tests and load to parsed testcases
+    """ parse tests and load to parsed testcases list, see iter_parse_tests().
+    """
+    return list(iter_parse_tests(tests_mapping))
+
+
+def iter_parse_tests(tests_mapping):
+    """ parse tests and generate parsed testcases one by one,
+        parameterized testcases are generated while iterating.
         tests include api, testcases and testsuites.
 
     Args:
@@ -1453,7 +1663,6 @@ def parse_tests(tests_mapping):
 
     """
     project_mapping = tests_mapping.get("project_mapping", {})
-    testcases = []
 
     for test_type in tests_mapping:
 
@@ -1461,9 +1670,7 @@ def parse_tests(tests_mapping):
             # load testcases of testsuite
             testsuites = tests_mapping["testsuites"]
             for testsuite in testsuites:
-                parsed_testcases = _parse_testsuite(testsuite, project_mapping)
-                for parsed_testcase in parsed_testcases:
-                    testcases.append(parsed_testcase)
+                yield from _parse_testsuite(testsuite, project_mapping)
 
         elif test_type == "testcases":
             for testcase in tests_mapping["testcases"]:
@@ -1471,7 +1678,7 @@ def parse_tests(tests_mapping):
                 parsed_testcase = _parse_testcase(testcase, project_mapping)
                 if not parsed_testcase:
                     continue
-                testcases.append(parsed_testcase)
+                yield parsed_testcase
 
         elif test_type == "apis":
             # encapsulate api as a testcase
@@ -1487,6 +1694,4 @@ def parse_tests(tests_mapping):
                 parsed_testcase = _parse_testcase(testcase, project_mapping)
                 if not parsed_testcase:
                     continue
-                testcases.append(parsed_testcase)
-
-    return testcases
+                yield parsed_testcase
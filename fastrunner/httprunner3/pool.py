@@ -0,0 +1,187 @@
+# encoding: utf-8
+
+""" process-wide HTTP connection pool shared by HttpSession instances.
+
+Each testcase still owns its HttpSession (cookies, meta_data), only the transport
+adapter is shared, so TCP/TLS connections are kept alive across testcases.
+"""
+
+import ipaddress
+import socket
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# counters of the current thread, HttpSession reads the delta around each request
+_local = threading.local()
+
+_adapters = {}
+_adapters_lock = threading.Lock()
+
+
+def _incr(key):
+    setattr(_local, key, getattr(_local, key, 0) + 1)
+
+
+def _is_ip(host):
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return False
+    return True
+
+
+def thread_stats():
+    """ get pool counters of current thread.
+
+    Returns:
+        dict: {"requests": int, "new_connections": int, "dns_hits": int, "dns_misses": int}
+
+    """
+    return {
+        "requests": getattr(_local, "requests", 0),
+        "new_connections": getattr(_local, "new_connections", 0),
+        "dns_hits": getattr(_local, "dns_hits", 0),
+        "dns_misses": getattr(_local, "dns_misses", 0),
+    }
+
+
+class DNSCache(object):
+    """ resolve host names with a TTL cache.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host, port):
+        """ get cached address of host, resolve it when missing or expired.
+
+        Args:
+            host (str): host name
+            port (int): port, used by getaddrinfo only
+
+        Returns:
+            str: ip address, or host itself when caching is disabled or host is an ip
+
+        """
+        if self.ttl <= 0 or _is_ip(host):
+            return host
+
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(host)
+        if cached and cached[1] > now:
+            _incr("dns_hits")
+            return cached[0]
+
+        _incr("dns_misses")
+        address = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][4][0]
+        with self._lock:
+            self._cache[host] = (address, now + self.ttl)
+        return address
+
+    def invalidate(self, host):
+        with self._lock:
+            self._cache.pop(host, None)
+
+
+class _CachedDNSMixin(object):
+    """ connect to cached address, host name is still used for Host header, SNI and cert verification.
+    """
+    dns_cache = None
+
+    def _new_conn(self):
+        _incr("new_connections")
+        if self.dns_cache is None:
+            return super()._new_conn()
+
+        host = self._dns_host
+        self._dns_host = self.dns_cache.resolve(host, self.port)
+        try:
+            return super()._new_conn()
+        except Exception:
+            self.dns_cache.invalidate(host)
+            raise
+        finally:
+            self._dns_host = host
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """ HTTPAdapter with DNS caching and new connection counting, shared across sessions.
+    """
+
+    def __init__(self, dns_ttl=60, **kwargs):
+        dns_cache = DNSCache(dns_ttl)
+        self._connection_cls = {
+            "http": type("CachedHTTPConnection", (_CachedDNSMixin, HTTPConnection), {"dns_cache": dns_cache}),
+            "https": type("CachedHTTPSConnection", (_CachedDNSMixin, HTTPSConnection), {"dns_cache": dns_cache}),
+        }
+        self.dns_cache = dns_cache
+        super(PooledHTTPAdapter, self).__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        _incr("requests")
+        return super(PooledHTTPAdapter, self).send(request, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(PooledHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("CachedHTTPConnectionPool", (HTTPConnectionPool,),
+                         {"ConnectionCls": self._connection_cls["http"]}),
+            "https": type("CachedHTTPSConnectionPool", (HTTPSConnectionPool,),
+                          {"ConnectionCls": self._connection_cls["https"]}),
+        }
+
+
+def summarize_stats(sessions_stats):
+    """ sum pool stats of sessions, connections not newly created were reused from the pool.
+
+    Args:
+        sessions_stats (list): HttpSession.pool_stats of each testcase.
+
+    Returns:
+        dict: {"requests", "hits", "misses", "dns_hits", "dns_misses"}
+
+    """
+    total = {"requests": 0, "new_connections": 0, "dns_hits": 0, "dns_misses": 0}
+    for stats in sessions_stats:
+        for key in total:
+            total[key] += stats.get(key, 0)
+
+    return {
+        "requests": total["requests"],
+        "hits": max(total["requests"] - total["new_connections"], 0),
+        "misses": total["new_connections"],
+        "dns_hits": total["dns_hits"],
+        "dns_misses": total["dns_misses"],
+    }
+
+
+def get_adapter(pool_connections=10, pool_maxsize=10, dns_ttl=60, max_retries=0):
+    """ get the process-wide adapter for given pool options, created on first use.
+
+    Args:
+        pool_connections (int): number of hosts to keep connection pools for.
+        pool_maxsize (int): max keep-alive connections per host.
+        dns_ttl (int): seconds to cache resolved addresses, 0 to disable.
+        max_retries (int): retries of failed connections.
+
+    Returns:
+        PooledHTTPAdapter
+
+    """
+    key = (pool_connections, pool_maxsize, dns_ttl, max_retries)
+    with _adapters_lock:
+        if key not in _adapters:
+            _adapters[key] = PooledHTTPAdapter(
+                dns_ttl=dns_ttl,
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=max_retries
+            )
+        return _adapters[key]
@@ -26,6 +26,12 @@ def detect_encoding(value):
         return "utf-8"
 
 
+def __stringify_binary(value, content_type):
+    """ stringify binary data to base64 data url, so that summary is always json serializable
+    """
+    return "data:{};base64,{}".format(content_type, b64encode(value).decode("ascii"))
+
+
 def __stringify_request(request_data):
     """ stringfy HTTP request data
 
@@ -70,7 +76,8 @@ def __stringify_request(request_data):
                         pass
                 value = escape(value)
             except UnicodeDecodeError:
-                pass
+                # binary body, e.g. protobuf
+                value = __stringify_binary(value, "application/octet-stream")
 
         elif not isinstance(value, (str, bytes, int, float, Iterable)):
             # class instance, e.g. MultipartEncoder()
@@ -122,14 +129,11 @@ def __stringify_response(response_data):
 
                 if key == "body" and "image" in response_data["content_type"]:
                     # display image
-                    value = "data:{};base64,{}".format(
-                        response_data["content_type"],
-                        b64encode(value).decode(encoding)
-                    )
+                    value = __stringify_binary(value, response_data["content_type"])
                 else:
                     value = escape(value.decode(encoding))
             except UnicodeDecodeError:
-                pass
+                value = __stringify_binary(value, response_data["content_type"] or "application/octet-stream")
 
         elif not isinstance(value, (str, bytes, int, float, Iterable)):
             # class instance, e.g. MultipartEncoder()
@@ -186,16 +190,35 @@ def __get_total_response_time(meta_datas_expanded):
         return "N/A"
 
 
-def __stringify_meta_datas(meta_datas):
-
+def __stringify_meta_datas(meta_datas, meta_datas_expanded):
+    """ stringify and expand meta_datas in one pass
+    """
     if isinstance(meta_datas, list):
         for _meta_data in meta_datas:
-            __stringify_meta_datas(_meta_data)
+            __stringify_meta_datas(_meta_data, meta_datas_expanded)
     elif isinstance(meta_datas, dict):
-        data_list = meta_datas["data"]
-        for data in data_list:
+        for data in meta_datas["data"]:
             __stringify_request(data["request"])
             __stringify_response(data["response"])
+        meta_datas_expanded.append(meta_datas)
+
+
+def stringify_record(record):
+    """ stringify one test record in place, request/response data is converted to serializable
+        values, meta_datas is expanded and total response time is calculated in the same pass.
+
+    Args:
+        record (dict): record of HtmlTestResult, {"name": str, "status": str, "meta_datas": dict/list}
+
+    Returns:
+        list: expanded meta_datas
+
+    """
+    meta_datas_expanded = []
+    __stringify_meta_datas(record["meta_datas"], meta_datas_expanded)
+    record["meta_datas_expanded"] = meta_datas_expanded
+    record["response_time"] = __get_total_response_time(meta_datas_expanded)
+    return meta_datas_expanded
 
 
 def stringify_summary(summary):
@@ -207,9 +230,4 @@ def stringify_summary(summary):
             suite_summary["name"] = f"testcase {index}"
 
         for record in suite_summary.get("records"):
-            meta_datas = record['meta_datas']
-            __stringify_meta_datas(meta_datas)
-            meta_datas_expanded = []
-            __expand_meta_datas(meta_datas, meta_datas_expanded)
-            record["meta_datas_expanded"] = meta_datas_expanded
-            record["response_time"] = __get_total_response_time(meta_datas_expanded)
+            stringify_record(record)
@@ -1,3 +1,4 @@
+import collections
 import json
 import re
 from collections import OrderedDict
@@ -5,10 +6,111 @@ from collections import OrderedDict
 import jsonpath
 from loguru import logger
 # from fastrunner.httprunner3 import logger
-from fastrunner.httprunner3 import exceptions, utils
+from fastrunner.httprunner3 import cache, exceptions, utils
 
 text_extractor_regexp_compile = re.compile(r".*\(.*\).*")
 
+# jsonpath only made up of names and indexes, e.g. $.data.items[0].id, $.data.items.0.id
+simple_jsonpath_regexp_compile = re.compile(r"^\$(?:\.[\w-]+|\[\d+\])+$")
+simple_jsonpath_key_regexp_compile = re.compile(r"[\w-]+")
+
+ExtractorPlan = collections.namedtuple("ExtractorPlan", ["kind", "top_query", "sub_query", "keys", "pattern"])
+""" compiled extractor, shared by all extractions and validations of the same field.
+    kind (str): jsonpath, regex or delimiter.
+    top_query (str): delimiter only, e.g. "content" of "content.person.name".
+    sub_query (str): delimiter only, e.g. "person.name" of "content.person.name", None if not specified.
+    keys (tuple): sub_query split by utils.split_query(), or keys of simple jsonpath,
+        None for other jsonpath which is evaluated by jsonpath library.
+    pattern: compiled regex, regex only.
+"""
+
+extractor_cache = cache.LRUCache(maxsize=4096)
+""" compiled extractors, keyed by field.
+"""
+
+
+def _compile_extractor(field):
+    if field.startswith("$"):
+        keys = None
+        if simple_jsonpath_regexp_compile.match(field):
+            keys = utils.split_query(".".join(simple_jsonpath_key_regexp_compile.findall(field)))
+        return ExtractorPlan("jsonpath", None, None, keys, None)
+
+    if text_extractor_regexp_compile.match(field):
+        return ExtractorPlan("regex", None, None, None, re.compile(field))
+
+    # string.split(sep=None, maxsplit=1) -> list of strings
+    # e.g. "content.person.name" => ["content", "person.name"]
+    try:
+        top_query, sub_query = field.split('.', 1)
+    except ValueError:
+        top_query = field
+        sub_query = None
+
+    keys = utils.split_query(sub_query) if sub_query else None
+    return ExtractorPlan("delimiter", top_query, sub_query, keys, None)
+
+
+def compile_extractor(field):
+    """ compile extractor field to ExtractorPlan, each distinct field is compiled once.
+
+    Args:
+        field (str): e.g. "content.person.name", "$.data.items[0].id", "LB[\d]*(.*)RB[\d]*"
+
+    Returns:
+        ExtractorPlan: e.g. ExtractorPlan("delimiter", "content", "person.name", (("person", None), ("name", None)), None)
+
+    """
+    plan = extractor_cache.get(field)
+    if plan is None:
+        plan = _compile_extractor(field)
+        extractor_cache.put(field, plan)
+    return plan
+
+
+def _query_simple_jsonpath(json_body, keys):
+    """ walk json body like jsonpath library does for names and indexes: names are looked up
+        in dict, digits are also used as index of list, None if nothing matched.
+    """
+    for key, index in keys:
+        if isinstance(json_body, dict):
+            if key not in json_body:
+                return None
+            json_body = json_body[key]
+        elif isinstance(json_body, list) and key.isdigit() and index < len(json_body):
+            json_body = json_body[index]
+        else:
+            return None
+    return [json_body]
+
+
+def load_json(resp_obj):
+    """ decode json body of requests.Response once, the result is kept on the response
+        and shared by meta data recording, extraction and validation.
+
+    Args:
+        resp_obj (instance): requests.Response instance
+
+    Returns:
+        decoded json body
+
+    Raises:
+        ValueError: response body is not json
+
+    """
+    try:
+        cached = resp_obj._hrun_json
+    except AttributeError:
+        try:
+            cached = resp_obj.json()
+        except ValueError as ex:
+            cached = ex
+        resp_obj._hrun_json = cached
+
+    if isinstance(cached, ValueError):
+        raise cached
+    return cached
+
 
 class ResponseObject(object):
 
@@ -24,7 +126,7 @@ class ResponseObject(object):
     def __getattr__(self, key):
         try:
             if key == "json":
-                value = self.resp_obj.json()
+                value = load_json(self.resp_obj)
             elif key == "cookies":
                 value = self.resp_obj.cookies.get_dict()
             else:
@@ -37,12 +139,14 @@ class ResponseObject(object):
             logger.error(err_msg)
             raise exceptions.ParamsError(err_msg)
 
-    def _extract_field_with_jsonpath(self, field: str) -> list:
+    def _extract_field_with_jsonpath(self, field: str, keys=None) -> list:
         """ extract field from response content with jsonpath expression.
         JSONPath Docs: https://goessner.net/articles/JsonPath/
 
         Args:
             field: jsonpath expression, e.g. $.code, $..items.*.id
+            keys (tuple): keys of simple jsonpath compiled by compile_extractor(),
+                jsonpath library is skipped if specified.
 
         Returns:
             A list that extracted from json response example. 1) [200] 2) [1, 2]
@@ -78,21 +182,25 @@ class ResponseObject(object):
             json_body = self.json
             assert json_body
 
-            result = jsonpath.jsonpath(json_body, field)
+            if keys is None:
+                result = jsonpath.jsonpath(json_body, field)
+            else:
+                result = _query_simple_jsonpath(json_body, keys)
             assert result
             return result
-        except (AssertionError, exceptions.JSONDecodeError):
+        except (AssertionError, json.JSONDecodeError):
             err_msg = f"Failed to extract data with jsonpath! => {field}\n"
             err_msg += f"response body: {self.text}\n"
             logger.error(err_msg)
             raise exceptions.ExtractFailure(err_msg)
 
-    def _extract_field_with_regex(self, field):
+    def _extract_field_with_regex(self, field, pattern=None):
         """ extract field from response content with regex.
             requests.Response body could be json or html text.
 
         Args:
             field (str): regex string that matched r".*\(.*\).*"
+            pattern: field compiled by compile_extractor()
 
         Returns:
             str: matched content.
@@ -107,7 +215,7 @@ class ResponseObject(object):
             abc
 
         """
-        matched = re.search(field, self.text)
+        matched = (pattern or re.compile(field)).search(self.text)
         if not matched:
             err_msg = f"Failed to extract data with regex! => {field}\n"
             err_msg += f"response body: {self.text}\n"
@@ -116,7 +224,7 @@ class ResponseObject(object):
 
         return matched.group(1)
 
-    def _extract_field_with_delimiter(self, field):
+    def _extract_field_with_delimiter(self, field, plan=None):
         """ response content could be json or html text.
 
         Args:
@@ -128,15 +236,12 @@ class ResponseObject(object):
                 "content"
                 "headers.content-type"
                 "content.person.name.first_name"
+            plan (ExtractorPlan): field compiled by compile_extractor()
 
         """
-        # string.split(sep=None, maxsplit=1) -> list of strings
-        # e.g. "content.person.name" => ["content", "person.name"]
-        try:
-            top_query, sub_query = field.split('.', 1)
-        except ValueError:
-            top_query = field
-            sub_query = None
+        if plan is None:
+            plan = compile_extractor(field)
+        top_query, sub_query, keys = plan.top_query, plan.sub_query, plan.keys
 
         # status_code
         if top_query in ["status_code", "encoding", "ok", "reason", "url"]:
@@ -209,10 +314,10 @@ class ResponseObject(object):
 
             if isinstance(body, (dict, list)):
                 # content = {"xxx": 123}, content.xxx
-                return utils.query_json(body, sub_query)
+                return utils.query_json(body, sub_query, keys=keys)
             elif sub_query.isdigit():
                 # content = "abcdefg", content.3 => d
-                return utils.query_json(body, sub_query)
+                return utils.query_json(body, sub_query, keys=keys)
             else:
                 # content = "<html>abcdefg</html>", content.xxx
                 err_msg = f"Failed to extract attribute from response body! => {field}\n"
@@ -230,10 +335,10 @@ class ResponseObject(object):
 
             if isinstance(attributes, (dict, list)):
                 # attributes = {"xxx": 123}, content.xxx
-                return utils.query_json(attributes, sub_query)
+                return utils.query_json(attributes, sub_query, keys=keys)
             elif sub_query.isdigit():
                 # attributes = "abcdefg", attributes.3 => d
-                return utils.query_json(attributes, sub_query)
+                return utils.query_json(attributes, sub_query, keys=keys)
             else:
                 # content = "attributes.new_attribute_not_exist"
                 err_msg = f"Failed to extract cumstom set attribute from teardown hooks! => {field}\n"
@@ -259,17 +364,16 @@ class ResponseObject(object):
             logger.error(err_msg)
             raise exceptions.ParamsError(err_msg)
 
-        msg = f"extract: {field}"
-
-        if field.startswith("$"):
-            value = self._extract_field_with_jsonpath(field)
-        elif text_extractor_regexp_compile.match(field):
-            value = self._extract_field_with_regex(field)
+        plan = compile_extractor(field)
+        if plan.kind == "jsonpath":
+            value = self._extract_field_with_jsonpath(field, plan.keys)
+        elif plan.kind == "regex":
+            value = self._extract_field_with_regex(field, plan.pattern)
         else:
-            value = self._extract_field_with_delimiter(field)
+            value = self._extract_field_with_delimiter(field, plan)
 
-        msg += f"\t=> {value}"
-        logger.debug(msg)
+        # formatted only when debug level is enabled
+        logger.debug("extract: {}\t=> {}", field, value)
 
         return value
 
@@ -157,7 +157,7 @@ class Runner(object):
                 var_name, hook_content = list(action.items())[0]
                 hook_content_eval = self.session_context.eval_content(hook_content)
                 logger.debug(
-                    f"assignment with hook: {var_name} = {hook_content} => {hook_content_eval}")
+                    "assignment with hook: {} = {} => {}", var_name, hook_content, hook_content_eval)
                 self.session_context.update_test_variables(
                     var_name, hook_content_eval
                 )
@@ -241,7 +241,7 @@ class Runner(object):
             raise exceptions.ParamsError("URL or METHOD missed!")
 
         logger.info(f"{method} {parsed_url}")
-        logger.debug(f"request kwargs(raw): {parsed_test_request}")
+        logger.debug("request kwargs(raw): {}", parsed_test_request)
 
         # request
         resp = self.http_client_session.request(
@@ -290,7 +290,8 @@ class Runner(object):
             raise
 
         # validate
-        validators = test_dict.get("validate") or test_dict.get("validators") or []
+        # copy validators list, parsed teststeps may be shared between parameter rows
+        validators = list(test_dict.get("validate") or test_dict.get("validators") or [])
         validate_script = test_dict.get("validate_script", [])
         if validate_script:
             validators.append({
@@ -62,13 +62,36 @@ def build_url(base_url, path):
         raise ParamsError("base url missed!")
 
 
-def query_json(json_content, query, delimiter='.'):
+def split_query(query, delimiter='.'):
+    """ split query string into keys, list index of each key is converted in advance.
+
+    Args:
+        query (str): query string, e.g. "person.cities.0"
+        delimiter (str): delimiter symbol.
+
+    Returns:
+        tuple: (key, index) pairs, index is None if key is not an integer.
+            e.g. (("person", None), ("cities", None), ("0", 0))
+
+    """
+    keys = []
+    for key in query.split(delimiter):
+        try:
+            index = int(key)
+        except ValueError:
+            index = None
+        keys.append((key, index))
+    return tuple(keys)
+
+
+def query_json(json_content, query, delimiter='.', keys=None):
     """ Do an xpath-like query with json_content.
 
     Args:
         json_content (dict/list/string): content to be queried.
         query (str): query string.
         delimiter (str): delimiter symbol.
+        keys (tuple): keys split by split_query(), query is split on each call if not specified.
 
     Returns:
         str: queried result.
@@ -96,12 +119,17 @@ def query_json(json_content, query, delimiter='.'):
         >>> Guangzhou
 
     """
+    if keys is None:
+        keys = split_query(query, delimiter)
+
     raise_flag = False
-    response_body = f"response body: {json_content}\n"
+    origin_content = json_content
     try:
-        for key in query.split(delimiter):
+        for key, index in keys:
             if isinstance(json_content, (list, str, bytes)):
-                json_content = json_content[int(key)]
+                if index is None:
+                    raise ValueError(key)
+                json_content = json_content[index]
             elif isinstance(json_content, dict):
                 json_content = json_content[key]
             else:
@@ -112,8 +140,9 @@ def query_json(json_content, query, delimiter='.'):
         raise_flag = True
 
     if raise_flag:
+        # response body is formatted only on failure
         err_msg = f"Failed to extract! => {query}\n"
-        err_msg += response_body
+        err_msg += f"response body: {origin_content}\n"
         logger.error(err_msg)
         raise exceptions.ExtractFailure(err_msg)
 
@@ -213,10 +242,10 @@ def ensure_mapping_format(variables):
     """ ensure variables are in mapping format.
 
     Args:
-        variables (list/dict): original variables
+        variables (list/dict/ChainMap): original variables
 
     Returns:
-        dict: ensured variables in dict format
+        dict: ensured variables in dict format, ChainMap is returned as it is
 
     Examples:
         >>> variables = [
@@ -237,7 +266,7 @@ def ensure_mapping_format(variables):
 
         return variables_dict
 
-    elif isinstance(variables, dict):
+    elif isinstance(variables, (dict, collections.ChainMap)):
         return variables
 
     else:
@@ -299,7 +328,7 @@ def get_testcase_io(testcase):
     export_mapping = test_runner.export_variables(output_list)
 
     return {
-        "in": variables,
+        "in": dict(variables),
         "out": export_mapping
     }
 
@@ -462,6 +491,22 @@ def sleep(n_secs):
     create_file(os.path.join(project_name, ".gitignore"), ignore_content)
 
 
+def iter_chunks(iterable, size):
+    """ split iterable into lists of size items, the last one may be shorter.
+
+    Examples:
+        >>> list(iter_chunks(range(5), 2))
+            [[0, 1], [2, 3], [4]]
+
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 def gen_cartesian_product(*args):
     """ generate cartesian product for lists
 
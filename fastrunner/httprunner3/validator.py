@@ -163,7 +163,6 @@ def run_validate_script():
             check_item, expect_item = validator_args
             check_value = self.__eval_validator_check(check_item)
             expect_value = self.__eval_validator_expect(expect_item)
-            validator.update_args([check_value, expect_value])
 
             comparator = validator.func_name
             validator_dict = {
@@ -176,7 +175,10 @@ def run_validate_script():
             validate_msg = f"\nvalidate: {check_item} {comparator} {expect_value}({type(expect_value).__name__})"
 
             try:
-                validator.to_value(self.session_context.test_variables_mapping)
+                validator.to_value(
+                    self.session_context.test_variables_mapping,
+                    args=[check_value, expect_value]
+                )
                 validator_dict["check_result"] = "pass"
                 validate_msg += "\t==> pass"
                 logger.debug(validate_msg)
@@ -196,9 +198,6 @@ def run_validate_script():
 
             self.validation_results["validate_extractor"].append(validator_dict)
 
-            # restore validator args, in case of running multiple times
-            validator.update_args(validator_args)
-
         if not validate_pass:
             failures_string = "\n".join([failure for failure in failures])
             raise exceptions.ValidationFailure(failures_string)
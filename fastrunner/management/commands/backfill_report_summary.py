@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from fastrunner.utils.report import backfill_summary_columns
+
+
+class Command(BaseCommand):
+    help = "从 summary 中提取耗时、步骤统计等字段, 补充到历史报告的列中"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='每批处理的报告数')
+
+    def handle(self, *args, **options):
+        filled, failed = backfill_summary_columns(batch_size=options['batch_size'])
+        self.stdout.write("补充 {filled} 个报告".format(filled=filled))
+        if failed:
+            self.stderr.write("解析失败 report id {failed}".format(failed=failed))
@@ -0,0 +1,19 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from fastrunner.utils.visit import backfill_daily_counts
+
+
+class Command(BaseCommand):
+    help = "根据原始访问记录重新计算每日访问量"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='只计算最近N天, 默认全部原始记录')
+
+    def handle(self, *args, **options):
+        start = None
+        if options['days']:
+            start = datetime.date.today() - datetime.timedelta(days=options['days'] - 1)
+        days = backfill_daily_counts(start=start)
+        self.stdout.write("重新计算 {days} 天的访问量".format(days=days))
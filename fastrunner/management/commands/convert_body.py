@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from fastrunner.utils.fields import convert_json_column
+
+
+class Command(BaseCommand):
+    help = "将 str(dict) 格式存储的主体信息批量转换为JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--table', action='append', dest='tables',
+                            help='需要转换的表, 默认 api, case_step, config')
+        parser.add_argument('--batch-size', type=int, default=500, help='每批处理的行数')
+
+    def handle(self, *args, **options):
+        tables = options['tables'] or ['api', 'case_step', 'config']
+        for table in tables:
+            converted, failed = convert_json_column(connection, table, batch_size=options['batch_size'])
+            self.stdout.write("{table}: 转换 {converted} 行".format(table=table, converted=converted))
+            if failed:
+                self.stderr.write("{table}: 解析失败 id {failed}".format(table=table, failed=failed))
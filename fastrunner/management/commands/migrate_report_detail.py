@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from fastrunner.utils.report import migrate_legacy_details
+
+
+class Command(BaseCommand):
+    help = "将 str(list) 格式的历史报告详情拆分为压缩存储的记录"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='每批处理的报告数')
+
+    def handle(self, *args, **options):
+        migrated, failed = migrate_legacy_details(batch_size=options['batch_size'])
+        self.stdout.write("迁移 {migrated} 个报告".format(migrated=migrated))
+        if failed:
+            self.stderr.write("解析失败 report id {failed}".format(failed=failed))
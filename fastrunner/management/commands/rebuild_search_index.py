@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from fastrunner.utils import search
+
+
+class Command(BaseCommand):
+    help = "重建接口、用例和用例步骤的名称/URL搜索索引, sqlite 修改表结构后触发器丢失时使用"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='数据库别名')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        search.drop_search_index(connection)
+        installed = search.install_search_index(connection)
+        self.stdout.write("已建立搜索索引: {tables}".format(tables=", ".join(installed) or "无, 搜索使用 LIKE"))
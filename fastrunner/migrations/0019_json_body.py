@@ -0,0 +1,34 @@
+from django.db import migrations
+
+import fastrunner.utils.fields
+
+
+def convert_body(apps, schema_editor):
+    for table in ('api', 'case_step', 'config'):
+        fastrunner.utils.fields.convert_json_column(schema_editor.connection, table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fastrunner', '0018_testsuite_testsuitestep'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='api',
+            name='body',
+            field=fastrunner.utils.fields.JSONTextField(verbose_name='主体信息'),
+        ),
+        migrations.AlterField(
+            model_name='casestep',
+            name='body',
+            field=fastrunner.utils.fields.JSONTextField(verbose_name='主体信息'),
+        ),
+        migrations.AlterField(
+            model_name='config',
+            name='body',
+            field=fastrunner.utils.fields.JSONTextField(verbose_name='主体信息'),
+        ),
+        migrations.RunPython(convert_body, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+import datetime
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fastrunner', '0019_json_body'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='visit',
+            name='create_time',
+            field=models.DateTimeField(db_index=True, default=datetime.datetime.now, verbose_name='创建时间'),
+        ),
+        migrations.CreateModel(
+            name='VisitDaily',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project', models.CharField(default=0, max_length=4, verbose_name='项目id')),
+                ('day', models.DateField(db_index=True, verbose_name='日期')),
+                ('count', models.IntegerField(default=0, verbose_name='访问次数')),
+            ],
+            options={
+                'verbose_name': '每日访问量',
+                'db_table': 'visit_daily',
+                'unique_together': {('project', 'day')},
+            },
+        ),
+    ]
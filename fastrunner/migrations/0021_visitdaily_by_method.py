@@ -0,0 +1,18 @@
+from django.db import migrations
+
+import fastrunner.utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fastrunner', '0020_visitdaily'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visitdaily',
+            name='by_method',
+            field=fastrunner.utils.fields.JSONTextField(default=dict, verbose_name='按请求方法统计'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fastrunner', '0021_visitdaily_by_method'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportRecord',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.IntegerField(verbose_name='报告内序号')),
+                ('testcase', models.IntegerField(verbose_name='用例序号')),
+                ('name', models.CharField(blank=True, max_length=255, verbose_name='步骤名称')),
+                ('status', models.CharField(blank=True, max_length=20, verbose_name='步骤状态')),
+                ('elapsed', models.FloatField(null=True, verbose_name='响应时间(ms)')),
+                ('size', models.IntegerField(verbose_name='压缩后大小(bytes)')),
+                ('data', models.BinaryField(verbose_name='记录内容')),
+                ('report', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE,
+                                             related_name='records', to='fastrunner.Report')),
+            ],
+            options={
+                'verbose_name': '测试报告记录',
+                'db_table': 'report_record',
+                'unique_together': {('report', 'index')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+import datetime
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fastrunner', '0022_reportrecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleCaseResult',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_name', models.CharField(max_length=200, verbose_name='任务名称')),
+                ('case_id', models.IntegerField(verbose_name='用例id')),
+                ('fingerprint', models.CharField(max_length=32, verbose_name='用例指纹')),
+                ('success', models.BooleanField(default=False, verbose_name='上次运行结果')),
+                ('skipped', models.IntegerField(default=0, verbose_name='连续跳过次数')),
+                ('update_time', models.DateTimeField(default=datetime.datetime.now, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '定时任务用例结果',
+                'db_table': 'schedule_case_result',
+                'unique_together': {('task_name', 'case_id')},
+            },
+        ),
+    ]
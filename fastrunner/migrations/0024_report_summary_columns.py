@@ -0,0 +1,53 @@
+from django.db import migrations, models
+
+import fastrunner.utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fastrunner', '0023_schedulecaseresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='start_at',
+            field=models.FloatField(db_index=True, null=True, verbose_name='开始时间戳'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='duration',
+            field=models.FloatField(db_index=True, null=True, verbose_name='运行耗时(s)'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='total',
+            field=models.IntegerField(default=0, verbose_name='步骤总数'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='successes',
+            field=models.IntegerField(default=0, verbose_name='成功步骤数'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='failures',
+            field=models.IntegerField(db_index=True, default=0, verbose_name='失败步骤数'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='errors',
+            field=models.IntegerField(default=0, verbose_name='异常步骤数'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='stat',
+            field=fastrunner.utils.fields.JSONTextField(default=dict, verbose_name='统计信息'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='platform',
+            field=fastrunner.utils.fields.JSONTextField(default=dict, verbose_name='运行环境'),
+        ),
+    ]
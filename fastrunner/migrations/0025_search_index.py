@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from fastrunner.utils import search
+
+
+def install_search_index(apps, schema_editor):
+    """sqlite 使用 FTS5 索引; mysql 仅在 SEARCH_MYSQL_FULLTEXT 开启时建立 ngram 全文索引(关闭停用词),
+    之后开启时执行 python manage.py rebuild_search_index
+    """
+    search.install_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    search.drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fastrunner', '0024_report_summary_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, drop_search_index),
+    ]
@@ -0,0 +1,86 @@
+import ast
+import json
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from fastrunner.utils import tree as tree_utils
+
+
+def load_tree_text(text):
+    """原 tree 字段由 str(list) 保存, 通过 eval 读取
+    """
+    if not text:
+        return []
+    try:
+        return json.loads(text)
+    except ValueError:
+        return ast.literal_eval(text)
+
+
+def tree_to_nodes(apps, schema_editor):
+    Relation = apps.get_model('fastrunner', 'Relation')
+    RelationNode = apps.get_model('fastrunner', 'RelationNode')
+    for relation in Relation.objects.all().iterator():
+        try:
+            nodes = tree_utils.flatten_tree(load_tree_text(relation.tree))
+        except (ValueError, SyntaxError) as e:
+            raise ValueError(f"relation {relation.id} has invalid tree: {e}")
+
+        RelationNode.objects.bulk_create([
+            RelationNode(relation_id=relation.id, node_id=node.id, parent=node.parent, label=node.label,
+                         path=node.path, position=node.position)
+            for node in nodes
+        ], batch_size=500)
+        Relation.objects.filter(id=relation.id).update(max_id=max((node.id for node in nodes), default=0))
+
+
+def nodes_to_tree(apps, schema_editor):
+    Relation = apps.get_model('fastrunner', 'Relation')
+    RelationNode = apps.get_model('fastrunner', 'RelationNode')
+    for relation in Relation.objects.all().iterator():
+        nodes = [
+            tree_utils.TreeNode(node_id, parent, label, path, position)
+            for node_id, parent, label, path, position in RelationNode.objects.filter(relation_id=relation.id).
+            values_list('node_id', 'parent', 'label', 'path', 'position')
+        ]
+        Relation.objects.filter(id=relation.id).update(tree=str(tree_utils.nest_nodes(nodes)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fastrunner', '0025_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='relation',
+            name='max_id',
+            field=models.IntegerField(default=0, verbose_name='最大节点id'),
+        ),
+        migrations.CreateModel(
+            name='RelationNode',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('node_id', models.IntegerField(verbose_name='节点id')),
+                ('parent', models.IntegerField(default=0, verbose_name='父节点id')),
+                ('label', models.CharField(max_length=100, verbose_name='节点名称')),
+                ('path', models.CharField(max_length=255, verbose_name='节点路径')),
+                ('position', models.IntegerField(default=0, verbose_name='同级顺序')),
+                ('relation', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE,
+                                               related_name='nodes', to='fastrunner.Relation')),
+            ],
+            options={
+                'verbose_name': '树形结构节点',
+                'db_table': 'relation_node',
+                'unique_together': {('relation', 'node_id')},
+                'index_together': {('relation', 'path')},
+            },
+        ),
+        migrations.RunPython(tree_to_nodes, nodes_to_tree),
+        migrations.RemoveField(
+            model_name='relation',
+            name='tree',
+        ),
+    ]
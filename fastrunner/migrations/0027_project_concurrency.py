@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fastrunner', '0026_relationnode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='concurrency',
+            field=models.IntegerField(default=None, null=True, verbose_name='并发执行用例数'),
+        ),
+    ]
@@ -1,9 +1,12 @@
+import datetime
+
 from django.db import models
 
 # Create your models here.
 from model_utils import Choices
 
 from fastuser.models import BaseTable
+from fastrunner.utils.fields import JSONTextField
 
 
 class Project(BaseTable):
@@ -18,6 +21,8 @@ class Project(BaseTable):
     name = models.CharField("项目名称", unique=True, null=False, max_length=100)
     desc = models.CharField("简要介绍", max_length=100, null=False)
     responsible = models.CharField("创建人", max_length=20, null=False)
+    # 为空时使用 RUNNER_CONCURRENCY
+    concurrency = models.IntegerField("并发执行用例数", null=True, default=None)
 
 
 class Debugtalk(BaseTable):
@@ -43,7 +48,7 @@ class Config(BaseTable):
         db_table = "config"
 
     name = models.CharField("环境名称", null=False, max_length=100)
-    body = models.TextField("主体信息", null=False)
+    body = JSONTextField("主体信息", null=False)
     base_url = models.CharField("请求地址", null=False, max_length=100)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, db_constraint=False)
     is_default = models.BooleanField("默认配置", default=False)
@@ -70,7 +75,7 @@ class API(BaseTable):
         (3, "自动成功")
     )
     name = models.CharField("接口名称", null=False, max_length=100, db_index=True)
-    body = models.TextField("主体信息", null=False)
+    body = JSONTextField("主体信息", null=False)
     url = models.CharField("请求地址", null=False, max_length=255, db_index=True)
     method = models.CharField("请求方式", null=False, max_length=10)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, db_constraint=False)
@@ -133,7 +138,7 @@ class CaseStep(BaseTable):
         db_table = "case_step"
 
     name = models.CharField("用例名称", null=False, max_length=100)
-    body = models.TextField("主体信息", null=False)
+    body = JSONTextField("主体信息", null=False)
     url = models.CharField("请求地址", null=False, max_length=255)
     method = models.CharField("请求方式", null=False, max_length=10)
     case = models.ForeignKey(Case, on_delete=models.CASCADE, db_constraint=False)
@@ -150,7 +155,7 @@ class TestSuiteStep(BaseTable):
         db_table = "test_suite_step"
 
     name = models.CharField("用例集名称", null=False, max_length=100)
-    body = models.TextField("主体信息", null=True)
+    body = JSONTextField("主体信息", null=True)
     url = models.CharField("请求地址", null=False, max_length=255)
     case = models.ForeignKey(TestSuite, on_delete=models.CASCADE, db_constraint=False)
     step = models.IntegerField("顺序", null=False)
@@ -212,6 +217,15 @@ class Report(BaseTable):
     status = models.BooleanField("报告状态", choices=report_status, blank=True)
     summary = models.TextField("报告基础信息", null=False)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, db_constraint=False)
+    # 以下字段在保存报告时从 summary 中提取, 列表展示和按耗时/失败数筛选排序时无需解析 summary
+    start_at = models.FloatField("开始时间戳", null=True, db_index=True)
+    duration = models.FloatField("运行耗时(s)", null=True, db_index=True)
+    total = models.IntegerField("步骤总数", default=0)
+    successes = models.IntegerField("成功步骤数", default=0)
+    failures = models.IntegerField("失败步骤数", default=0, db_index=True)
+    errors = models.IntegerField("异常步骤数", default=0)
+    stat = JSONTextField("统计信息", default=dict)
+    platform = JSONTextField("运行环境", default=dict)
 
 
 class ReportDetail(models.Model):
@@ -223,6 +237,44 @@ class ReportDetail(models.Model):
     summary_detail = models.TextField("报告详细信息")
 
 
+class ReportRecord(models.Model):
+    """
+    报告中的单条请求记录, 内容以zlib压缩的JSON存储, 查看报告时按需读取
+    """
+
+    class Meta:
+        verbose_name = "测试报告记录"
+        db_table = "report_record"
+        unique_together = [['report', 'index']]
+
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, db_constraint=False, related_name='records')
+    index = models.IntegerField("报告内序号")
+    testcase = models.IntegerField("用例序号")
+    name = models.CharField("步骤名称", max_length=255, blank=True)
+    status = models.CharField("步骤状态", max_length=20, blank=True)
+    elapsed = models.FloatField("响应时间(ms)", null=True)
+    size = models.IntegerField("压缩后大小(bytes)")
+    data = models.BinaryField("记录内容")
+
+
+class ScheduleCaseResult(models.Model):
+    """
+    智能定时任务中每条用例最近一次运行的指纹和结果, 指纹未变且上次成功的用例下次可跳过
+    """
+
+    class Meta:
+        verbose_name = "定时任务用例结果"
+        db_table = "schedule_case_result"
+        unique_together = [['task_name', 'case_id']]
+
+    task_name = models.CharField("任务名称", max_length=200)
+    case_id = models.IntegerField("用例id")
+    fingerprint = models.CharField("用例指纹", max_length=32)
+    success = models.BooleanField("上次运行结果", default=False)
+    skipped = models.IntegerField("连续跳过次数", default=0)
+    update_time = models.DateTimeField("更新时间", default=datetime.datetime.now)
+
+
 class Relation(models.Model):
     """
     树形结构关系
@@ -233,8 +285,28 @@ class Relation(models.Model):
         db_table = "relation"
 
     project = models.ForeignKey(Project, on_delete=models.CASCADE, db_constraint=False)
-    tree = models.TextField("结构主题", null=False, default=[])
     type = models.IntegerField("树类型", default=1)
+    # 只增不减, 删除的节点id不会被新节点复用, 避免新节点关联到已删除节点下遗留的数据
+    max_id = models.IntegerField("最大节点id", default=0)
+
+
+class RelationNode(models.Model):
+    """
+    树形结构节点, 按路径查询子树
+    """
+
+    class Meta:
+        verbose_name = "树形结构节点"
+        db_table = "relation_node"
+        unique_together = [['relation', 'node_id']]
+        index_together = [['relation', 'path']]
+
+    relation = models.ForeignKey(Relation, on_delete=models.CASCADE, db_constraint=False, related_name='nodes')
+    node_id = models.IntegerField("节点id")
+    parent = models.IntegerField("父节点id", default=0)
+    label = models.CharField("节点名称", max_length=100)
+    path = models.CharField("节点路径", max_length=255)
+    position = models.IntegerField("同级顺序", default=0)
 
 
 class Visit(models.Model):
@@ -255,8 +327,25 @@ class Visit(models.Model):
     request_params = models.CharField(max_length=255, verbose_name='请求参数', default='', db_index=True)
     request_method = models.CharField(max_length=7, verbose_name='请求方法', choices=METHODS, db_index=True)
     request_body = models.TextField(verbose_name='请求体')
-    create_time = models.DateTimeField('创建时间', auto_now_add=True, db_index=True)
+    # 由中间件缓冲后批量写入, 时间取请求发生时而不是写入时
+    create_time = models.DateTimeField('创建时间', default=datetime.datetime.now, db_index=True)
 
 
     class Meta:
         db_table = 'visit'
+
+
+class VisitDaily(models.Model):
+    """
+    每日访问量汇总
+    """
+
+    class Meta:
+        verbose_name = "每日访问量"
+        db_table = "visit_daily"
+        unique_together = ('project', 'day')
+
+    project = models.CharField(max_length=4, verbose_name='项目id', default=0)
+    day = models.DateField('日期', db_index=True)
+    count = models.IntegerField('访问次数', default=0)
+    by_method = JSONTextField('按请求方法统计', default=dict)
@@ -3,8 +3,11 @@ import json
 import time
 
 from crontab import CronTab
+from django.db.models import Manager
 from rest_framework import serializers
 from fastrunner import models
+from fastrunner.utils import relation_tree
+from fastrunner.utils.concurrency import normalize_concurrency
 from fastrunner.utils.parser import Parse
 from djcelery import models as celery_models
 
@@ -16,7 +19,10 @@ class ProjectSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.Project
-        fields = ['id', 'name', 'desc', 'responsible', 'update_time', 'creator', 'updater']
+        fields = ['id', 'name', 'desc', 'responsible', 'update_time', 'creator', 'updater', 'concurrency']
+
+    def validate_concurrency(self, value):
+        return normalize_concurrency(value)
 
 
 class VisitSerializer(serializers.ModelSerializer):
@@ -42,12 +48,17 @@ class DebugTalkSerializer(serializers.ModelSerializer):
 
 class RelationSerializer(serializers.ModelSerializer):
     """
-    树形结构序列化
+    树形结构序列化, tree 由节点表还原为原嵌套结构
     """
+    tree = serializers.SerializerMethodField()
+    max = serializers.IntegerField(source='max_id', read_only=True)
 
     class Meta:
         model = models.Relation
-        fields = '__all__'
+        fields = ['id', 'project', 'type', 'tree', 'max']
+
+    def get_tree(self, obj):
+        return relation_tree.load_tree(obj.id)
 
 
 class AssertSerializer(serializers.Serializer):
@@ -62,6 +73,10 @@ class AssertSerializer(serializers.Serializer):
     rigEnv = serializers.ChoiceField(choices=models.API.ENV_TYPE, default='')
     delete = serializers.ChoiceField(choices=(0, 1), default=0)
     onlyMe = serializers.BooleanField(default=False)
+    # 只返回名称、地址等信息, 不解析body也不查询关联用例
+    light = serializers.BooleanField(default=False)
+    # 逗号分隔的返回字段, 如 id,name,url,method
+    fields = serializers.CharField(default='')
 
 # 用例集反序列化验证器
 class TestSuiteSearchSerializer(serializers.Serializer):
@@ -118,14 +133,14 @@ class TestSuiteStepSerializer(serializers.ModelSerializer):
         depth = 1
 
     def get_body(self, obj):
-        body = eval(obj.body)
+        body = obj.body
         if "base_url" in body["request"].keys():
             return {
                 "name": body["name"],
                 "method": "config"
             }
         else:
-            parse = Parse(eval(obj.body))
+            parse = Parse(obj.body)
             parse.parse_http()
             return parse.testcase
 
@@ -141,14 +156,14 @@ class CaseStepSerializer(serializers.ModelSerializer):
         depth = 1
 
     def get_body(self, obj):
-        body = eval(obj.body)
+        body = obj.body
         if "base_url" in body["request"].keys():
             return {
                 "name": body["name"],
                 "method": "config"
             }
         else:
-            parse = Parse(eval(obj.body))
+            parse = Parse(obj.body)
             parse.parse_http()
             return parse.testcase
 
@@ -161,6 +176,30 @@ class APIRelatedCaseSerializer(serializers.Serializer):
         fields = ['case_id', 'case_name']
 
 
+def load_related_cases(api_ids):
+    """一次查询加载引用了这些API的用例步骤, 按API分组
+        api_ids: iterable of api id
+        return: {api_id: [{"case_id": str, "case_name": str}]}, 与 APIRelatedCaseSerializer 输出一致
+    """
+    related_cases = {}
+    for api_id, case_id, case_name in models.CaseStep.objects.filter(source_api_id__in=set(api_ids)). \
+            order_by('id').values_list('source_api_id', 'case_id', 'case__name'):
+        related_cases.setdefault(api_id, []).append({"case_id": str(case_id), "case_name": case_name})
+    return related_cases
+
+
+class APIListSerializer(serializers.ListSerializer):
+    """
+    接口列表序列化, 整页接口的关联用例一次查询加载
+    """
+
+    def to_representation(self, data):
+        apis = list(data.all() if isinstance(data, Manager) else data)
+        if 'cases' in self.child.fields:
+            self.child.related_cases = load_related_cases(api.id for api in apis)
+        return super().to_representation(apis)
+
+
 class APISerializer(serializers.ModelSerializer):
     """
     接口信息序列化
@@ -169,19 +208,38 @@ class APISerializer(serializers.ModelSerializer):
     tag_name = serializers.CharField(source="get_tag_display")
     cases = serializers.SerializerMethodField()
 
+    # 树/列表只展示名称、地址等信息时使用, 不解析body也不查询关联用例
+    LIGHT_FIELDS = ['id', 'name', 'url', 'method', 'project', 'relation', 'rig_env', 'tag', 'tag_name',
+                    'update_time', 'delete', 'creator', 'updater']
+
     class Meta:
         model = models.API
         # fields = '__all__'
         fields = ['id', 'name', 'url', 'method', 'project', 'relation', 'body', 'rig_env', 'tag', 'tag_name',
                   'update_time', 'delete', 'creator', 'updater', 'cases']
+        list_serializer_class = APIListSerializer
+
+    def __init__(self, *args, **kwargs):
+        """
+        fields: list, optional, 只返回指定的字段
+        """
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        # 由 APIListSerializer 预先加载, 单个接口序列化时为None
+        self.related_cases = None
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
     def get_body(self, obj):
-        parse = Parse(eval(obj.body))
+        parse = Parse(obj.body)
         parse.parse_http()
         return parse.testcase
 
     def get_cases(self, obj):
-        cases = models.CaseStep.objects.filter(source_api_id=obj.id)
+        if self.related_cases is not None:
+            return self.related_cases.get(obj.id, [])
+        cases = models.CaseStep.objects.filter(source_api_id=obj.id).select_related('case')
         case_id = APIRelatedCaseSerializer(many=True, instance=cases)
         return case_id.data
 
@@ -203,7 +261,7 @@ class ConfigSerializer(serializers.ModelSerializer):
         depth = 1
 
     def get_body(self, obj):
-        parse = Parse(eval(obj.body), level='config')
+        parse = Parse(obj.body, level='config')
         parse.parse_http()
         return parse.testcase
 
@@ -222,17 +280,33 @@ class ReportSerializer(serializers.ModelSerializer):
         model = models.Report
         fields = ["id", "name", "type", "time", "stat", "platform", "success", 'creator', 'updater']
 
+    def _summary(self, obj):
+        """未补充列的历史报告才解析 summary, 每个报告只解析一次
+        """
+        if obj.duration is not None:
+            return None
+        summary = getattr(obj, '_parsed_summary', None)
+        if summary is None:
+            summary = obj._parsed_summary = json.loads(obj.summary)
+        return summary
+
     def get_time(self, obj):
-        return json.loads(obj.summary)["time"]
+        summary = self._summary(obj)
+        if summary is not None:
+            return summary["time"]
+        return {"start_at": obj.start_at, "duration": obj.duration}
 
     def get_stat(self, obj):
-        return json.loads(obj.summary)["stat"]
+        summary = self._summary(obj)
+        return summary["stat"] if summary is not None else obj.stat
 
     def get_platform(self, obj):
-        return json.loads(obj.summary)["platform"]
+        summary = self._summary(obj)
+        return summary["platform"] if summary is not None else obj.platform
 
     def get_success(self, obj):
-        return json.loads(obj.summary)["success"]
+        summary = self._summary(obj)
+        return summary["success"] if summary is not None else obj.status
 
 
 class VariablesSerializer(serializers.ModelSerializer):
@@ -1,29 +1,27 @@
-import datetime
-
 from celery import shared_task
-from django.core.exceptions import ObjectDoesNotExist
-from fastrunner import models
-from fastrunner.utils.loader import save_summary, debug_suite, debug_api
+from fastrunner.utils.loader import save_summary, debug_suite, debug_suite_tree, debug_api
+from fastrunner.utils.suite import assemble_suite
 from fastrunner.utils.ding_message import DingMessage
-from fastrunner.utils import lark_message
+from fastrunner.utils import lark_message, visit, smart_schedule
 
 
 @shared_task
-def async_debug_api(test_case, project, name=None, config=None, save=False,log_file=None):
+def async_debug_api(test_case, project, name=None, config=None, save=False,log_file=None,
+                    concurrency=None):
     """异步执行api
     """
     summary = debug_api(test_case, project, name=f'批量运行{len(test_case)}条API', config=config,
                         save=save,
-                        log_file=log_file)
+                        log_file=log_file, concurrency=concurrency)
 
     save_summary(name, summary, project, api_type=1)
 
 
 @shared_task
-def async_debug_suite(suite, project, obj, report, config):
+def async_debug_suite(suite, project, obj, report, config, concurrency=None):
     """异步执行suite
     """
-    summary = debug_suite(suite, project, obj, config=config, save=False)
+    summary = debug_suite(suite, project, obj, config=config, save=False, concurrency=concurrency)
     save_summary(report, summary, project)
 
 
@@ -33,39 +31,34 @@ def schedule_debug_suite(*args, **kwargs):
     """
 
     project = kwargs["project"]
-    suite = []
-    test_sets = []
-    config_list = []
-    for pk in args:
-        try:
-            name = models.Case.objects.get(id=pk).name
-            suite.append({
-                "name": name,
-                "id": pk
-            })
-        except ObjectDoesNotExist:
-            pass
-
-    for content in suite:
-        test_list = models.CaseStep.objects. \
-            filter(case__id=content["id"]).order_by("step").values("body")
-
-        testcase_list = []
-        config = None
-        for content in test_list:
-            body = eval(content["body"])
-            if "base_url" in body["request"].keys():
-                config = eval(
-                    models.Config.objects.get(
-                        name=body["name"],
-                        project__id=project).body)
-                continue
-            testcase_list.append(body)
-        config_list.append(config)
-        test_sets.append(testcase_list)
-
-    summary = debug_suite(test_sets, project, suite, config_list, save=False)
     task_name = kwargs["task_name"]
+    cases = list(args)
+
+    # 智能定时任务: 跳过未变更且上次成功的用例, 部署后和手动触发时执行全部用例
+    plan = None
+    if kwargs.get("smart"):
+        plan = smart_schedule.plan_cases(task_name, project, cases,
+                                         full_run_interval=kwargs.get("full_run_interval"),
+                                         force=kwargs.get("force") or kwargs.get('run_type') == 'deploy')
+        cases = plan.run
+
+    suite, test_sets, config_list = assemble_suite(project, cases)
+    if suite:
+        # 日志由 log_capture 收集到 summary['msg'], 无需临时日志文件
+        summary = debug_suite_tree(test_sets, project, suite, config_list, save=False,
+                                   concurrency=kwargs.get("concurrency"))
+    elif plan and plan.skipped:
+        # 用例全部跳过时仍保存报告, 并按策略发送跳过的用例数
+        summary = smart_schedule.skipped_summary()
+    else:
+        if plan:
+            smart_schedule.save_results(task_name, plan)
+        return
+
+    if plan:
+        smart_schedule.save_results(task_name, plan, summary)
+        summary["stat"]["testcases"]["skipped"] = len(plan.skipped)
+        summary["skipped_cases"] = plan.skipped
 
     if kwargs.get('run_type') == 'deploy':
         task_name = '部署_' + task_name
@@ -75,14 +68,21 @@ def schedule_debug_suite(*args, **kwargs):
         run_type = 'auto'
         report_type = 3
 
-    save_summary(task_name, summary, project, type=report_type)
+    save_summary(task_name, summary, project, api_type=report_type)
 
     strategy = kwargs["strategy"]
     if strategy == '始终发送' or (
-            strategy == '仅失败发送' and summary['stat']['failures'] > 0):
+            strategy == '仅失败发送' and summary['stat']['teststeps'].get('failures', 0) > 0):
         # ding_message = DingMessage(run_type)
         # ding_message.send_ding_msg(summary, report_name=task_name)
         webhook = kwargs.get("webhook", "")
         if webhook:
             summary["task_name"] = task_name
             lark_message.send_message(summary=summary, webhook=webhook)
+
+
+@shared_task
+def purge_visits(retention_days=None):
+    """清理过期的原始访问记录
+    """
+    return visit.purge_visits(retention_days)
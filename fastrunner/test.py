@@ -7,8 +7,28 @@
 # @Email: lihuacai168@gmail.com
 # @Software: PyCharm
 
-from django.test import TestCase
+import json
+import os
+import itertools
+import tempfile
+import unittest
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
 from fastuser import models
+from fastrunner import models as runner_models, serializers, tasks
+from fastrunner.httprunner3 import api as vendored_api, cache as vendored_cache, context as vendored_context, \
+    exceptions as vendored_exceptions, parameters as vendored_parameters, parser as vendored_parser
+from fastrunner.httprunner3.loader import filecache
+from fastrunner.utils import report as report_store
+from fastrunner.utils import concurrency, relation_tree
+from fastrunner.utils import search as search_index
+from fastrunner.utils import smart_schedule, suite, visit
+from fastrunner.utils.host import parse_host
+from fastrunner.views.report import ReportView
 
 class ModelTest(TestCase):
 
@@ -25,3 +45,700 @@ class ModelTest(TestCase):
     def test_user_register(self):
         res = models.UserInfo.objects.get(username='rikasai')
         self.assertEqual(res.email, "lihuacai168@gmail.com")
+
+
+class APISerializerTest(TestCase):
+
+    def setUp(self):
+        project = runner_models.Project.objects.create(name='demo', desc='demo', responsible='rikasai')
+        body = {"name": "api", "request": {"url": "/api/demo", "method": "GET"}}
+        for index in range(10):
+            api = runner_models.API.objects.create(name=f'api{index}', body=body, url='/api/demo', method='GET',
+                                                   project=project, relation=1)
+            case = runner_models.Case.objects.create(name=f'case{index}', project=project, relation=1, length=2)
+            for step in range(2):
+                runner_models.CaseStep.objects.create(name='step', body=body, url='/api/demo', method='GET',
+                                                      case=case, step=step, source_api_id=api.id)
+
+    def test_list_related_cases_in_one_query(self):
+        apis = list(runner_models.API.objects.all())
+        with self.assertNumQueries(1):
+            data = serializers.APISerializer(apis, many=True).data
+
+        self.assertEqual(len(data), 10)
+        for api in data:
+            self.assertEqual(api['cases'], serializers.APISerializer(
+                runner_models.API.objects.get(id=api['id'])).data['cases'])
+            self.assertEqual(len(api['cases']), 2)
+
+    def test_list_light_fields(self):
+        apis = list(runner_models.API.objects.all())
+        with self.assertNumQueries(0):
+            data = serializers.APISerializer(apis, many=True, fields=serializers.APISerializer.LIGHT_FIELDS).data
+
+        self.assertNotIn('body', data[0])
+        self.assertNotIn('cases', data[0])
+        self.assertEqual(data[0]['url'], '/api/demo')
+
+
+class ReportSummaryColumnsTest(TestCase):
+
+    def setUp(self):
+        self.project = runner_models.Project.objects.create(name='demo', desc='demo', responsible='rikasai')
+        self.summary = {
+            "success": False,
+            "stat": {
+                "testcases": {"total": 2, "success": 1, "fail": 1},
+                "teststeps": {"total": 5, "successes": 3, "failures": 1, "errors": 1}
+            },
+            "time": {"start_at": 1600000000.5, "duration": 3.2},
+            "platform": {"python_version": "3.6"},
+            "msg": ["log\n"] * 100
+        }
+
+    def create_report(self, **columns):
+        return runner_models.Report.objects.create(name='report', type=1, status=self.summary["success"],
+                                                   summary=json.dumps(self.summary), project=self.project,
+                                                   **columns)
+
+    def test_serialize_without_summary(self):
+        self.create_report(**report_store.summary_columns(self.summary))
+        with self.assertNumQueries(1):
+            data = serializers.ReportSerializer(runner_models.Report.objects.defer('summary'), many=True).data
+
+        self.assertEqual(data[0]['time'], self.summary['time'])
+        self.assertEqual(data[0]['stat'], self.summary['stat'])
+        self.assertEqual(data[0]['platform'], self.summary['platform'])
+        self.assertEqual(data[0]['success'], False)
+
+    def test_backfill_summary_columns(self):
+        report = self.create_report()
+        legacy = serializers.ReportSerializer(report).data
+
+        self.assertEqual(report_store.backfill_summary_columns(), (1, []))
+        report = runner_models.Report.objects.get(id=report.id)
+        self.assertEqual((report.duration, report.total, report.failures, report.errors), (3.2, 5, 1, 1))
+        self.assertEqual(serializers.ReportSerializer(report).data, legacy)
+        self.assertEqual(report_store.backfill_summary_columns(), (0, []))
+
+
+class ReportDetailStoreTest(TestCase):
+
+    def setUp(self):
+        self.project = runner_models.Project.objects.create(name='demo', desc='demo', responsible='rikasai')
+        self.report = runner_models.Report.objects.create(name='report', type=1, status=False, summary='{}',
+                                                          project=self.project)
+        self.details = [
+            {"name": "case1", "success": True, "records": [
+                {"name": "login", "status": "success", "meta_data": {"response": {"response_time_ms": 12.5}}},
+                {"name": "query", "status": "failure", "attachment": "AssertionError"},
+            ]},
+            {"name": "case2", "success": True, "records": [
+                {"name": "logout", "status": "skipped", "meta_data": {"response": {"body": "ok"}}},
+            ]},
+        ]
+
+    def test_save_and_load_details(self):
+        report_store.save_details(self.report, self.details)
+
+        self.assertEqual(report_store.count_records(self.report.id), 3)
+        self.assertEqual(report_store.load_details(self.report.id), (self.details, False))
+        self.assertEqual(report_store.load_record(self.report.id, 1), self.details[0]["records"][1])
+
+        details, lazy = report_store.load_details(self.report.id, with_records=False)
+        self.assertTrue(lazy)
+        self.assertEqual(details[0]["records"][0],
+                         {"index": 0, "name": "login", "status": "success", "elapsed": 12.5,
+                          "size": details[0]["records"][0]["size"]})
+        self.assertEqual(details[1]["records"][0]["index"], 2)
+
+    def test_migrate_legacy_details(self):
+        runner_models.ReportDetail.objects.create(report=self.report, summary_detail=str(self.details))
+        self.assertEqual(report_store.load_details(self.report.id), (self.details, False))
+
+        self.assertEqual(report_store.migrate_legacy_details(), (1, []))
+        self.assertEqual(report_store.count_records(self.report.id), 3)
+        self.assertEqual(report_store.load_details(self.report.id), (self.details, False))
+        self.assertEqual(report_store.migrate_legacy_details(), (0, []))
+
+
+class ReportRecordsViewTest(TestCase):
+
+    def setUp(self):
+        project = runner_models.Project.objects.create(name='demo', desc='demo', responsible='rikasai')
+        self.report = runner_models.Report.objects.create(name='report', type=1, status=False, summary='{}',
+                                                          project=project)
+        status = ["success", "failure", "error", "skipped", "success"]
+        report_store.save_details(self.report, [{"name": "case", "records": [
+            {"name": f"step{index}", "status": value, "meta_data": {"response": {"status_code": 200 + index}}}
+            for index, value in enumerate(status)
+        ]}])
+
+    def get(self, **params):
+        path = f'/api/fastrunner/reports/{self.report.id}/records/'
+        request = APIRequestFactory().get(path, params)
+        response = ReportView.as_view({"get": "records"})(request, pk=self.report.id)
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_paging(self):
+        data = self.get(page=2, size=2)
+        self.assertEqual((data["count"], data["page"], data["size"]), (5, 2, 2))
+        self.assertEqual([record["name"] for record in data["results"]], ["step2", "step3"])
+        self.assertEqual(data["results"][0]["meta_data"], {"response": {"status_code": 202}})
+
+    def test_status_filter(self):
+        data = self.get(status='failed')
+        self.assertEqual(data["count"], 2)
+        self.assertEqual([record["status"] for record in data["results"]], ["failure", "error"])
+
+        data = self.get(status='success,skipped', size=2)
+        self.assertEqual(data["count"], 3)
+        self.assertEqual([record["index"] for record in data["results"]], [0, 3])
+
+    def test_fields(self):
+        data = self.get(fields='name, meta_data.response.status_code', size=1)
+        self.assertEqual(data["results"], [{"name": "step0", "meta_data": {"response": {"status_code": 200}}}])
+
+        # 只投影元数据列时不解压记录内容
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get(fields='index,status', status='failed')
+        self.assertFalse(any('"data"' in query["sql"] for query in queries.captured_queries))
+        self.assertEqual(data["results"], [{"index": 1, "status": "failure"}, {"index": 2, "status": "error"}])
+
+
+class SearchIndexTest(TestCase):
+
+    def setUp(self):
+        project = runner_models.Project.objects.create(name='demo', desc='demo', responsible='rikasai')
+        apis = [('用户登录', '/api/user/login'), ('用户注册', '/api/user/register'), ('订单列表', '/api/order/list'),
+                ('登录日志', '/api/log/login/list')]
+        for name, url in apis:
+            runner_models.API.objects.create(name=name, body={}, url=url, method='GET', project=project, relation=1)
+
+    def search(self, keywords):
+        queryset = runner_models.API.objects.order_by('-update_time')
+        result, _ = search_index.search_queryset(queryset, keywords)
+        expected = search_index._like(queryset, keywords.split(), search_index.SEARCH_INDEXES['api'])
+        self.assertEqual(set(result.values_list('id', flat=True)), set(expected.values_list('id', flat=True)))
+        return list(result.values_list('url', flat=True))
+
+    def test_search_same_as_like(self):
+        for keywords in ['login', 'api user', '/api/order', '用户', '登录 list', 'LOGIN', 'nothing', 'a']:
+            self.search(keywords)
+
+    def test_search_synced_on_write(self):
+        self.assertTrue(search_index.search_queryset(runner_models.API.objects.all(), 'register')[1])
+        self.assertEqual(self.search('register'), ['/api/user/register'])
+
+        runner_models.API.objects.filter(url='/api/user/register').update(url='/api/user/signup')
+        self.assertEqual(self.search('register'), [])
+        self.assertEqual(self.search('signup'), ['/api/user/signup'])
+
+        runner_models.API.objects.filter(url='/api/user/signup').delete()
+        self.assertEqual(self.search('signup'), [])
+
+    def test_search_whole_string(self):
+        queryset = runner_models.API.objects.all()
+        result, _ = search_index.search_queryset(queryset, 'user login', split=False)
+        self.assertEqual(list(result), [])
+        result, _ = search_index.search_queryset(queryset, 'user/login', split=False)
+        self.assertEqual(list(result.values_list('url', flat=True)), ['/api/user/login'])
+
+    def test_mysql_index_without_stopwords(self):
+        sql = search_index.mysql_index_sql('api', search_index.SEARCH_INDEXES['api'])
+        self.assertEqual(sql[0], "SET SESSION innodb_ft_enable_stopword = OFF")
+        self.assertIn("WITH PARSER ngram", sql[1])
+
+
+class RelationTreeTest(TestCase):
+    tree = [{'id': 1, 'label': '默认分组', 'children': []},
+            {'id': 2, 'label': '订单', 'children': [{'id': 3, 'label': '下单', 'children': [
+                {'id': 5, 'label': '支付', 'children': []}]}, {'id': 4, 'label': '退款', 'children': []}]},
+            {'id': 6, 'label': '用户', 'children': []}]
+
+    def setUp(self):
+        self.project = runner_models.Project.objects.create(name='demo', desc='demo', responsible='rikasai')
+        self.relation = runner_models.Relation.objects.create(project=self.project, type=relation_tree.CASE_TREE)
+        relation_tree.save_tree(self.relation.id, self.tree)
+
+    def test_serializer_nested_shape(self):
+        data = serializers.RelationSerializer(runner_models.Relation.objects.get(id=self.relation.id)).data
+        self.assertEqual(data['tree'], self.tree)
+        self.assertEqual(data['max'], 6)
+
+    def test_save_only_changed_nodes(self):
+        # 支付 移动到 用户 下, 删除 退款
+        tree = json.loads(json.dumps(self.tree))
+        tree[1]['children'] = [{'id': 3, 'label': '下单', 'children': []}]
+        tree[2]['children'] = [{'id': 5, 'label': '支付', 'children': []}]
+        before = {node.node_id: node.path for node in runner_models.RelationNode.objects.all()}
+
+        self.assertEqual(relation_tree.save_tree(self.relation.id, tree), 6)
+        self.assertEqual(relation_tree.load_tree(self.relation.id), tree)
+        paths = dict(runner_models.RelationNode.objects.values_list('node_id', 'path'))
+        self.assertEqual(paths[5], '/6/5/')
+        self.assertNotIn(4, paths)
+        self.assertEqual(paths[2], before[2])
+
+    def test_max_id_not_reused(self):
+        self.assertEqual(relation_tree.save_tree(self.relation.id, self.tree[:1]), 6)
+        self.assertEqual(runner_models.Relation.objects.get(id=self.relation.id).max_id, 6)
+
+        with self.assertRaises(ValueError):
+            relation_tree.save_tree(self.relation.id, self.tree + [{'id': 3, 'label': '重复', 'children': []}])
+
+    def test_subtree_ids(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(relation_tree.subtree_ids(self.project.id, relation_tree.CASE_TREE, [6, 2, 5, 99]),
+                             [6, 2, 3, 5, 4, 99])
+        self.assertEqual(relation_tree.subtree_ids(self.project.id, relation_tree.API_TREE, [2]), [2])
+
+
+class APITreePlanTest(TestCase):
+
+    def setUp(self):
+        self.project = runner_models.Project.objects.create(name='demo', desc='demo', responsible='rikasai')
+        relation = runner_models.Relation.objects.create(project=self.project, type=relation_tree.API_TREE)
+        relation_tree.save_tree(relation.id, [{'id': 1, 'label': '默认分组', 'children': []},
+                                              {'id': 2, 'label': '订单', 'children': [
+                                                  {'id': 3, 'label': '下单', 'children': []}]}])
+        for node, url in [(3, 'http://order.test.com/create'), (2, 'http://order.test.com/list'),
+                          (1, 'http://user.test.com/login'), (3, 'http://order.test.com/pay')]:
+            body = {"name": url, "request": {"url": url, "method": "GET"}}
+            runner_models.API.objects.create(name=url, body=body, url=url, method='GET', project=self.project,
+                                             relation=node)
+
+    def test_expand_subtree_in_order(self):
+        host = ['# 10.0.0.9:80 order.test.com', '10.0.0.1:8080 order.test.com', '10.0.0.2:80 user.test.com']
+        with self.assertNumQueries(3):
+            test_case = suite.assemble_api_by_relation(self.project.id, [2, 1], host=host)
+
+        self.assertEqual([api['request']['url'] for api in test_case], [
+            'http://10.0.0.1:8080/list', 'http://10.0.0.1:8080/create', 'http://10.0.0.1:8080/pay',
+            'http://10.0.0.2:80/login'])
+        self.assertEqual(test_case[0]['request']['headers'], {'Host': 'order.test.com'})
+
+        expected = [parse_host(host, api) for api in suite.assemble_api_by_relation(self.project.id, [2, 1])]
+        self.assertEqual(test_case, expected)
+
+    def test_incomplete_url(self):
+        runner_models.API.objects.create(name='relative', body={"name": "relative", "request": {"url": "/login"}},
+                                         url='/login', method='GET', project=self.project, relation=3)
+        with self.assertRaises(suite.IncompleteURL):
+            suite.assemble_api_by_relation(self.project.id, [2], host="请选择")
+        self.assertEqual(len(suite.assemble_api_by_relation(self.project.id, [1], host="请选择")), 1)
+
+
+class ParameterizedTestcaseTest(SimpleTestCase):
+
+    @staticmethod
+    def parse():
+        return vendored_parser.parse_tests({
+            "project_mapping": {"functions": {}},
+            "testsuites": [{
+                "config": {"name": "suite"},
+                "testcases": {
+                    "tc": {
+                        "testcase": "tc.yml",
+                        "parameters": {"uid": [1, 2]},
+                        "testcase_def": {
+                            "config": {"name": "tc", "base_url": "http://127.0.0.1"},
+                            "teststeps": [
+                                {"name": "s1", "variables": {"x": "s1"}, "request": {"url": "/a", "method": "GET"}},
+                                {"name": "nested", "testcase_def": {
+                                    "config": {"name": "inner"},
+                                    "teststeps": [{"name": "n1", "variables": {"x": "n1"},
+                                                   "request": {"url": "/n", "method": "GET"}}]}},
+                                {"name": "s2", "variables": {"x": "outer"}, "request": {"url": "/b", "method": "GET"}},
+                            ]
+                        }
+                    }
+                }
+            }]
+        })
+
+    def test_step_variables_not_shared(self):
+        testcases = self.parse()
+        self.assertEqual(len(testcases), 2)
+        s1, nested, s2 = testcases[0]["teststeps"]
+
+        # 与 runner 相同: 嵌套用例的输出变量写入其后的步骤
+        s2["variables"].update({"x": "inner", "token": "t"})
+        nested["teststeps"][0]["variables"].update({"token": "n"})
+
+        self.assertEqual(s2["variables"]["x"], "inner")
+        self.assertEqual(dict(s1["variables"]), {"x": "s1", "uid": 1})
+        self.assertEqual(dict(nested["teststeps"][0]["variables"]), {"x": "n1", "uid": 1, "token": "n"})
+        self.assertEqual(dict(testcases[1]["teststeps"][2]["variables"]), {"x": "outer", "uid": 2})
+
+
+class LazyStringTest(SimpleTestCase):
+
+    def test_braces_in_plain_string(self):
+        self.assertEqual(vendored_parser.LazyString("abc{def}").to_value(), "abc{def}")
+        self.assertEqual(vendored_parser.LazyString("ABC$$var_1{").to_value(), "ABC$var_1{")
+        self.assertEqual(vendored_parser.LazyString("{}").to_value(), "{}")
+
+    def test_braces_with_variables(self):
+        lazy = vendored_parser.LazyString("{$a}:${a}{", check_variables_set={"a"})
+        self.assertEqual(lazy.to_value({"a": 1}), "{1}:1{")
+        self.assertEqual(vendored_parser.prepare_lazy_data("abc{def}"), "abc{def}")
+
+    def test_template_stats_per_run(self):
+        vendored_parser.compile_template("/api/$shared")
+        with vendored_cache.template_stats_scope() as first:
+            vendored_parser.compile_template("/api/$shared")
+            with vendored_cache.template_stats_scope() as second:
+                vendored_parser.compile_template("/api/$only_second")
+            vendored_parser.compile_template("/api/$shared")
+
+        self.assertEqual(first.stats(), {"hits": 2, "misses": 0, "hit_rate": 1.0})
+        self.assertEqual(second.stats(), {"hits": 0, "misses": 1, "hit_rate": 0})
+        self.assertIsNone(vendored_cache.get_template_stats())
+
+
+class VariablesMappingTest(SimpleTestCase):
+
+    @staticmethod
+    def prepare(variables, functions=None):
+        return {
+            key: vendored_parser.prepare_lazy_data(value, functions or {}, set(variables))
+            for key, value in variables.items()
+        }
+
+    def test_circular_reference(self):
+        with self.assertRaises(vendored_exceptions.VariableCircularReference) as cm:
+            vendored_parser.parse_variables_mapping(self.prepare({"a": "$b", "b": "${c}", "c": "x$a", "d": 1}))
+        self.assertEqual(cm.exception.cycle, ["a", "b", "c", "a"])
+        self.assertIn("a -> b -> c -> a", str(cm.exception))
+
+    def test_self_reference(self):
+        with self.assertRaises(vendored_exceptions.VariableNotFound) as cm:
+            vendored_parser.parse_variables_mapping(self.prepare({"token": "$token", "other": 1}))
+        self.assertNotIsInstance(cm.exception, vendored_exceptions.VariableCircularReference)
+
+    def test_missing_variable_reported_transitively(self):
+        variables = {"a": "$b", "b": "/api/$missing", "c": "$d", "d": 1}
+        prepared = {key: vendored_parser.prepare_lazy_data(value, {}, set(variables) | {"missing"})
+                    for key, value in variables.items()}
+        with self.assertRaises(vendored_exceptions.VariableNotFound) as cm:
+            vendored_parser.parse_variables_mapping(prepared)
+        self.assertEqual(set(cm.exception.args[0]), {"a", "b"})
+
+    def test_evaluate_once_in_order(self):
+        calls = []
+
+        def gen_token(user):
+            calls.append(user)
+            return f"token-{user}"
+
+        variables = self.prepare({
+            "header": "Bearer $token",
+            "url": "/api/$user",
+            "token": "${gen_token($user)}",
+            "copy": "$token",
+            "user": "admin"
+        }, {"gen_token": gen_token})
+        parsed = vendored_parser.parse_variables_mapping(variables)
+
+        self.assertEqual(list(parsed), ["header", "url", "token", "copy", "user"])
+        self.assertEqual(parsed["header"], "Bearer token-admin")
+        self.assertEqual(parsed["copy"], "token-admin")
+        self.assertEqual(calls, ["admin"])
+
+    def test_init_test_variables_with_session_variables(self):
+        calls = []
+
+        def gen_token(user):
+            calls.append(user)
+            return f"token-{user}"
+
+        session = vendored_context.SessionContext(self.prepare({"user": "admin"}))
+        session.update_session_variables({"token": "extracted"})
+        variables = {"token": "${gen_token($user)}", "header": "Bearer $token", "user": "guest"}
+        session.init_test_variables({
+            key: vendored_parser.prepare_lazy_data(value, {"gen_token": gen_token}, set(variables) | {"token"})
+            for key, value in variables.items()
+        })
+
+        # session variables override teststep variables and are not evaluated again
+        self.assertEqual(session.test_variables_mapping["header"], "Bearer extracted")
+        self.assertEqual(session.test_variables_mapping["user"], "admin")
+        self.assertEqual(calls, [])
+
+
+class ParameterSamplingTest(SimpleTestCase):
+    factors = [
+        [{"os": value} for value in ("ios", "android", "web")],
+        [{"user": value} for value in ("admin", "guest")],
+        [{"version": value} for value in ("1", "2", "3", "4")],
+        [{"lang": value} for value in ("zh", "en")],
+    ]
+
+    def product(self):
+        return list(vendored_parameters.iter_cartesian_product(*self.factors))
+
+    def test_first(self):
+        rows = list(vendored_parameters.sample_product(self.factors, {"strategy": "first", "limit": 5}))
+        self.assertEqual(rows, self.product()[:5])
+        self.assertEqual(list(vendored_parameters.sample_product(self.factors, {})), self.product())
+
+    def test_random_seeded(self):
+        sampling = {"strategy": "random", "limit": 10, "seed": 7}
+        rows = list(vendored_parameters.sample_product(self.factors, sampling))
+        product = self.product()
+        self.assertEqual(len(rows), 10)
+        # 保持笛卡尔积中的顺序, 同一个seed结果相同
+        self.assertEqual(rows, sorted(rows, key=product.index))
+        self.assertEqual(list(vendored_parameters.sample_product(self.factors, sampling)), rows)
+
+        sampling["limit"] = 1000
+        self.assertEqual(list(vendored_parameters.sample_product(self.factors, sampling)), product)
+
+    def test_pairwise_covers_all_pairs(self):
+        for sizes in ([3, 2, 4, 2], [2, 2, 2, 2, 2, 2, 2], [5, 1, 3], [4, 4, 4], [2, 3]):
+            rows = vendored_parameters.pairwise_indices(sizes)
+            for first, second in itertools.combinations(range(len(sizes)), 2):
+                self.assertEqual({(row[first], row[second]) for row in rows},
+                                 set(itertools.product(range(sizes[first]), range(sizes[second]))))
+        self.assertEqual(vendored_parameters.pairwise_indices([3, 0, 2]), [])
+
+        rows = list(vendored_parameters.sample_product(self.factors, {"strategy": "pairwise"}))
+        self.assertLess(len(rows), len(self.product()))
+        self.assertEqual(len(list(vendored_parameters.sample_product(
+            self.factors, {"strategy": "pairwise", "limit": 3}))), 3)
+
+    def test_invalid_sampling(self):
+        for sampling in ([1], {"strategy": "all"}, {"limit": -1}, {"limit": True}, {"limit": "5"},
+                         {"strategy": "random"}):
+            with self.assertRaises(vendored_exceptions.ParamsError):
+                vendored_parameters.sample_product(self.factors, sampling)
+
+    def test_iter_parameters(self):
+        parameters = [
+            {"user_agent": ["iOS/10.1", "iOS/10.2", "iOS/10.3"]},
+            {"username-password": [["user1", "111111"], ["user2", "222222"]]},
+            {"__sampling__": {"strategy": "first", "limit": 2}}
+        ]
+        rows = list(vendored_parser.iter_parameters(parameters))
+        self.assertEqual(rows, [
+            {"user_agent": "iOS/10.1", "username": "user1", "password": "111111"},
+            {"user_agent": "iOS/10.1", "username": "user2", "password": "222222"},
+        ])
+        self.assertEqual(len(parameters), 3)
+
+
+class RunSuiteTest(SimpleTestCase):
+
+    def test_index_across_chunks(self):
+        testcases = [unittest.TestSuite() for _ in range(3)]
+        runner = vendored_api.HttpRunner(concurrency=2)
+        with mock.patch.object(runner, '_run_testcase', side_effect=lambda index, testcase: index):
+            results = runner._run_suite(unittest.TestSuite(testcases), offset=500)
+
+        self.assertEqual(results, list(zip(testcases, [500, 501, 502])))
+        self.assertEqual([testcase.index for testcase in testcases], [500, 501, 502])
+
+
+class AssembleSuiteTest(TestCase):
+
+    def setUp(self):
+        self.project = runner_models.Project.objects.create(name='demo', desc='demo', responsible='rikasai')
+        self.case = runner_models.Case.objects.create(name='case', project=self.project, relation=1, length=2)
+        for step in range(2):
+            body = {"name": f"step{step}", "desc": {}, "request": {"url": f"/api/{step}", "method": "GET"}}
+            runner_models.CaseStep.objects.create(name=f'step{step}', body=body, url=f'/api/{step}', method='GET',
+                                                  case=self.case, step=step, source_api_id=0)
+
+    def test_repeated_case_not_shared(self):
+        suite_list, test_sets, _ = suite.assemble_suite(self.project.id, [self.case.id, self.case.id],
+                                                        host=['http://127.0.0.1:8000'])
+        self.assertEqual(len(suite_list), 2)
+        self.assertEqual(test_sets[0], test_sets[1])
+        for first, second in zip(*test_sets):
+            self.assertIsNot(first, second)
+        self.assertEqual(test_sets[1][0]["request"]["url"], "http://127.0.0.1:8000/api/0")
+
+        # 与 parse_cases 相同: 运行前删除步骤的desc
+        for testcase_list in test_sets:
+            for body in testcase_list:
+                del body["desc"]
+
+
+class SmartScheduleTest(TestCase):
+
+    def setUp(self):
+        self.project = runner_models.Project.objects.create(name='demo', desc='demo', responsible='rikasai')
+        self.api = runner_models.API.objects.create(
+            name='api', body={"name": "api", "request": {"url": "/api", "method": "GET"}}, url='/api',
+            method='GET', project=self.project, relation=1)
+        self.cases = []
+        for index in range(2):
+            case = runner_models.Case.objects.create(name=f'case{index}', project=self.project, relation=1, length=1)
+            runner_models.CaseStep.objects.create(
+                name='step', body={"name": "step", "request": {"url": f"/api/{index}", "method": "GET"}},
+                url=f'/api/{index}', method='GET', case=case, step=0, source_api_id=self.api.id)
+            self.cases.append(case.id)
+
+    def plan(self, **kwargs):
+        return smart_schedule.plan_cases('task', self.project.id, self.cases, **kwargs)
+
+    def run_plan(self, plan, failed=()):
+        details = [{"case_id": case_id, "success": case_id not in failed} for case_id in plan.run]
+        smart_schedule.save_results('task', plan, {"details": details})
+
+    def test_fingerprint_changes(self):
+        fingerprints = smart_schedule.case_fingerprints(self.project.id, self.cases)
+        self.assertEqual(smart_schedule.case_fingerprints(self.project.id, self.cases), fingerprints)
+
+        runner_models.CaseStep.objects.filter(case_id=self.cases[0]).update(
+            body={"name": "step", "request": {"url": "/api/changed", "method": "GET"}})
+        changed = smart_schedule.case_fingerprints(self.project.id, self.cases)
+        self.assertNotEqual(changed[self.cases[0]], fingerprints[self.cases[0]])
+        self.assertEqual(changed[self.cases[1]], fingerprints[self.cases[1]])
+
+        # 来源API和驱动代码变更影响所有用例
+        runner_models.API.objects.filter(id=self.api.id).update(
+            body={"name": "api", "request": {"url": "/api/v2", "method": "GET"}})
+        self.assertNotEqual(smart_schedule.case_fingerprints(self.project.id, self.cases)[self.cases[1]],
+                            changed[self.cases[1]])
+        before = smart_schedule.case_fingerprints(self.project.id, self.cases)
+        runner_models.Debugtalk.objects.create(project=self.project, code='def f(): pass')
+        self.assertNotEqual(smart_schedule.case_fingerprints(self.project.id, self.cases), before)
+
+    def test_skip_unchanged_green_cases(self):
+        plan = self.plan()
+        self.assertEqual((plan.run, plan.skipped), (self.cases, []))
+        self.run_plan(plan, failed={self.cases[1]})
+
+        plan = self.plan()
+        self.assertEqual(plan.run, [self.cases[1]])
+        self.assertEqual(plan.skipped, [{"id": self.cases[0], "name": "case0"}])
+        self.run_plan(plan)
+        self.assertEqual(runner_models.ScheduleCaseResult.objects.get(case_id=self.cases[0]).skipped, 1)
+
+        runner_models.CaseStep.objects.filter(case_id=self.cases[1]).update(
+            body={"name": "step", "request": {"url": "/api/changed", "method": "GET"}})
+        self.assertEqual(self.plan().run, [self.cases[1]])
+
+    def test_full_run_interval_and_force(self):
+        self.run_plan(self.plan())
+        self.assertEqual(self.plan(force=True).run, self.cases)
+
+        plan = self.plan(full_run_interval=3)
+        self.assertEqual(plan.run, [])
+        self.run_plan(plan)
+        plan = self.plan(full_run_interval=3)
+        self.assertEqual(plan.run, [])
+        self.run_plan(plan)
+        # 连续跳过 full_run_interval-1 次后执行一次
+        plan = self.plan(full_run_interval=3)
+        self.assertEqual(plan.run, self.cases)
+        self.run_plan(plan)
+        self.assertEqual(self.plan(full_run_interval=3).run, [])
+
+    def test_all_skipped_still_reported(self):
+        self.run_plan(self.plan())
+        with mock.patch.object(tasks.lark_message, 'send_message') as send_message:
+            tasks.schedule_debug_suite(*self.cases, project=self.project.id, task_name='task', smart=True,
+                                       strategy='始终发送', webhook='https://open.feishu.cn/open-apis/bot/hook/x')
+
+        report = runner_models.Report.objects.get(project=self.project)
+        summary = json.loads(report.summary)
+        self.assertEqual(summary["stat"]["testcases"]["skipped"], 2)
+        self.assertEqual([case["id"] for case in summary["skipped_cases"]], self.cases)
+        self.assertEqual(report.type, 3)
+
+        summary = send_message.call_args[1]["summary"]
+        self.assertEqual(summary["task_name"], 'task')
+        self.assertEqual(summary["stat"]["testcases"]["skipped"], 2)
+
+    def test_deploy_runs_all_cases(self):
+        self.run_plan(self.plan())
+        summary = smart_schedule.skipped_summary()
+        summary["details"] = [{"case_id": case_id, "success": True, "in_out": {}, "records": []}
+                              for case_id in self.cases]
+        with mock.patch.object(tasks, 'debug_suite_tree', return_value=summary) as debug_suite_tree:
+            tasks.schedule_debug_suite(*self.cases, project=self.project.id, task_name='task', smart=True,
+                                       run_type='deploy', strategy='从不发送')
+
+        self.assertEqual([case["id"] for case in debug_suite_tree.call_args[0][2]], self.cases)
+        self.assertEqual(runner_models.Report.objects.get(project=self.project).name, '部署_task')
+
+
+class ConcurrencyTest(TestCase):
+
+    def setUp(self):
+        self.project = runner_models.Project.objects.create(name='demo', desc='demo', responsible='rikasai')
+
+    def test_normalize(self):
+        self.assertIsNone(concurrency.normalize_concurrency(''))
+        self.assertEqual(concurrency.normalize_concurrency('4'), 4)
+        self.assertEqual(concurrency.normalize_concurrency(0), 1)
+        with self.settings(RUNNER_MAX_CONCURRENCY=8):
+            self.assertEqual(concurrency.normalize_concurrency(500), 8)
+        for value in ['abc', 2.5, [4], True]:
+            with self.assertRaises(ValueError):
+                concurrency.normalize_concurrency(value)
+
+    def test_priority(self):
+        with self.settings(RUNNER_CONCURRENCY=2):
+            self.assertEqual(concurrency.get_concurrency(self.project.id), 2)
+            self.project.concurrency = 6
+            self.project.save()
+            self.assertEqual(concurrency.get_concurrency(self.project), 6)
+            self.assertEqual(concurrency.get_concurrency(self.project.id, '3'), 3)
+
+
+class FileCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.root.name, "case.yml")
+        with open(self.file_path, "w") as f:
+            f.write("name: demo")
+        # 刚修改的文件不走快速路径, 调整为10秒前
+        past = os.stat(self.file_path).st_mtime - 10
+        os.utime(self.file_path, (past, past))
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def load_twice(self, file_cache):
+        return [file_cache.load(self.file_path, lambda data: data.decode()) for _ in range(2)]
+
+    def test_disabled_by_default(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop(filecache.CACHE_DIR_ENV, None)
+            self.assertIsNone(filecache.default_cache_dir())
+
+    def test_private_dir(self):
+        file_cache = filecache.FileCache(os.path.join(self.root.name, "cache"))
+        self.assertEqual(self.load_twice(file_cache), ["name: demo"] * 2)
+        self.assertEqual((file_cache.hits, file_cache.misses), (1, 1))
+        self.assertEqual(os.stat(file_cache.cache_dir).st_mode & 0o777, 0o700)
+
+    def test_shared_dir_not_used(self):
+        cache_dir = os.path.join(self.root.name, "cache")
+        os.makedirs(cache_dir)
+        os.chmod(cache_dir, 0o777)
+        file_cache = filecache.FileCache(cache_dir)
+        self.assertEqual(self.load_twice(file_cache), ["name: demo"] * 2)
+        self.assertFalse(file_cache.enabled)
+        self.assertEqual(os.listdir(cache_dir), [])
+
+
+class VisitBufferTest(TestCase):
+
+    def test_bad_row_not_drop_batch(self):
+        buffer = visit.VisitBuffer(batch_size=10)
+        for index in range(3):
+            # 请求体为空违反非空约束, 导致整批写入失败
+            buffer._buffer.append(runner_models.Visit(
+                user='rikasai', ip='127.0.0.1', project='1', url=f'/api/{index}', request_method='GET',
+                request_body=None if index == 1 else ''))
+
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(buffer.stats(), {"pending": 0, "flushed": 2, "dropped": 1})
+        self.assertEqual(sorted(runner_models.Visit.objects.values_list('url', flat=True)), ['/api/0', '/api/2'])
+        self.assertEqual(runner_models.VisitDaily.objects.get(project='1').count, 2)
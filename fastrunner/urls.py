@@ -150,6 +150,14 @@ urlpatterns = [
         "get": "look"
     })),
 
+    path('reports/<int:pk>/records/', report.ReportView.as_view({
+        "get": "records"
+    })),
+
+    path('reports/<int:pk>/records/<int:index>/', report.ReportView.as_view({
+        "get": "record"
+    })),
+
     path('host_ip/', config.HostIPView.as_view({
         "post": "add",
         "get": "list"
@@ -0,0 +1,36 @@
+"""
+单次运行中同时执行的用例数
+    请求/定时任务指定 > 项目配置 > RUNNER_CONCURRENCY, 限制在 1 ~ RUNNER_MAX_CONCURRENCY
+"""
+from django.conf import settings
+
+from fastrunner import models
+
+
+def normalize_concurrency(value):
+    """校验并限制并发数, None或空字符串表示未指定
+        非整数时 raise ValueError
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool) or isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"concurrency must be an integer: {value!r}")
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"concurrency must be an integer: {value!r}")
+    return min(max(value, 1), getattr(settings, 'RUNNER_MAX_CONCURRENCY', 20))
+
+
+def get_concurrency(project, value=None):
+    """本次运行的并发数
+        project: Project 或 project id
+        value: 请求或定时任务指定的并发数
+    """
+    concurrency = normalize_concurrency(value)
+    if concurrency is None:
+        concurrency = models.Project.objects.filter(id=getattr(project, 'id', project)). \
+            values_list('concurrency', flat=True).first()
+    if concurrency is None:
+        concurrency = getattr(settings, 'RUNNER_CONCURRENCY', 1)
+    return normalize_concurrency(concurrency)
@@ -0,0 +1,116 @@
+import ast
+import json
+
+from django.db import models
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(content):
+    """反序列化JSON文本, 优先使用orjson
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # orjson 不支持的格式(如超长整数)交给标准库处理
+            pass
+
+    return json.loads(content)
+
+
+def json_dumps(content):
+    """序列化为JSON文本, 保留中文
+    """
+    return json.dumps(content, ensure_ascii=False)
+
+
+def load_text(content):
+    """解析主体信息, 兼容历史数据中 str(dict) 格式
+    """
+    try:
+        return json_loads(content)
+    except ValueError:
+        return ast.literal_eval(content)
+
+
+class JSONTextField(models.TextField):
+    """
+    以JSON文本存储的 dict/list 字段, 从数据库读取时只解析一次
+    """
+    description = "JSON text"
+
+    def from_db_value(self, value, expression, connection):
+        if not value:
+            return value
+        return load_text(value)
+
+    def to_python(self, value):
+        if isinstance(value, str) and value:
+            return load_text(value)
+        return value
+
+    def get_prep_value(self, value):
+        if value is None or isinstance(value, str):
+            return value
+        return json_dumps(value)
+
+    def value_to_string(self, obj):
+        return self.get_prep_value(self.value_from_object(obj))
+
+
+def convert_json_column(connection, table, column="body", batch_size=500):
+    """将表中 str(dict) 格式的历史数据批量转换为JSON文本
+
+    Args:
+        connection: 数据库连接
+        table (str): 表名
+        column (str): 字段名
+        batch_size (int): 每批处理的行数
+
+    Returns:
+        tuple: (转换行数, 解析失败的id列表)
+
+    """
+    quote = connection.ops.quote_name
+    select_sql = "SELECT id, {column} FROM {table} WHERE id > %s ORDER BY id LIMIT %s".format(
+        column=quote(column), table=quote(table))
+    update_sql = "UPDATE {table} SET {column} = %s WHERE id = %s".format(
+        column=quote(column), table=quote(table))
+
+    converted = 0
+    failed = []
+    last_id = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(select_sql, [last_id, batch_size])
+            rows = cursor.fetchall()
+        if not rows:
+            break
+
+        params = []
+        for pk, value in rows:
+            if not value:
+                continue
+            try:
+                json_loads(value)
+                continue
+            except ValueError:
+                pass
+
+            try:
+                params.append([json_dumps(ast.literal_eval(value)), pk])
+            except (ValueError, SyntaxError):
+                failed.append(pk)
+
+        if params:
+            with connection.cursor() as cursor:
+                cursor.executemany(update_sql, params)
+            converted += len(params)
+
+        last_id = rows[-1][0]
+
+    return converted, failed
@@ -2,37 +2,68 @@ from urllib.parse import urlparse
 import re
 
 
-def parse_host(ip, api):
+# host配置每行中的 ip:port
+IP_PORT = re.compile(r'\b(?:25[0-5]\.|2[0-4]\d\.|[01]?\d\d?\.){3}(?:25[0-5]|2[0-4]\d|[01]?\d\d?)\b:\d{0,5}')
 
 
-    if not isinstance(ip, list):
-        return api
-    if not api:
-        return api
-    try:
-        parts = urlparse(api["request"]["url"])
-    except KeyError:
-        parts = urlparse(api["request"]["base_url"])
+class HostTable(object):
+    """
+    预编译的host配置, 每行只解析一次, 同一域名只查找一次, 批量替换API时复用
+    """
 
-    host = parts.netloc
-    if host:
+    def __init__(self, ip):
+        """
+        ip: host配置的行列表
+        """
+        self.lines = ip
+        # (行内容, 行中最后一个 ip:port), 注释行和没有 ip:port 的行不参与匹配
+        self.entries = []
         for content in ip:
             content = content.strip()
-            if host in content and not content.startswith("#"):
-                # ip = re.findall(r'\b(?:25[0-5]\.|2[0-4]\d\.|[01]?\d\d?\.){3}(?:25[0-5]|2[0-4]\d|[01]?\d\d?)\b', content)
-                ip = re.findall(r'\b(?:25[0-5]\.|2[0-4]\d\.|[01]?\d\d?\.){3}(?:25[0-5]|2[0-4]\d|[01]?\d\d?)\b:\d{0,5}', content)
-                if ip:
-                    if "headers" in api["request"].keys():
-                        api["request"]["headers"]["Host"] = host
-                    else:
-                        api["request"].setdefault("headers", {"Host": host})
-                    try:
-                        api["request"]["url"] = api["request"]["url"].replace(host, ip[-1])
-                    except KeyError:
-                        api["request"]["base_url"] = api["request"]["base_url"].replace(host, ip[-1])
-    else:
-        api["request"]["url"] = ip[0] + api["request"]["url"]
-    return api
+            if content.startswith("#"):
+                continue
+            found = IP_PORT.findall(content)
+            if found:
+                self.entries.append((content, found[-1]))
+        self._resolved = {}
+
+    def resolve(self, host):
+        """包含域名的第一行配置中的 ip:port, 没有时返回None
+        """
+        if host not in self._resolved:
+            self._resolved[host] = next((ip for content, ip in self.entries if host in content), None)
+        return self._resolved[host]
+
+    def apply(self, api):
+        if not api:
+            return api
+        try:
+            parts = urlparse(api["request"]["url"])
+        except KeyError:
+            parts = urlparse(api["request"]["base_url"])
+
+        host = parts.netloc
+        if host:
+            ip = self.resolve(host)
+            if ip:
+                if "headers" in api["request"].keys():
+                    api["request"]["headers"]["Host"] = host
+                else:
+                    api["request"].setdefault("headers", {"Host": host})
+                try:
+                    api["request"]["url"] = api["request"]["url"].replace(host, ip)
+                except KeyError:
+                    api["request"]["base_url"] = api["request"]["base_url"].replace(host, ip)
+        else:
+            api["request"]["url"] = self.lines[0] + api["request"]["url"]
+        return api
+
+
+def parse_host(ip, api):
+
+    if not isinstance(ip, list):
+        return api
+    return HostTable(ip).apply(api)
 
 
 def parse_host_suite_tree(ip, api):
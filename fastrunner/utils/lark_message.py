@@ -27,17 +27,21 @@ def get_base_post_content():
 
 def parse_message(summary: dict, msg_type: str):
     task_name = summary["task_name"]
-    rows_count = summary['stat']['testsRun']
-    pass_count = summary['stat']['successes']
-    fail_count = summary['stat']['failures']
-    error_count = summary['stat']['errors']
+    # 步骤统计, 与 report.get_summary 的字段一致
+    stat = summary['stat']['teststeps']
+    rows_count = stat.get('total', stat.get('testsRun', 0))
+    pass_count = stat.get('successes', 0)
+    fail_count = stat.get('failures', 0)
+    error_count = stat.get('errors', 0)
+    # 智能定时任务跳过的用例数
+    skipped_count = summary['stat'].get('testcases', {}).get('skipped')
     duration = '%.2fs' % summary['time']['duration']
     report_id = models.Report.objects.last().id
     base_url = settings.IM_REPORT_SETTING.get('base_url')
     port = settings.IM_REPORT_SETTING.get('port')
     report_url = f'{base_url}:{port}/api/fastrunner/reports/{report_id}/'
     executed = rows_count
-    fail_rate = '{:.2%}'.format(fail_count / executed)
+    fail_rate = '{:.2%}'.format(fail_count / executed) if executed else '0.00%'
     # 富文本
     if msg_type == 'post':
         msg_template = get_base_post_content()
@@ -48,11 +52,14 @@ def parse_message(summary: dict, msg_type: str):
                    [{'text': f'失败接口: {fail_count}'}],
                    [{'text': f'失败比例: {fail_rate}'}],
                    [{'text': f'查看详情: {report_url}'}]]
+        if skipped_count is not None:
+            content.insert(-1, [{'text': f'跳过用例: {skipped_count}(未变更且上次成功)'}])
         for d in content:
             d[0].update({'tag': 'text'})
         msg_template['content']['post']['zh_cn']['content'] = content
         return msg_template
-    text = f" 任务名称: {task_name}\n 总共耗时: {duration}\n 成功接口: {pass_count}个\n 异常接口: {error_count}个\n 失败接口: {fail_count}个\n 失败比例: {fail_rate}\n 查看详情: {report_url}"
+    skipped_text = f" 跳过用例: {skipped_count}个(未变更且上次成功)\n" if skipped_count is not None else ""
+    text = f" 任务名称: {task_name}\n 总共耗时: {duration}\n 成功接口: {pass_count}个\n 异常接口: {error_count}个\n 失败接口: {fail_count}个\n 失败比例: {fail_rate}\n{skipped_text} 查看详情: {report_url}"
     return text
 
 
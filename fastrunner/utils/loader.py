@@ -1,33 +1,34 @@
 import copy
 import datetime
 import functools
+import hashlib
 import importlib
 import io
 import json
-import os
-import shutil
 import sys
-import tempfile
 import types
-from threading import Thread
+from threading import Lock, Thread
 
-from requests import utils
 import yaml
-from bs4 import BeautifulSoup
 
 from fastrunner.httprunner.api import  HttpRunner
 from fastrunner.httprunner import logger, parser
 from fastrunner.httprunner.exceptions import FunctionNotFound, VariableNotFound
 
-from requests.cookies import RequestsCookieJar
 from requests_toolbelt import MultipartEncoder
 
 from fastrunner import models
+from fastrunner.utils import report as report_store
+from fastrunner.utils.concurrency import get_concurrency
 from fastrunner.utils.parser import Format
-from FasterRunner.settings.base import BASE_DIR
+from FasterRunner.settings.base import RUNNER_HTTP_POOL, RUNNER_LOG_CAPTURE
 
 logger.setup_logger('DEBUG')
 
+# 驱动代码缓存 {project_id: (code_hash, {"variables": {}, "functions": {}})}
+_debugtalk_cache = {}
+_debugtalk_lock = Lock()
+
 TEST_NOT_EXISTS = {
     "code": "0102",
     "status": False,
@@ -100,11 +101,11 @@ class FileLoader(object):
             stream.write(data)
 
     @staticmethod
-    def load_python_module(file_path):
-        """ load python module.
+    def parse_python_module(module):
+        """ parse variables and functions mapping of python module.
 
         Args:
-            file_path: python path
+            module: python module object
 
         Returns:
             dict: variables and functions mapping for specified python module
@@ -120,12 +121,6 @@ class FileLoader(object):
             "functions": {}
         }
 
-        sys.path.insert(0, file_path)
-        module = importlib.import_module("debugtalk")
-        # 修复重载bug
-        importlib.reload(module)
-        sys.path.pop(0)
-
         for name, item in vars(module).items():
             if is_function((name, item)):
                 debugtalk_module["functions"][name] = item
@@ -138,6 +133,44 @@ class FileLoader(object):
 
         return debugtalk_module
 
+    @staticmethod
+    def load_python_module(file_path):
+        """ load python module.
+
+        Args:
+            file_path: python path
+
+        Returns:
+            dict: variables and functions mapping for specified python module
+
+        """
+        sys.path.insert(0, file_path)
+        module = importlib.import_module("debugtalk")
+        # 修复重载bug
+        importlib.reload(module)
+        sys.path.pop(0)
+
+        return FileLoader.parse_python_module(module)
+
+    @staticmethod
+    def load_python_code(code, module_name="debugtalk"):
+        """ compile python code into an isolated module object,
+            without touching sys.path, sys.modules or current working directory.
+
+        Args:
+            code (str): python source code
+            module_name (str): module name
+
+        Returns:
+            dict: variables and functions mapping for specified python code
+
+        """
+        module = types.ModuleType(module_name)
+        module.__file__ = "{}.py".format(module_name)
+        exec(compile(code, module.__file__, "exec"), module.__dict__)
+
+        return FileLoader.parse_python_module(module)
+
 
 def parse_validate_and_extract(list_of_dict: list, variables_mapping: dict, functions_mapping, api_variables: list):
     """
@@ -299,39 +332,76 @@ def parse_tests(testcases, debugtalk, name=None, config=None, project=None):
 
 
 def load_debugtalk(project):
-    """import debugtalk.py in sys.path and reload
+    """加载项目驱动代码, 按 项目id + 代码hash 缓存编译结果
         project: int
     """
     # debugtalk.py
-    code = models.Debugtalk.objects.get(project__id=project).code
-
-    # file_path = os.path.join(tempfile.mkdtemp(prefix='FasterRunner'), "debugtalk.py")
-    tempfile_path = tempfile.mkdtemp(
-        prefix='FasterRunner', dir=os.path.join(
-            BASE_DIR, 'tempWorkDir'))
-    file_path = os.path.join(tempfile_path, 'debugtalk.py')
-    os.chdir(tempfile_path)
-    try:
-        FileLoader.dump_python_file(file_path, code)
-        debugtalk = FileLoader.load_python_module(os.path.dirname(file_path))
-        return debugtalk, file_path
+    code = models.Debugtalk.objects.values_list('code', flat=True).get(project__id=project)
+    code_hash = hashlib.md5(code.encode('utf-8')).hexdigest()
 
-    except Exception as e:
-        os.chdir(BASE_DIR)
-        shutil.rmtree(os.path.dirname(file_path))
+    cached = _debugtalk_cache.get(project)
+    if cached and cached[0] == code_hash:
+        return cached[1]
 
+    with _debugtalk_lock:
+        cached = _debugtalk_cache.get(project)
+        if cached and cached[0] == code_hash:
+            return cached[1]
 
+        debugtalk = FileLoader.load_python_code(code)
+        _debugtalk_cache[project] = (code_hash, debugtalk)
 
-def debug_suite_tree_pk(testcases, project, obj, config=None, save=True, user='',log_file=None):
+    return debugtalk
+
+
+def invalidate_debugtalk(project):
+    """驱动代码更新后清除缓存
+        project: int
+    """
+    _debugtalk_cache.pop(project, None)
+
+
+def parameterize_cases(testset, config):
+    """配置了参数化时, 将用例包装为用例集, 运行时按参数逐行生成用例, 不预先展开
+        testset: parse_cases 返回的用例
+        config: 用例引用的配置, parameters 中可用 __sampling__ 配置抽样
+        return: testsuite, 未配置参数化时返回 None
+    """
+    parameters = (config or {}).get('parameters')
+    if not parameters:
+        return None
+
+    # 用例集名称不参与展示, 用例名称中可以引用参数, 如 "登录-$username"
+    name = testset["config"]["name"]
+    return {
+        "config": {},
+        "testcases": {
+            name: {
+                "testcase": testset.get("path", ""),
+                "parameters": parameters,
+                "testcase_def": testset
+            }
+        }
+    }
+
+
+def append_cases(pro_map, testset, config):
+    """按是否参数化, 将用例加入 testcases 或 testsuites
+    """
+    testsuite = parameterize_cases(testset, config)
+    if testsuite:
+        pro_map.setdefault('testsuites', []).append(testsuite)
+    else:
+        pro_map['testcases'].append(testset)
+
+
+def debug_suite_tree_pk(testcases, project, obj, config=None, save=True, user='',log_file=None, concurrency=None):
     '''
     运行多条测试用例
     '''
     if len(testcases) == 0:
         return TEST_NOT_EXISTS
-    debugtalk = load_debugtalk(project)
-    debugtalk_content = debugtalk[0]
-    debugtalk_path = debugtalk[1]
-    os.chdir(os.path.dirname(debugtalk_path))
+    debugtalk_content = load_debugtalk(project)
 
     pro_map = {
         "project_mapping": {
@@ -349,19 +419,22 @@ def debug_suite_tree_pk(testcases, project, obj, config=None, save=True, user=''
 
     try:
 
-        testcases = copy.deepcopy(
-                parse_cases(
-                    testcases,
-                    name=obj[0]['name'],
-                    config=None,
-                    project=project
-                ))
-        pro_map['testcases'].append(testcases)
+        # parse_cases 每次构造新的用例结构, 无需再深拷贝
+        testcases = parse_cases(
+            testcases,
+            name=obj[0]['name'],
+            config=None,
+            project=project
+        )
+        append_cases(pro_map, testcases, config)
 
 
         kwargs = {
             "failfast": False,
-            "log_file": log_file
+            "log_file": log_file,
+            "concurrency": get_concurrency(project, concurrency),
+            "http_pool": RUNNER_HTTP_POOL,
+            "log_capture": RUNNER_LOG_CAPTURE
         }
 
         from fastrunner.httprunner3.api import HttpRunner as HttpRunner3
@@ -371,35 +444,28 @@ def debug_suite_tree_pk(testcases, project, obj, config=None, save=True, user=''
 
         runner3.run(pro_map)
 
-        summary = parse_summary(runner3._summary)
+        summary = runner3._summary
 
 
-        with open(log_file, 'r') as r:
-            msg = r.readlines()
-        summary['msg'] = msg
+        # 日志由本次运行的 log_capture 收集, 超出上限时只保留最新的部分
+        summary['msg'] = runner3.log_capture.lines()
         if save:
-            save_summary(f"批量运行{len(pro_map['testcases'])}条用例", summary, project, api_type=1, user=user)
+            save_summary(f"批量运行{len(obj)}条用例", summary, project, api_type=1, user=user)
 
         return summary
 
     except Exception as e:
         raise SyntaxError(str(e))
-    finally:
-        os.chdir(BASE_DIR)
-        shutil.rmtree(os.path.dirname(debugtalk_path))
 
 
 
-def debug_suite_tree(suite, project, obj, config=None, save=True, user='',log_file=None):
+def debug_suite_tree(suite, project, obj, config=None, save=True, user='',log_file=None, concurrency=None):
     '''
     运行多条测试用例
     '''
     if len(suite) == 0:
         return TEST_NOT_EXISTS
-    debugtalk = load_debugtalk(project)
-    debugtalk_content = debugtalk[0]
-    debugtalk_path = debugtalk[1]
-    os.chdir(os.path.dirname(debugtalk_path))
+    debugtalk_content = load_debugtalk(project)
 
     pro_map = {
         "project_mapping": {
@@ -415,19 +481,24 @@ def debug_suite_tree(suite, project, obj, config=None, save=True, user='',log_fi
     pro_map['project_mapping']['functions'] = functions_mapping
     try:
         for index in range(len(suite)):
-            testcases = copy.deepcopy(
-                parse_cases(
-                    suite[index],
-                    name=obj[index]['name'],
-                    config=config[index],
-                    project=project
-                ))
-            pro_map['testcases'].append(testcases)
+            testcases = parse_cases(
+                suite[index],
+                name=obj[index]['name'],
+                config=config[index],
+                project=project
+            )
+            if obj[index].get('id') is not None:
+                # 报告 details 中按 case_id 对应到用例
+                testcases["config"]["case_id"] = obj[index]['id']
+            append_cases(pro_map, testcases, config[index])
 
 
         kwargs = {
             "failfast": False,
-            "log_file": log_file
+            "log_file": log_file,
+            "concurrency": get_concurrency(project, concurrency),
+            "http_pool": RUNNER_HTTP_POOL,
+            "log_capture": RUNNER_LOG_CAPTURE
         }
 
         from fastrunner.httprunner3.api import HttpRunner as HttpRunner3
@@ -437,25 +508,21 @@ def debug_suite_tree(suite, project, obj, config=None, save=True, user='',log_fi
 
         runner3.run(pro_map)
 
-        summary = parse_summary(runner3._summary)
+        summary = runner3._summary
 
 
-        with open(log_file, 'r') as r:
-            msg = r.readlines()
-        summary['msg'] = msg
+        # 日志由本次运行的 log_capture 收集, 超出上限时只保留最新的部分
+        summary['msg'] = runner3.log_capture.lines()
         if save:
-            save_summary(f"批量运行{len(pro_map['testcases'])}条用例", summary, project, api_type=1, user=user)
+            save_summary(f"批量运行{len(obj)}条用例", summary, project, api_type=1, user=user)
 
         return summary
 
     except Exception as e:
         raise SyntaxError(str(e))
-    finally:
-        os.chdir(BASE_DIR)
-        shutil.rmtree(os.path.dirname(debugtalk_path))
 
 
-def debug_suite(suite, project, obj, config=None, save=True, user='',log_file=None):
+def debug_suite(suite, project, obj, config=None, save=True, user='',log_file=None, concurrency=None):
     """debug suite
            suite :list
            pk: int
@@ -464,10 +531,7 @@ def debug_suite(suite, project, obj, config=None, save=True, user='',log_file=No
     if len(suite) == 0:
         return TEST_NOT_EXISTS
 
-    debugtalk = load_debugtalk(project)
-    debugtalk_content = debugtalk[0]
-    debugtalk_path = debugtalk[1]
-    os.chdir(os.path.dirname(debugtalk_path))
+    debugtalk_content = load_debugtalk(project)
     test_sets = []
 
 
@@ -503,20 +567,22 @@ def debug_suite(suite, project, obj, config=None, save=True, user='',log_file=No
         # for index in range(len(suite)):
             # copy.deepcopy 修复引用bug
             # testcases = copy.deepcopy(parse_tests(suite[index], debugtalk, name=obj[index]['name'], config=config[index]))
-        testcases = copy.deepcopy(
-                parse_tests(
-                    suite,
-                    debugtalk_content,
-                    name=None,
-                    config=config,
-                    project=project
-                ))
+        testcases = parse_tests(
+            suite,
+            debugtalk_content,
+            name=None,
+            config=config,
+            project=project
+        )
             # test_sets.append(testcases)
 
         print (testcases)
         kwargs = {
             "failfast": False,
-            "log_file": log_file
+            "log_file": log_file,
+            "concurrency": get_concurrency(project, concurrency),
+            "http_pool": RUNNER_HTTP_POOL,
+            "log_capture": RUNNER_LOG_CAPTURE
         }
 
         from  fastrunner.httprunner3.api import HttpRunner as HttpRunner3
@@ -525,18 +591,15 @@ def debug_suite(suite, project, obj, config=None, save=True, user='',log_file=No
 
         runner3.run(test_sets)
 
-        summary = parse_summary(runner3._summary)
+        summary = runner3._summary
         if save:
             save_summary(f"批量运行{len(test_sets)}条用例", summary, project, type=1, user=user)
         return summary
     except Exception as e:
         raise SyntaxError(str(e))
-    finally:
-        os.chdir(BASE_DIR)
-        shutil.rmtree(os.path.dirname(debugtalk_path))
 
 
-def debug_api(api, project, name=None, config=None, save=True, user='',log_file=None):
+def debug_api(api, project, name=None, config=None, save=True, user='',log_file=None, concurrency=None):
     """debug api
         api :dict or list
         project: int
@@ -577,10 +640,7 @@ def debug_api(api, project, name=None, config=None, save=True, user='',log_file=
                         parameters.append(dic)
         config['parameters'] = parameters
 
-    debugtalk = load_debugtalk(project)
-    debugtalk_content = debugtalk[0]
-    debugtalk_path = debugtalk[1]
-    os.chdir(os.path.dirname(debugtalk_path))
+    debugtalk_content = load_debugtalk(project)
 
 
     '''
@@ -609,9 +669,6 @@ def debug_api(api, project, name=None, config=None, save=True, user='',log_file=
         return summary
     except Exception as e:
         raise SyntaxError(str(e))
-    finally:
-        os.chdir(BASE_DIR)
-        shutil.rmtree(os.path.dirname(debugtalk_path))
     
     '''
     try:
@@ -625,7 +682,10 @@ def debug_api(api, project, name=None, config=None, save=True, user='',log_file=
 
         kwargs = {
             "failfast": False,
-            "log_file":log_file
+            "log_file":log_file,
+            "concurrency": get_concurrency(project, concurrency),
+            "http_pool": RUNNER_HTTP_POOL,
+            "log_capture": RUNNER_LOG_CAPTURE
         }
 
 
@@ -640,10 +700,9 @@ def debug_api(api, project, name=None, config=None, save=True, user='',log_file=
 
 
         # summary = runner3._summary
-        summary = parse_summary(runner3._summary)
-        with open(log_file,'r') as r:
-            msg = r.readlines()
-        summary['msg'] =msg
+        summary = runner3._summary
+        # 日志由本次运行的 log_capture 收集, 超出上限时只保留最新的部分
+        summary['msg'] = runner3.log_capture.lines()
 
 
 
@@ -652,9 +711,6 @@ def debug_api(api, project, name=None, config=None, save=True, user='',log_file=
         return summary
     except Exception as e:
        print ('-----debug_api-----',e)
-    finally:
-        os.chdir(BASE_DIR)
-        shutil.rmtree(os.path.dirname(debugtalk_path))
 
 
 
@@ -718,7 +774,7 @@ def load_test(test, project=None):
             else:
                 case_step = models.API.objects.get(id=test['id'])
 
-        testcase = eval(case_step.body)
+        testcase = case_step.body
         name = test['body']['name']
 
         if case_step.name != name:
@@ -743,36 +799,6 @@ def back_async(func):
 
 
 
-def parse_summary(summary):
-    """序列化summary
-    """
-
-    for detail in summary["details"]:
-
-        for record in detail["records"]:
-
-
-
-            for key, value in record["meta_data"]["request"].items():
-                if isinstance(value, bytes):
-                    record["meta_data"]["request"][key] = value.decode("utf-8")
-                if isinstance(value, RequestsCookieJar):
-                    record["meta_data"]["request"][key] = utils.dict_from_cookiejar(
-                        value)
-
-            for key, value in record["meta_data"]["response"].items():
-                if isinstance(value, bytes):
-                    record["meta_data"]["response"][key] = value.decode(
-                        "utf-8")
-                if isinstance(value, RequestsCookieJar):
-                    record["meta_data"]["response"][key] = utils.dict_from_cookiejar(
-                        value)
-
-            if "text/html" in record["meta_data"]["response"]["content_type"]:
-                record["meta_data"]["response"]["content"] = BeautifulSoup(
-                    record["meta_data"]["response"]["content"], features="html.parser").prettify()
-
-    return summary
 def save_summary(name, summary, project, api_type=2, user=''):
     """保存报告信息
     """
@@ -781,8 +807,9 @@ def save_summary(name, summary, project, api_type=2, user=''):
     if name == "" or name is None:
         name = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-    # 　删除用不到的属性
-    summary['details'][0].pop('in_out')
+    # 　删除用不到的属性, 智能定时任务的用例全部跳过时没有 details
+    if summary['details']:
+        summary['details'][0].pop('in_out')
     # 需要先复制一份,不然会把影响到debug_api返回给前端的报告
     summary = copy.copy(summary)
     summary_detail = summary.pop('details')
@@ -793,9 +820,10 @@ def save_summary(name, summary, project, api_type=2, user=''):
         "type": api_type,
         "status": summary['success'],
         "summary": json.dumps(summary, ensure_ascii=False),
-        "creator": user
+        "creator": user,
+        **report_store.summary_columns(summary)
     })
-    models.ReportDetail.objects.create(summary_detail=summary_detail, report=report)
+    report_store.save_details(report, summary_detail)
 
 
 @back_async
@@ -1,6 +1,7 @@
 from django.utils.deprecation import MiddlewareMixin
 from rest_framework.response import Response
 from fastrunner.models import Visit
+from fastrunner.utils.visit import visit_buffer
 import logging
 
 logger = logging.getLogger()
@@ -44,6 +45,6 @@ class VisitTimesMiddleware(MiddlewareMixin):
         else:
             query_params = ''
 
-        Visit.objects.create(user=user, url=url, request_method=request.method, request_body=body, ip=ip,
-                             path=request.path, request_params=query_params[1:-1], project=project)
+        visit_buffer.add(Visit(user=user, url=url, request_method=request.method, request_body=body, ip=ip,
+                               path=request.path, request_params=query_params[1:-1], project=project))
         return response
@@ -132,7 +132,7 @@ def update_casestep(body, case, username):
             else:
                 case_step = models.API.objects.get(id=test['id'])
 
-            new_body = eval(case_step.body)
+            new_body = case_step.body
             name = test['body']['name']
 
             if case_step.name != name:
@@ -202,11 +202,11 @@ def generate_casestep(body, case, username):
                 method = test["body"]["method"]
                 config = models.Config.objects.get(name=name)
                 url = config.base_url
-                new_body = eval(config.body)
+                new_body = config.body
                 source_api_id = 0  # config没有api,默认为0
             else:
                 api = models.API.objects.get(id=test['id'])
-                new_body = eval(api.body)
+                new_body = api.body
                 name = test['body']['name']
 
                 if api.name != name:
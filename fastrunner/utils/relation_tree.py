@@ -0,0 +1,99 @@
+"""
+树形结构节点的读写, 节点按路径建立索引, 子树查询不需要读取整棵树
+"""
+import collections
+
+from django.db import transaction
+from django.db.models import Q
+
+from fastrunner import models
+from fastrunner.utils import tree as tree_utils
+
+# Relation.type
+API_TREE = 1
+CASE_TREE = 2
+
+NODE_FIELDS = ['parent', 'label', 'path', 'position']
+
+
+def load_tree(relation_id):
+    """返回原嵌套结构 [{"id": int, "label": str, "children": [...]}], 1次查询
+    """
+    return tree_utils.nest_nodes(
+        tree_utils.TreeNode(*row) for row in models.RelationNode.objects.filter(relation__id=relation_id).
+        values_list('node_id', 'parent', 'label', 'path', 'position')
+    )
+
+
+def save_tree(relation_id, value):
+    """保存前端提交的整棵树, 只写入新增、删除和移动过的节点
+        value: 嵌套结构, 节点id重复时 raise ValueError
+        return: 保存后的最大节点id
+    """
+    if not isinstance(value, list):
+        raise ValueError("tree must be a list")
+    nodes = tree_utils.flatten_tree(value)
+
+    with transaction.atomic():
+        # 锁定树, 同一棵树的修改串行执行
+        relation = models.Relation.objects.select_for_update().get(id=relation_id)
+        existing = {row.node_id: row for row in models.RelationNode.objects.filter(relation=relation)}
+
+        created = []
+        updated = []
+        for node in nodes:
+            row = existing.pop(node.id, None)
+            if row is None:
+                created.append(models.RelationNode(relation=relation, node_id=node.id, parent=node.parent,
+                                                   label=node.label, path=node.path, position=node.position))
+            elif [getattr(row, field) for field in NODE_FIELDS] != [getattr(node, field) for field in NODE_FIELDS]:
+                for field in NODE_FIELDS:
+                    setattr(row, field, getattr(node, field))
+                updated.append(row)
+
+        if existing:
+            models.RelationNode.objects.filter(id__in=[row.id for row in existing.values()]).delete()
+        models.RelationNode.objects.bulk_create(created, batch_size=500)
+        models.RelationNode.objects.bulk_update(updated, NODE_FIELDS, batch_size=500)
+
+        max_id = max([relation.max_id] + [node.id for node in nodes])
+        if max_id != relation.max_id:
+            models.Relation.objects.filter(id=relation.id).update(max_id=max_id)
+
+    return max_id
+
+
+def subtree_ids(project, tree_type, node_ids):
+    """选中节点及其全部子节点的id, 2次查询
+        按选中顺序展开, 每个节点后紧跟其子树(先序), 已出现的节点不重复; 树中不存在的节点id原样保留
+    """
+    node_ids = [int(node_id) for node_id in node_ids]
+    nodes = models.RelationNode.objects.filter(relation__project__id=project, relation__type=tree_type)
+    paths = dict(nodes.filter(node_id__in=node_ids).values_list('node_id', 'path'))
+
+    # 路径按字典序排列后, 子树的路径紧跟在其根节点之后, 只保留最上层的根节点
+    condition = Q()
+    root = None
+    for path in sorted(set(paths.values())):
+        if root is None or not path.startswith(root):
+            root = path
+            condition |= Q(path__startswith=path)
+
+    children = collections.defaultdict(list)
+    if paths:
+        for node_id, parent, position in nodes.filter(condition).values_list('node_id', 'parent', 'position'):
+            children[parent].append((position, node_id))
+
+    result = []
+    seen = set()
+    for node_id in node_ids:
+        pending = [node_id]
+        while pending:
+            node_id = pending.pop()
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            result.append(node_id)
+            pending.extend(child for _, child in sorted(children.get(node_id, []), reverse=True))
+
+    return result
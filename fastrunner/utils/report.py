@@ -0,0 +1,315 @@
+import ast
+import json
+import zlib
+
+from bs4 import BeautifulSoup
+from django.db import transaction
+
+from fastrunner import models
+from fastrunner.utils.fields import json_loads
+
+
+def compress(content):
+    """序列化并压缩报告数据, 无法序列化的值(如异常对象)按字符串保存
+    """
+    return zlib.compress(json.dumps(content, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+def decompress(blob):
+    return json_loads(zlib.decompress(bytes(blob)))
+
+
+def prettify_record(record):
+    """查看报告时格式化 html 响应内容, 运行结束时不再逐条处理
+    """
+    response = (record.get("meta_data") or {}).get("response") or {}
+    body = response.get("body")
+    if isinstance(body, str) and "text/html" in str(response.get("content_type", "")):
+        response["body"] = BeautifulSoup(body, features="html.parser").prettify()
+    return record
+
+
+def _record_elapsed(record):
+    """步骤耗时(ms), 优先取请求统计信息
+    """
+    meta_datas = record.get("meta_datas")
+    if isinstance(meta_datas, dict):
+        elapsed = meta_datas.get("stat", {}).get("response_time_ms")
+        if isinstance(elapsed, (int, float)):
+            return elapsed
+
+    elapsed = (record.get("meta_data") or {}).get("response", {}).get("response_time_ms")
+    if isinstance(elapsed, (int, float)):
+        return elapsed
+    return None
+
+
+def split_details(details):
+    """将报告详情拆分为概要和逐条记录
+        details: [testcase summary]
+        return: (skeleton, records)
+            skeleton: 用例概要, records 只保留元数据 {index, name, status, elapsed, size}
+            records: [ReportRecord] 未保存, 按 index 顺序
+    """
+    skeleton = []
+    records = []
+    for testcase_index, testcase in enumerate(details):
+        overview = {key: value for key, value in testcase.items() if key != "records"}
+        overview["records"] = []
+        for record in testcase.get("records", []):
+            data = compress(record)
+            meta = {
+                "index": len(records),
+                "name": str(record.get("name", ""))[:255],
+                "status": record.get("status", ""),
+                "elapsed": _record_elapsed(record),
+                "size": len(data),
+            }
+            overview["records"].append(meta)
+            records.append(models.ReportRecord(
+                testcase=testcase_index, data=data,
+                **{key: meta[key] for key in ("index", "name", "status", "elapsed", "size")}
+            ))
+        skeleton.append(overview)
+
+    return skeleton, records
+
+
+def summary_columns(summary):
+    """提取报告概要中列表展示和筛选排序用到的字段, 作为报告表的列保存
+        summary: 报告概要, stat 为 {"testcases": {}, "teststeps": {}}, 历史报告的 stat 即步骤统计
+        return: dict of Report fields
+    """
+    stat = summary.get("stat") or {}
+    step_stat = stat.get("teststeps", stat)
+    time = summary.get("time") or {}
+    return {
+        "start_at": time.get("start_at"),
+        "duration": time.get("duration"),
+        # httprunner2 的报告中步骤总数为 testsRun
+        "total": step_stat.get("total", step_stat.get("testsRun", 0)),
+        "successes": step_stat.get("successes", 0),
+        "failures": step_stat.get("failures", 0),
+        "errors": step_stat.get("errors", 0),
+        "stat": stat,
+        "platform": summary.get("platform") or {}
+    }
+
+
+def backfill_summary_columns(batch_size=100):
+    """为提取字段之前保存的报告补充 summary_columns 中的列, 可重复执行
+        return: (补充条数, 解析失败的report id列表)
+    """
+    filled = 0
+    failed = []
+    last_id = 0
+    fields = list(summary_columns({}))
+    while True:
+        rows = list(models.Report.objects.filter(id__gt=last_id, duration__isnull=True).
+                    order_by('id').only('id', 'summary')[:batch_size])
+        if not rows:
+            return filled, failed
+
+        reports = []
+        for report in rows:
+            try:
+                columns = summary_columns(json_loads(report.summary))
+            except (ValueError, TypeError, AttributeError):
+                failed.append(report.id)
+                continue
+            for field, value in columns.items():
+                setattr(report, field, value)
+            reports.append(report)
+
+        models.Report.objects.bulk_update(reports, fields)
+        filled += len(reports)
+        last_id = rows[-1].id
+
+
+def save_details(report, details, batch_size=200):
+    """保存报告详情: 概要写入 report_detail, 每条记录压缩后写入 report_record
+    """
+    skeleton, records = split_details(details)
+    with transaction.atomic():
+        models.ReportDetail.objects.create(
+            report=report, summary_detail=json.dumps(skeleton, ensure_ascii=False, default=str))
+        for record in records:
+            record.report = report
+        models.ReportRecord.objects.bulk_create(records, batch_size=batch_size)
+
+
+def load_legacy_details(summary_detail):
+    """解析历史数据中 str(list) 格式的报告详情
+    """
+    try:
+        return ast.literal_eval(summary_detail.replace("Markup(", "("))
+    except (ValueError, SyntaxError):
+        # 兼容旧的清洗方式, 会丢失内容中的空格和换行
+        return ast.literal_eval(summary_detail.replace('Markup', '').replace('\\n', '').
+                                replace(" ", "").replace("&#34;", "\""))
+
+
+def load_skeleton(report_detail):
+    """读取报告概要
+        return: (skeleton, legacy)
+            legacy 为 True 时 skeleton 是完整的历史报告详情
+    """
+    try:
+        return json_loads(report_detail.summary_detail), False
+    except ValueError:
+        return load_legacy_details(report_detail.summary_detail), True
+
+
+def load_details(report_id, with_records=True):
+    """读取报告详情
+        with_records: False 时只返回概要, 记录内容通过 load_record 按需读取
+        return: (details, lazy) lazy 为 True 表示记录只包含元数据
+    """
+    report_detail = models.ReportDetail.objects.get(report_id=report_id)
+    details, legacy = load_skeleton(report_detail)
+    if legacy:
+        return details, False
+    if not with_records:
+        return details, True
+
+    data = dict(models.ReportRecord.objects.filter(report_id=report_id).values_list('index', 'data'))
+    for testcase in details:
+        testcase["records"] = [
+            prettify_record(decompress(data[meta["index"]])) if meta["index"] in data else meta
+            for meta in testcase["records"]
+        ]
+    return details, False
+
+
+def count_records(report_id):
+    return models.ReportRecord.objects.filter(report_id=report_id).count()
+
+
+def load_record(report_id, index):
+    """读取单条记录, 不存在时抛出 ReportRecord.DoesNotExist
+    """
+    data = models.ReportRecord.objects.values_list('data', flat=True).get(report_id=report_id, index=index)
+    return prettify_record(decompress(data))
+
+
+def migrate_legacy_details(batch_size=100):
+    """将 str(list) 格式的历史报告详情批量拆分为压缩记录, 可重复执行
+        return: (迁移条数, 解析失败的report id列表)
+    """
+    migrated = 0
+    failed = []
+    last_id = 0
+    while True:
+        rows = list(models.ReportDetail.objects.filter(id__gt=last_id, report__isnull=False).
+                    order_by('id').only('id', 'report_id', 'summary_detail')[:batch_size])
+        if not rows:
+            return migrated, failed
+
+        for report_detail in rows:
+            try:
+                details, legacy = load_skeleton(report_detail)
+            except (ValueError, SyntaxError):
+                failed.append(report_detail.report_id)
+                continue
+            if not legacy:
+                continue
+
+            skeleton, records = split_details(details)
+            with transaction.atomic():
+                models.ReportRecord.objects.filter(report_id=report_detail.report_id).delete()
+                for record in records:
+                    record.report_id = report_detail.report_id
+                models.ReportRecord.objects.bulk_create(records, batch_size=batch_size)
+                models.ReportDetail.objects.filter(id=report_detail.id).update(
+                    summary_detail=json.dumps(skeleton, ensure_ascii=False, default=str))
+            migrated += 1
+
+        last_id = rows[-1].id
+
+
+# 报告记录表中的元数据字段, 只投影这些字段时不读取也不解压记录内容
+RECORD_COLUMNS = ('index', 'testcase', 'name', 'status', 'elapsed', 'size')
+
+# 失败的步骤状态
+FAILED_STATUS = ('failure', 'error')
+
+
+def parse_status(status):
+    """解析状态过滤参数, failed 表示 failure 和 error
+        status: "failed" 或逗号分隔的状态, 如 "failure,skipped"
+        return: list of status or None
+    """
+    if not status:
+        return None
+    result = []
+    for item in status.split(','):
+        item = item.strip()
+        if item == 'failed':
+            result.extend(FAILED_STATUS)
+        elif item:
+            result.append(item)
+    return result or None
+
+
+def project_record(record, fields):
+    """按字段路径投影记录内容
+        fields: ["meta_data.request", "attachment"]
+    """
+    result = {}
+    for field in fields:
+        keys = field.split('.')
+        value = record
+        for key in keys:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = result
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+            target[keys[-1]] = value
+    return result
+
+
+def _legacy_records(report_id):
+    """历史报告没有拆分记录时, 从完整详情中生成与 report_record 相同结构的记录
+    """
+    report_detail = models.ReportDetail.objects.get(report_id=report_id)
+    details, legacy = load_skeleton(report_detail)
+    if not legacy:
+        return []
+    _, records = split_details(details)
+    return records
+
+
+def query_records(report_id, status=None, fields=None, offset=0, limit=None):
+    """查询报告记录, 记录内容在迭代时逐条解压
+        status: list of status, None 不过滤
+        fields: list of field path, None 返回全部内容
+        return: (count, iterator of dict) 记录按 index 排序
+    """
+    need_body = fields is None or any(field.split('.')[0] not in RECORD_COLUMNS for field in fields)
+    columns = RECORD_COLUMNS + (('data',) if need_body else ())
+
+    end = None if limit is None else offset + limit
+    queryset = models.ReportRecord.objects.filter(report_id=report_id)
+    if queryset.exists():
+        if status is not None:
+            queryset = queryset.filter(status__in=status)
+        count = queryset.count()
+        rows = queryset.order_by('index').values_list(*columns)[offset:end].iterator(chunk_size=100)
+    else:
+        legacy = [record for record in _legacy_records(report_id) if status is None or record.status in status]
+        count = len(legacy)
+        rows = ([getattr(record, column) for column in columns] for record in legacy[offset:end])
+
+    def iterator():
+        for row in rows:
+            record = dict(zip(RECORD_COLUMNS, row))
+            if need_body:
+                body = prettify_record(decompress(row[-1]))
+                body.update(record)
+                record = body
+            yield record if fields is None else project_record(record, fields)
+
+    return count, iterator()
@@ -58,6 +58,12 @@ TREE_UPDATE_SUCCESS = {
     "msg": "树形结构更新成功"
 }
 
+TREE_ILLEGAL = {
+    "code": "0101",
+    "success": False,
+    "msg": "树形结构非法，节点ID不能重复"
+}
+
 KEY_MISS = {
     "code": "0100",
     "success": False,
@@ -249,6 +255,12 @@ TASK_TIME_ILLEGAL = {
     "msg": "时间表达式非法"
 }
 
+TASK_CONCURRENCY_ILLEGAL = {
+    "code": "0101",
+    "success": False,
+    "msg": "并发数必须为整数"
+}
+
 TASK_HAS_EXISTS = {
     "code": "0102",
     "success": False,
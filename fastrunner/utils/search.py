@@ -0,0 +1,210 @@
+"""
+名称/URL 搜索索引
+    mysql: FULLTEXT ngram 索引, 由数据库在写入时维护, 需开启 SEARCH_MYSQL_FULLTEXT
+    sqlite: FTS5 trigram 外部内容表, 由触发器同步, queryset.update 和批量写入同样生效
+    其他数据库、索引不可用或关键字过短时: 按关键字逐个 LIKE 过滤
+"""
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Q
+from loguru import logger
+
+# 表名: 建立索引的列
+SEARCH_INDEXES = {
+    'api': ('name', 'url'),
+    'case': ('name',),
+    'case_step': ('name', 'url'),
+}
+
+# mysql ngram_token_size 默认为2, sqlite trigram 至少3个字符, 更短的关键字使用 LIKE
+MIN_KEYWORD_LENGTH = {
+    'mysql': 2,
+    'sqlite': 3,
+}
+
+# (数据库别名, 表名): 索引是否可用
+_available = {}
+
+
+def fts_table(table):
+    return f"{table}_fts"
+
+
+def fulltext_index(table):
+    return f"ft_{table}_search"
+
+
+def sqlite_index_sql(table, columns, quote=lambda name: f'"{name}"'):
+    """sqlite FTS5 外部内容表及同步触发器, 最后一条语句从原表重建索引
+    """
+    fts = fts_table(table)
+    table = quote(table)
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    insert_new = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values});"
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content={table}, content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def sqlite_drop_sql(table):
+    fts = fts_table(table)
+    return [
+        f"DROP TRIGGER IF EXISTS {fts}_ai",
+        f"DROP TRIGGER IF EXISTS {fts}_ad",
+        f"DROP TRIGGER IF EXISTS {fts}_au",
+        f"DROP TABLE IF EXISTS {fts}",
+    ]
+
+
+def mysql_fulltext_enabled():
+    return getattr(settings, 'SEARCH_MYSQL_FULLTEXT', False)
+
+
+def mysql_index_sql(table, columns, quote=lambda name: f'`{name}`'):
+    """ngram 分词会丢弃包含停用词(a, i, at, in, is ...)的词元, 建立索引时需关闭停用词
+    """
+    names = ", ".join(quote(column) for column in columns)
+    return [
+        "SET SESSION innodb_ft_enable_stopword = OFF",
+        f"ALTER TABLE {quote(table)} ADD FULLTEXT INDEX {fulltext_index(table)} ({names}) WITH PARSER ngram",
+        "SET SESSION innodb_ft_enable_stopword = DEFAULT",
+    ]
+
+
+def _mysql_index_exists(cursor, table):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+        [table, fulltext_index(table)])
+    return cursor.fetchone()[0] > 0
+
+
+def _check_available(connection, table):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            return mysql_fulltext_enabled() and _mysql_index_exists(cursor, table)
+
+        if connection.vendor == 'sqlite':
+            fts = fts_table(table)
+            # 修改字段时 sqlite 会重建原表, 触发器随之删除, 此时索引不再同步, 不能使用
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+                           [fts, f"{fts}_ai", f"{fts}_ad", f"{fts}_au"])
+            return cursor.fetchone()[0] == 4
+
+    return False
+
+
+def is_available(connection, table):
+    """表的搜索索引是否可用, 结果按进程缓存
+    """
+    key = (connection.alias, table)
+    if key not in _available:
+        try:
+            _available[key] = _check_available(connection, table)
+        except DatabaseError:
+            _available[key] = False
+    return _available[key]
+
+
+def install_search_index(connection, tables=None):
+    """建立搜索索引, 数据库不支持时跳过, 搜索使用 LIKE
+        return: 建立成功的表名列表
+    """
+    if connection.vendor == 'mysql' and mysql_fulltext_enabled():
+        build_sql = mysql_index_sql
+    elif connection.vendor == 'sqlite':
+        build_sql = sqlite_index_sql
+    else:
+        return []
+
+    installed = []
+    for table in tables or SEARCH_INDEXES:
+        _available.pop((connection.alias, table), None)
+        if is_available(connection, table):
+            installed.append(table)
+            continue
+
+        try:
+            # 保存点: 建立失败时不影响外层事务
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                for sql in build_sql(table, SEARCH_INDEXES[table], quote=connection.ops.quote_name):
+                    cursor.execute(sql)
+        except DatabaseError as e:
+            logger.warning(f"search index on {table} is not available: {e}")
+            continue
+        finally:
+            _available.pop((connection.alias, table), None)
+        installed.append(table)
+
+    return installed
+
+
+def drop_search_index(connection, tables=None):
+    """删除搜索索引
+    """
+    for table in tables or SEARCH_INDEXES:
+        _available.pop((connection.alias, table), None)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                for sql in sqlite_drop_sql(table):
+                    cursor.execute(sql)
+            elif connection.vendor == 'mysql' and _mysql_index_exists(cursor, table):
+                cursor.execute(f"ALTER TABLE {connection.ops.quote_name(table)} DROP INDEX {fulltext_index(table)}")
+
+
+def _like(queryset, keywords, columns):
+    for keyword in keywords:
+        condition = Q()
+        for column in columns:
+            condition |= Q(**{f"{column}__contains": keyword})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+def search_queryset(queryset, keywords, split=True):
+    """按空格分隔的关键字搜索 SEARCH_INDEXES 中的列, 每个关键字都需出现在任一列中
+        split: False 时整个字符串作为一个关键字, 与 LIKE '%keywords%' 一致
+        索引可用时按相关度排序, 相关度相同时保持 queryset 原有的排序
+        return: (queryset, 是否按相关度排序)
+    """
+    if split:
+        keywords = keywords.split()
+    else:
+        keywords = [keywords] if keywords else []
+    table = queryset.model._meta.db_table
+    columns = SEARCH_INDEXES[table]
+    if not keywords:
+        return queryset, False
+
+    connection = connections[queryset.db]
+    min_length = MIN_KEYWORD_LENGTH.get(connection.vendor)
+    # ngram 不索引空白字符, 含空白的关键字无法按短语匹配
+    has_space = connection.vendor == 'mysql' and any(len(keyword.split()) != 1 for keyword in keywords)
+    if min_length is None or min(map(len, keywords)) < min_length or has_space \
+            or not is_available(connection, table):
+        return _like(queryset, keywords, columns), False
+
+    quote = connection.ops.quote_name
+    ordering = queryset.query.order_by
+    if connection.vendor == 'mysql':
+        # 短语匹配: ngram 分词后连续出现, 与 LIKE '%keyword%' 一致
+        against = " ".join('+"{}"'.format(keyword.replace('"', ' ')) for keyword in keywords)
+        match = "MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)".format(
+            columns=", ".join(f"{quote(table)}.{quote(column)}" for column in columns))
+        queryset = queryset.extra(select={'search_rank': match}, select_params=[against],
+                                  where=[match], params=[against])
+        return queryset.order_by('-search_rank', *ordering), True
+
+    fts = fts_table(table)
+    query = " AND ".join('"{}"'.format(keyword.replace('"', '""')) for keyword in keywords)
+    # bm25 越小越相关
+    queryset = queryset.extra(select={'search_rank': f"{fts}.rank"}, tables=[fts],
+                              where=[f"{fts}.rowid = {quote(table)}.id", f"{fts} MATCH %s"], params=[query])
+    return queryset.order_by('search_rank', *ordering), True
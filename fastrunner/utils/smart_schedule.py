@@ -0,0 +1,147 @@
+import collections
+import datetime
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.db import transaction
+from loguru import logger
+
+from fastrunner import models
+from fastrunner.httprunner3.report.summarize import get_platform
+from fastrunner.utils.suite import is_config_step, load_configs
+
+# run: 本次需要执行的用例id, 保持任务中的顺序
+# skipped: 本次跳过的用例 [{"id": int, "name": str}]
+# fingerprints: {case_id: 指纹}
+SchedulePlan = collections.namedtuple("SchedulePlan", ["run", "skipped", "fingerprints"])
+
+
+def _digest(*items):
+    content = json.dumps(items, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.md5(content.encode('utf-8')).hexdigest()
+
+
+def case_fingerprints(project, cases):
+    """计算用例指纹, 由用例步骤、步骤来源API、引用的配置、驱动代码和全局变量决定, 共5次查询
+        cases: list of case id
+        return: {case_id: fingerprint}, 不存在的用例不返回
+    """
+    steps = collections.OrderedDict((pk, []) for pk in models.Case.objects.filter(
+        project__id=project, id__in=cases).values_list('id', flat=True))
+    for case_id, body, source_api_id in models.CaseStep.objects.filter(case__id__in=list(steps)). \
+            order_by('case_id', 'step').values_list('case_id', 'body', 'source_api_id'):
+        steps[case_id].append((body, source_api_id))
+
+    apis = dict(models.API.objects.filter(
+        id__in={source_api_id for bodies in steps.values() for _, source_api_id in bodies}
+    ).values_list('id', 'body'))
+    configs = load_configs(project, (
+        body["name"] for bodies in steps.values() for body, _ in bodies if is_config_step(body)
+    ))
+
+    debugtalk = models.Debugtalk.objects.filter(project__id=project).values_list('code', flat=True).first()
+    variables = sorted(models.Variables.objects.filter(project__id=project).values_list('key', 'value'))
+    project_digest = _digest(debugtalk, variables)
+
+    return {
+        case_id: _digest(project_digest, [
+            (body, apis.get(source_api_id), configs.get(body["name"]) if is_config_step(body) else None)
+            for body, source_api_id in bodies
+        ])
+        for case_id, bodies in steps.items()
+    }
+
+
+def plan_cases(task_name, project, cases, full_run_interval=None, force=False):
+    """按上次结果挑选需要执行的用例, 指纹未变且上次成功的用例跳过
+        full_run_interval: 每条用例在该次数的调度中至少执行一次, 默认 SMART_SCHEDULE_FULL_RUN_INTERVAL
+        force: 执行全部用例, 如部署后或手动触发
+    """
+    fingerprints = case_fingerprints(project, cases)
+    if full_run_interval is None:
+        full_run_interval = getattr(settings, 'SMART_SCHEDULE_FULL_RUN_INTERVAL', 10)
+
+    results = {
+        result.case_id: result
+        for result in models.ScheduleCaseResult.objects.filter(task_name=task_name, case_id__in=list(fingerprints))
+    }
+
+    run = []
+    skipped = []
+    for case_id in cases:
+        if case_id not in fingerprints:
+            continue
+        result = results.get(case_id)
+        if not force and result and result.success and result.fingerprint == fingerprints[case_id] \
+                and result.skipped + 1 < full_run_interval:
+            skipped.append(case_id)
+        else:
+            run.append(case_id)
+
+    names = dict(models.Case.objects.filter(id__in=skipped).values_list('id', 'name')) if skipped else {}
+    skipped = [{"id": case_id, "name": names.get(case_id, "")} for case_id in skipped]
+
+    logger.info(f"smart schedule {task_name}: {len(run)} cases to run, {len(skipped)} skipped")
+    return SchedulePlan(run, skipped, fingerprints)
+
+
+def skipped_summary():
+    """没有需要执行的用例时的报告概要, 与 HttpRunner 的 summary 结构一致, 跳过的用例数由调用方填写
+    """
+    return {
+        "success": True,
+        "stat": {
+            "testcases": {"total": 0, "success": 0, "fail": 0},
+            "teststeps": {"total": 0, "successes": 0, "failures": 0, "errors": 0, "skipped": 0}
+        },
+        "time": {"start_at": time.time(), "duration": 0},
+        "platform": get_platform(),
+        "details": []
+    }
+
+
+def save_results(task_name, plan, summary=None):
+    """保存本次执行用例的指纹和结果, 跳过的用例累加连续跳过次数
+        summary: 本次运行的报告, 用例结果按 details 中的 case_id 汇总; 为None表示没有执行用例
+    """
+    success = {}
+    for detail in (summary or {}).get("details", []):
+        case_id = detail.get("case_id")
+        if case_id is not None:
+            success[case_id] = success.get(case_id, True) and bool(detail.get("success"))
+
+    now = datetime.datetime.now()
+    skipped = {case["id"] for case in plan.skipped}
+    with transaction.atomic():
+        results = {
+            result.case_id: result
+            for result in models.ScheduleCaseResult.objects.select_for_update().filter(
+                task_name=task_name, case_id__in=list(plan.fingerprints))
+        }
+
+        created = []
+        for case_id in plan.run:
+            result = results.get(case_id)
+            if result is None:
+                result = models.ScheduleCaseResult(task_name=task_name, case_id=case_id)
+                created.append(result)
+            result.fingerprint = plan.fingerprints[case_id]
+            # 未产生结果的用例视为失败, 下次继续执行
+            result.success = success.get(case_id, False)
+            result.skipped = 0
+            result.update_time = now
+
+        for case_id in skipped:
+            results[case_id].skipped += 1
+            results[case_id].update_time = now
+
+        models.ScheduleCaseResult.objects.bulk_create(created)
+        models.ScheduleCaseResult.objects.bulk_update(
+            [result for result in results.values() if result.case_id in skipped or result.case_id in plan.run],
+            ['fingerprint', 'success', 'skipped', 'update_time']
+        )
+        # 已从任务中移除的用例
+        models.ScheduleCaseResult.objects.filter(task_name=task_name). \
+            exclude(case_id__in=list(plan.fingerprints)).delete()
@@ -0,0 +1,133 @@
+import collections
+import copy
+
+from fastrunner import models
+from fastrunner.utils import relation_tree
+from fastrunner.utils.host import HostTable, parse_host_suite_tree
+
+
+class IncompleteURL(Exception):
+    """
+    未选择host且步骤中没有完整的请求URL
+    """
+    pass
+
+
+def is_config_step(body):
+    """步骤是否为引用的配置
+    """
+    return "base_url" in body["request"].keys()
+
+
+def load_configs(project, names):
+    """一次查询加载项目下的多个配置
+        names: iterable of config name
+        return: {name: body}
+    """
+    names = set(names)
+    if not names:
+        return {}
+
+    return dict(models.Config.objects.filter(project__id=project, name__in=names).values_list('name', 'body'))
+
+
+def load_config(project, name):
+    """加载单个配置, 不存在时抛出 Config.DoesNotExist
+    """
+    configs = load_configs(project, [name])
+    if name not in configs:
+        raise models.Config.DoesNotExist(f"配置 {name} 不存在")
+    return configs[name]
+
+
+def assemble_suite(project, cases, host=None):
+    """按用例id组装用例集运行数据
+        project: int
+        cases: list of case id
+        host: None 不处理host; "请选择" 校验请求URL; list host配置
+        return: (suite_list, test_sets, config_list)
+            suite_list: [{"id": int, "name": str}] 按cases顺序
+            test_sets: [[{scripts}, {scripts}], [{scripts}, {scripts}]]
+            config_list: [config or None]
+    """
+    case_names = dict(models.Case.objects.filter(project__id=project, id__in=cases).values_list('id', 'name'))
+    suite_list = [{"id": pk, "name": case_names[pk]} for pk in cases if pk in case_names]
+
+    return _assemble(project, suite_list, host)
+
+
+def assemble_suite_by_relation(project, relation, host=None):
+    """按树节点组装用例集运行数据, 节点按relation顺序, 节点内用例按id排序
+        relation: list of relation id
+    """
+    order = {int(relation_id): index for index, relation_id in enumerate(relation)}
+    cases = models.Case.objects.filter(project__id=project, relation__in=list(order)). \
+        values_list('id', 'name', 'relation')
+    suite_list = [
+        {"id": pk, "name": name}
+        for pk, name, relation_id in sorted(cases, key=lambda case: (order[case[2]], case[0]))
+    ]
+
+    return _assemble(project, suite_list, host)
+
+
+def assemble_api_by_relation(project, relation, host=None):
+    """按树节点组装API运行数据, 选中节点的子节点一并运行, 共3次查询
+        节点按展开后的顺序(选中顺序, 子树先序), 节点内API按id排序
+        relation: list of relation id
+        host: None 不处理host; "请选择" 校验请求URL; list host配置
+        return: list of api body
+    """
+    relation = relation_tree.subtree_ids(project, relation_tree.API_TREE, relation)
+    order = {relation_id: index for index, relation_id in enumerate(relation)}
+    apis = models.API.objects.filter(project__id=project, relation__in=relation, delete=0). \
+        order_by('id').values_list('relation', 'body')
+    host_table = HostTable(host) if isinstance(host, list) else None
+
+    test_case = []
+    # sorted 为稳定排序, 节点内保持id顺序
+    for _, body in sorted(apis, key=lambda api: order[api[0]]):
+        if host == "请选择" and "base_url" not in body["request"].keys() and "http" not in body["request"]["url"]:
+            raise IncompleteURL(body["name"])
+        test_case.append(host_table.apply(body) if host_table else body)
+
+    return test_case
+
+
+def _assemble(project, suite_list, host):
+    """加载全部步骤和引用的配置, 共2次查询
+    """
+    steps = {}
+    for case_id, body in models.CaseStep.objects.filter(case__id__in=[case["id"] for case in suite_list]). \
+            order_by('case_id', 'step').values_list('case_id', 'body'):
+        steps.setdefault(case_id, []).append(body)
+
+    configs = load_configs(project, (
+        body["name"] for bodies in steps.values() for body in bodies if is_config_step(body)
+    ))
+
+    test_sets = []
+    config_list = []
+    occurrences = collections.Counter(case["id"] for case in suite_list)
+    for case in suite_list:
+        testcase_list = []
+        config = None
+        bodies = steps.get(case["id"], [])
+        # 同一用例出现多次时各自持有一份步骤, 组装和运行时会修改步骤(替换host、删除desc)
+        if occurrences[case["id"]] > 1:
+            bodies = copy.deepcopy(bodies)
+        for body in bodies:
+            if is_config_step(body):
+                if body["name"] not in configs:
+                    raise models.Config.DoesNotExist(f"配置 {body['name']} 不存在")
+                # 多个用例引用同一配置时各自持有一份
+                config = copy.deepcopy(configs[body["name"]])
+                continue
+            if host == "请选择" and "http" not in body["request"]["url"]:
+                raise IncompleteURL(body["name"])
+            testcase_list.append(parse_host_suite_tree(host, body))
+
+        config_list.append(parse_host_suite_tree(host, config))
+        test_sets.append(testcase_list)
+
+    return suite_list, test_sets, config_list
@@ -3,6 +3,7 @@ from loguru import logger
 from djcelery import models as celery_models
 
 from fastrunner.utils import response
+from fastrunner.utils.concurrency import normalize_concurrency
 from fastrunner.utils.parser import format_json
 
 
@@ -29,6 +30,9 @@ class Task(object):
             "webhook": kwargs["webhook"],
             "updater": kwargs.get("updater"),
             "creator": kwargs.get("creator"),
+            "concurrency": kwargs.get("concurrency"),
+            "smart": kwargs.get("smart", False),
+            "full_run_interval": kwargs.get("full_run_interval"),
         }
         self.__crontab_time = None
 
@@ -52,6 +56,17 @@ class Task(object):
 
         return response.TASK_ADD_SUCCESS
 
+    def format_concurrency(self):
+        """
+        校验并发数
+        """
+        try:
+            self.__email["concurrency"] = normalize_concurrency(self.__email["concurrency"])
+        except ValueError:
+            return response.TASK_CONCURRENCY_ILLEGAL
+
+        return response.TASK_ADD_SUCCESS
+
     def add_task(self):
         """
         add tasks
@@ -65,7 +80,9 @@ class Task(object):
                 # return response.TASK_EMAIL_ILLEGAL
                 pass
 
-        resp = self.format_crontab()
+        resp = self.format_concurrency()
+        if resp["success"]:
+            resp = self.format_crontab()
         if resp["success"]:
             task, created = celery_models.PeriodicTask.objects.get_or_create(name=self.__name, task=self.__task)
             crontab = celery_models.CrontabSchedule.objects.filter(**self.__crontab_time).first()
@@ -83,7 +100,9 @@ class Task(object):
             return resp
 
     def update_task(self, pk):
-        resp = self.format_crontab()
+        resp = self.format_concurrency()
+        if resp["success"]:
+            resp = self.format_crontab()
         if resp["success"]:
             task = celery_models.PeriodicTask.objects.get(id=pk)
             crontab = celery_models.CrontabSchedule.objects.filter(**self.__crontab_time).first()
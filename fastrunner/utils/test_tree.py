@@ -7,7 +7,7 @@
 # @Email: lihuacai168@gmail.com
 # @Software: PyCharm
 from unittest import TestCase
-from .tree import get_tree_label
+from .tree import flatten_tree, get_tree_label, get_tree_max_id, nest_nodes
 
 
 class Test(TestCase):
@@ -34,3 +34,19 @@ class Test(TestCase):
 
     def test_get_tree_label_second_children(self):
         assert get_tree_label(self.tree, '个人中心') == 323
+
+    def test_get_tree_max_id(self):
+        assert get_tree_max_id(self.tree) == 323
+        assert get_tree_max_id([]) == 0
+        # 多次调用结果互不影响
+        assert get_tree_max_id([{'id': 5, 'label': 'a', 'children': []}]) == 5
+
+    def test_flatten_tree(self):
+        nodes = flatten_tree(self.tree)
+        assert [node.id for node in nodes][:5] == [1, 2, 3, 323, 4]
+        assert nodes[3] == (323, 3, '个人中心', '/2/3/323/', 0)
+        assert nest_nodes(reversed(nodes)) == self.tree
+
+    def test_flatten_tree_duplicate_id(self):
+        with self.assertRaises(ValueError):
+            flatten_tree([{'id': 1, 'label': 'a', 'children': [{'id': 1, 'label': 'b', 'children': []}]}])
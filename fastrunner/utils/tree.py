@@ -1,19 +1,63 @@
-def get_tree_max_id(value, list_id=[]):
+import collections
+
+# 节点路径: 根节点到该节点的id, 如 /2/3/323/, 子树即以该路径开头的节点
+PATH_SEP = '/'
+PATH_MAX_LENGTH = 255
+
+# 扁平化后的节点, parent为0表示第一层节点, position为同级中的顺序
+TreeNode = collections.namedtuple("TreeNode", ["id", "parent", "label", "path", "position"])
+
+
+def get_tree_max_id(value):
     """
     得到最大Tree max id
     """
-    if not value:
-        return 0  # the first node id
+    return max((node.id for node in flatten_tree(value)), default=0)  # the first node id
+
+
+def flatten_tree(value):
+    """嵌套的树形结构按先序展开为节点列表
+        value: [{"id": int, "label": str, "children": [...]}]
+        节点id重复或路径过长时 raise ValueError
+    """
+    nodes = []
+    seen = set()
+    # (节点, 父节点id, 父节点路径, 同级顺序), 逆序入栈以保持先序
+    pending = [(content, 0, PATH_SEP, position) for position, content in enumerate(value)][::-1] \
+        if isinstance(value, list) else []
+    while pending:
+        content, parent, parent_path, position = pending.pop()
+        node_id = int(content['id'])
+        if node_id in seen:
+            raise ValueError(f"duplicate tree node id: {node_id}")
+        seen.add(node_id)
+
+        path = f"{parent_path}{node_id}{PATH_SEP}"
+        if len(path) > PATH_MAX_LENGTH:
+            raise ValueError(f"tree node is too deep: {node_id}")
 
-    if isinstance(value, list):
-        for content in value:  # content -> dict
-            children = content.get('children')
-            if children:
-                get_tree_max_id(children)
+        nodes.append(TreeNode(node_id, parent, content['label'], path, position))
+        children = content.get('children') or []
+        pending.extend((child, node_id, path, index) for index, child in reversed(list(enumerate(children))))
 
-            list_id.append(content['id'])
+    return nodes
 
-    return max(list_id)
+
+def nest_nodes(nodes):
+    """节点列表还原为嵌套的树形结构, 与 flatten_tree 互逆
+        nodes: iterable of TreeNode 或有 id, parent, label, position 属性的对象
+    """
+    children = collections.defaultdict(list)
+    for node in nodes:
+        children[node.parent].append(node)
+
+    def build(parent):
+        return [
+            {"id": node.id, "label": node.label, "children": build(node.id)}
+            for node in sorted(children.get(parent, []), key=lambda node: node.position)
+        ]
+
+    return build(0)
 
 
 def get_file_size(size):
@@ -41,18 +85,8 @@ def get_tree_label(value, search_label):
     :param search_label:
     :return: label_id
     """
-    global label_id
-    if not value:
-        return label_id  # 默认分组
-
-    if isinstance(value, list):
-        for content in value:  # content -> dict
-            if content['label'] == search_label:
-                label_id = content['id']
-            children = content.get('children')
-            if children:
-                get_tree_label(children, search_label)
-    return label_id
-
-
-
+    found = label_id  # 默认分组
+    for node in flatten_tree(value):
+        if node.label == search_label:
+            found = node.id
+    return found
@@ -0,0 +1,194 @@
+import atexit
+import datetime
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from loguru import logger
+
+from fastrunner import models
+
+
+class VisitBuffer(object):
+    """
+    访问记录缓冲区, 由后台线程每 batch_size 条或每 flush_interval 秒批量写入
+    缓冲区满时丢弃新记录并计数, 请求线程不再等待数据库写入
+    """
+
+    def __init__(self, max_size=10000, batch_size=200, flush_interval=5):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.flushed = 0
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add(self, visit):
+        """加入一条未保存的 Visit 记录
+        """
+        with self._lock:
+            if len(self._buffer) >= self.max_size:
+                self.dropped += 1
+                return False
+            self._buffer.append(visit)
+            size = len(self._buffer)
+
+        self._ensure_flusher()
+        if size >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """写入缓冲区内的全部记录, 返回写入条数
+        """
+        count = 0
+        while True:
+            with self._lock:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            if not batch:
+                return count
+
+            try:
+                with transaction.atomic():
+                    models.Visit.objects.bulk_create(batch)
+            except Exception as e:
+                # 批量写入失败时逐条重试, 只丢弃写入失败的记录
+                logger.error(f"flush visit failed, retry one by one: {e}")
+                batch = self._save_each(batch)
+
+            self.flushed += len(batch)
+            count += len(batch)
+            try:
+                add_daily_counts(count_visits(batch))
+            except Exception as e:
+                # 原始记录已写入, 可通过 backfill_visit_daily 重新汇总
+                logger.error(f"update visit daily failed: {e}")
+
+    def _save_each(self, batch):
+        """逐条写入, 写入失败的记录计入丢弃数, 不影响其他记录
+            return: 写入成功的记录
+        """
+        saved = []
+        for visit in batch:
+            try:
+                with transaction.atomic():
+                    visit.save(force_insert=True)
+            except Exception as e:
+                self.dropped += 1
+                logger.error(f"flush visit failed: {e}")
+            else:
+                saved.append(visit)
+        return saved
+
+    def stats(self):
+        return {
+            "pending": len(self._buffer),
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+        }
+
+    def _ensure_flusher(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="visit-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+
+visit_buffer = VisitBuffer(**getattr(settings, 'VISIT_BUFFER', {}))
+atexit.register(visit_buffer.flush)
+
+
+def count_visits(visits):
+    """按 项目+日期+请求方法 统计访问记录
+        visits: iterable of Visit
+        return: {(project, day): {method: count}}
+    """
+    counts = {}
+    for visit in visits:
+        methods = counts.setdefault((str(visit.project), visit.create_time.date()), {})
+        methods[visit.request_method] = methods.get(visit.request_method, 0) + 1
+    return counts
+
+
+def add_daily_counts(counts):
+    """累加每日访问量, 行锁保证多个进程同时写入时计数准确
+        counts: {(project, day): {method: count}}
+    """
+    for (project, day), methods in counts.items():
+        with transaction.atomic():
+            daily, _ = models.VisitDaily.objects.get_or_create(project=project, day=day)
+            daily = models.VisitDaily.objects.select_for_update().get(id=daily.id)
+            by_method = daily.by_method or {}
+            for method, count in methods.items():
+                by_method[method] = by_method.get(method, 0) + count
+            daily.by_method = by_method
+            daily.count += sum(methods.values())
+            daily.save(update_fields=['count', 'by_method'])
+
+
+def backfill_daily_counts(start=None, end=None):
+    """根据原始访问记录重新计算每日访问量, 覆盖已有汇总, 可重复执行
+        start, end: datetime.date, 包含两端, 为空时不限制
+        return: 重新计算的天数
+    """
+    visits = models.Visit.objects.all()
+    if start:
+        visits = visits.filter(create_time__gte=datetime.datetime.combine(start, datetime.time.min))
+    if end:
+        visits = visits.filter(
+            create_time__lt=datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min))
+
+    counts = {}
+    rows = visits.annotate(day=TruncDate('create_time')).values('project', 'day', 'request_method'). \
+        annotate(count=Count('id')).order_by()
+    for row in rows:
+        methods = counts.setdefault((row['project'], row['day']), {})
+        methods[row['request_method']] = row['count']
+
+    for (project, day), methods in counts.items():
+        models.VisitDaily.objects.update_or_create(
+            project=project, day=day, defaults={'count': sum(methods.values()), 'by_method': methods})
+
+    return len(counts)
+
+
+def purge_visits(retention_days=None, batch_size=5000):
+    """删除保留期之前的原始访问记录, 每日访问量在写入时已汇总
+        return: 删除条数
+    """
+    if retention_days is None:
+        retention_days = getattr(settings, 'VISIT_RETENTION_DAYS', 30)
+    cutoff = datetime.datetime.combine(datetime.date.today(), datetime.time.min) - \
+        datetime.timedelta(days=retention_days)
+
+    total = 0
+    while True:
+        ids = list(models.Visit.objects.filter(create_time__lt=cutoff).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return total
+        total += models.Visit.objects.filter(id__in=ids).delete()[0]
+
+
+def daily_counts(project, start, end):
+    """项目每天的访问量
+        start, end: datetime.date, 包含两端
+        return: [(day, count)] 按日期升序
+    """
+    return list(models.VisitDaily.objects.filter(project=project, day__range=(start, end)).
+                order_by('day').values_list('day', 'count'))
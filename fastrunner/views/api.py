@@ -8,10 +8,10 @@ from rest_framework.viewsets import GenericViewSet
 from fastrunner import models, serializers
 from rest_framework.response import Response
 from fastrunner.utils import response
+from fastrunner.utils import search as search_index
 from fastrunner.utils.decorator import request_log
 from fastrunner.utils.parser import Format, Parse
 from django.db import DataError
-from django.db.models import Q
 
 from rest_framework.schemas import AutoSchema, SchemaGenerator
 import coreapi
@@ -27,6 +27,8 @@ class APITemplateViewSchema(AutoSchema):
                 coreapi.Field('search'),
                 coreapi.Field('tag'),
                 coreapi.Field('rigEnv'),
+                coreapi.Field('light'),
+                coreapi.Field('fields'),
             ]
         manual_fields = super().get_manual_fields(path, method)
         return manual_fields + extra_fields
@@ -57,6 +59,8 @@ class APITemplateView(GenericViewSet):
             rig_env = ser.validated_data.get('rigEnv')
             delete = ser.validated_data.get('delete')
             only_me = ser.validated_data.get('onlyMe')
+            light = ser.validated_data.get('light')
+            fields = ser.validated_data.get('fields')
 
             queryset = self.get_queryset().filter(project__id=project, delete=delete).order_by('-update_time')
 
@@ -64,9 +68,8 @@ class APITemplateView(GenericViewSet):
                 queryset = queryset.filter(creator=request.user)
 
             if search != '':
-                search: list = search.split()
-                for key in search:
-                    queryset = queryset.filter(Q(name__contains=key) | Q(url__contains=key))
+                # 名称或URL包含全部关键字, 有搜索索引时按相关度排序
+                queryset, _ = search_index.search_queryset(queryset, search)
 
             if node != '':
                 queryset = queryset.filter(relation=node)
@@ -77,8 +80,15 @@ class APITemplateView(GenericViewSet):
             if rig_env != '':
                 queryset = queryset.filter(rig_env=rig_env)
 
+            if fields != '':
+                fields = [field.strip() for field in fields.split(',') if field.strip()]
+            elif light is True:
+                fields = serializers.APISerializer.LIGHT_FIELDS
+            else:
+                fields = None
+
             pagination_queryset = self.paginate_queryset(queryset)
-            serializer = self.get_serializer(pagination_queryset, many=True)
+            serializer = self.get_serializer(pagination_queryset, many=True, fields=fields)
 
             return self.get_paginated_response(serializer.data)
         else:
@@ -175,7 +185,7 @@ class APITemplateView(GenericViewSet):
 
         for re_tree in tree:
             api = models.API.objects.get(id=pk)
-            body = eval(api.body)
+            body = api.body
             body["name"] = name
             api.body = body
             api.id = None
@@ -259,7 +269,7 @@ class APITemplateView(GenericViewSet):
         except ObjectDoesNotExist:
             return Response(response.API_NOT_FOUND)
 
-        parse = Parse(eval(api.body))
+        parse = Parse(api.body)
         parse.parse_http()
 
         resp = {
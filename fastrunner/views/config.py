@@ -140,7 +140,7 @@ class ConfigView(GenericViewSet):
 
         config.id = None
         config.is_default = False
-        body = eval(config.body)
+        body = config.body
         name = request.data['name']
 
         body['name'] = name
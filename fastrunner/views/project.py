@@ -1,5 +1,6 @@
+import datetime
+
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Count
 from django.utils.decorators import method_decorator
 from rest_framework.views import APIView
 from rest_framework import status
@@ -9,10 +10,12 @@ from FasterRunner import pagination
 from rest_framework.response import Response
 from fastrunner.utils import response
 from fastrunner.utils import prepare
-from fastrunner.utils import day
+from fastrunner.utils import loader
+from fastrunner.utils import visit
+from fastrunner.utils import relation_tree
 from fastrunner.utils.decorator import request_log
+from fastrunner.utils.concurrency import normalize_concurrency
 from fastrunner.utils.runner import DebugCode
-from fastrunner.utils.tree import get_tree_max_id
 from FasterRunner.auth import OnlyGetAuthenticator
 
 
@@ -72,6 +75,12 @@ class ProjectView(GenericViewSet):
             if models.Project.objects.filter(name=request.data['name']).first():
                 return Response(response.PROJECT_EXISTS)
 
+        if 'concurrency' in request.data:
+            try:
+                project.concurrency = normalize_concurrency(request.data['concurrency'])
+            except ValueError:
+                return Response(response.KEY_MISS)
+
         # 调用save方法update_time字段才会自动更新
         project.name = request.data['name']
         project.desc = request.data['desc']
@@ -145,12 +154,15 @@ class DebugTalkView(GenericViewSet):
         """
         pk = request.data['id']
         try:
-            models.Debugtalk.objects.filter(id=pk). \
-                update(code=request.data['code'], updater=request.user.username)
+            debugtalk = models.Debugtalk.objects.filter(id=pk)
+            debugtalk.update(code=request.data['code'], updater=request.user.username)
 
         except ObjectDoesNotExist:
             return Response(response.SYSTEM_ERROR)
 
+        for project_id in debugtalk.values_list('project_id', flat=True):
+            loader.invalidate_debugtalk(project_id)
+
         return Response(response.DEBUGTALK_UPDATE_SUCCESS)
 
     @method_decorator(request_log(level='INFO'))
@@ -185,20 +197,15 @@ class TreeView(APIView):
 
         try:
             tree_type = request.query_params['type']
-            tree = models.Relation.objects.get(project__id=kwargs['pk'], type=tree_type)
+            relation = models.Relation.objects.get(project__id=kwargs['pk'], type=tree_type)
         except KeyError:
             return Response(response.KEY_MISS)
 
         except ObjectDoesNotExist:
             return Response(response.SYSTEM_ERROR)
 
-        body = eval(tree.tree)  # list
-        tree = {
-            "tree": body,
-            "id": tree.id,
-            "success": True,
-            "max": get_tree_max_id(body)
-        }
+        tree = serializers.RelationSerializer(relation).data
+        tree["success"] = True
         return Response(tree)
 
     @method_decorator(request_log(level='INFO'))
@@ -211,8 +218,7 @@ class TreeView(APIView):
             mode = request.data['mode']
 
             relation = models.Relation.objects.get(id=kwargs['pk'])
-            relation.tree = body
-            relation.save()
+            max_id = relation_tree.save_tree(relation.id, body)
 
         except KeyError:
             return Response(response.KEY_MISS)
@@ -220,12 +226,15 @@ class TreeView(APIView):
         except ObjectDoesNotExist:
             return Response(response.SYSTEM_ERROR)
 
+        except ValueError:
+            return Response(response.TREE_ILLEGAL)
+
         #  mode -> True remove node
         if mode:
             prepare.tree_end(request.data, relation.project)
 
         response.TREE_UPDATE_SUCCESS['tree'] = body
-        response.TREE_UPDATE_SUCCESS['max'] = get_tree_max_id(body)
+        response.TREE_UPDATE_SUCCESS['max'] = max_id
 
         return Response(response.TREE_UPDATE_SUCCESS)
 
@@ -236,20 +245,15 @@ class VisitView(GenericViewSet):
 
     def list(self, request):
         project = request.query_params.get("project")
-        # 查询当前项目7天内的访问记录
-        # 根据日期分组
-        # 统计每天的条数
-        count_data = self.get_queryset()\
-            .filter(project=project, create_time__range=(day.get_day(-6), day.get_day(1)))\
-            .extra(select={"create_time": "DATE_FORMAT(create_time,'%%m-%%d')"})\
-            .values('create_time')\
-            .annotate(counts=Count('id')).values('create_time', 'counts')
+        # 查询当前项目7天内每天的访问量
+        today = datetime.date.today()
+        count_data = visit.daily_counts(project, today - datetime.timedelta(days=6), today)
 
         create_time = []
         count = []
-        for d in count_data:
-            create_time.append(d['create_time'])
-            count.append(d['counts'])
+        for d, counts in count_data:
+            create_time.append(d.strftime('%m-%d'))
+            count.append(counts)
         return Response({'create_time': create_time, 'count': count})
 #
 # class FileView(APIView):
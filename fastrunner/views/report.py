@@ -1,7 +1,10 @@
 import json
 import re
 
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from django.utils.decorators import method_decorator
 from rest_framework.response import Response
@@ -10,6 +13,7 @@ from rest_framework.viewsets import GenericViewSet
 from FasterRunner import pagination
 from fastrunner import models, serializers
 from fastrunner.utils import response
+from fastrunner.utils import report as report_store
 from fastrunner.utils.decorator import request_log
 
 
@@ -20,6 +24,10 @@ class ReportView(GenericViewSet):
     queryset = models.Report.objects
     serializer_class = serializers.ReportSerializer
     pagination_class = pagination.MyPageNumberPagination
+    record_page_size = 100
+    max_record_page_size = 1000
+    # 列表支持的排序字段, 前缀 - 表示倒序
+    ordering_fields = ('duration', '-duration', 'failures', '-failures', 'start_at', '-start_at')
 
     def get_authenticators(self):
         # 查看报告详情不需要鉴权
@@ -32,6 +40,9 @@ class ReportView(GenericViewSet):
     @method_decorator(request_log(level='DEBUG'))
     def list(self, request):
         """报告列表
+            minDuration: float, optional, 最小耗时(s)
+            hasFailures: 'true', optional, 只看有失败或异常步骤的报告
+            ordering: str, optional, 见 ordering_fields, 默认按更新时间倒序
         """
 
         project = request.query_params['project']
@@ -55,6 +66,24 @@ class ReportView(GenericViewSet):
         if report_status != '':
             queryset = queryset.filter(status=report_status)
 
+        # 按耗时/失败数筛选排序, 均为报告表的列, 不解析 summary
+        try:
+            min_duration = float(request.query_params.get("minDuration", ''))
+        except ValueError:
+            min_duration = None
+        if min_duration is not None:
+            queryset = queryset.filter(duration__gte=min_duration)
+
+        if request.query_params.get("hasFailures") == 'true':
+            queryset = queryset.filter(Q(failures__gt=0) | Q(errors__gt=0))
+
+        ordering = request.query_params.get("ordering", '')
+        if ordering in self.ordering_fields:
+            queryset = queryset.order_by(ordering, '-id')
+
+        # 列表只用到提取出的列, 历史报告未补充列时序列化器按需读取 summary
+        queryset = queryset.defer('summary')
+
         page_report = self.paginate_queryset(queryset)
         serializer = self.get_serializer(page_report, many=True)
         return self.get_paginated_response(serializer.data)
@@ -85,21 +114,71 @@ class ReportView(GenericViewSet):
     @method_decorator(request_log(level='INFO'))
     def look(self, request, **kwargs):
         """查看报告
+            lazy: true 只渲染记录概要, false 渲染全部记录, 默认按记录数决定
         """
         pk = kwargs["pk"]
-        report = models.Report.objects.get(id=pk)
-        report_detail = models.ReportDetail.objects.get(report_id=pk)
-        summary = json.loads(report.summary, encoding="utf-8")
-
+        try:
+            report = models.Report.objects.get(id=pk)
+        except ObjectDoesNotExist:
+            return Response(response.REPORT_NOT_EXISTS)
+        summary = json.loads(report.summary)
 
-        summary['details'] = str(report_detail.summary_detail).replace('Markup','').replace('\\n','').replace(" ","").replace("&#34;","\"")
-        summary['details'] = eval(summary['details'])
-        print (summary)
+        lazy = request.query_params.get("lazy")
+        if lazy is None:
+            with_records = report_store.count_records(pk) <= settings.REPORT_LAZY_THRESHOLD
+        else:
+            with_records = lazy != 'true'
 
+        summary['details'], summary['lazy'] = report_store.load_details(pk, with_records=with_records)
         summary["html_report_name"] = report.name
-        # return render_to_response('report_template.html', summary)
+        summary["report_id"] = report.id
+
+        return render(request, template_name='report_template.html', context=summary)
+
+    def record(self, request, **kwargs):
+        """报告中单条记录的请求/响应内容
+        """
+        try:
+            record = report_store.load_record(kwargs["pk"], kwargs["index"])
+        except ObjectDoesNotExist:
+            return Response(response.REPORT_NOT_EXISTS)
+
+        return Response(record)
+
+    @method_decorator(request_log(level='DEBUG'))
+    def records(self, request, **kwargs):
+        """逐条输出报告记录
+            page, size: 分页, 默认第1页每页100条, size最大1000
+            status: failed 或逗号分隔的 success,failure,error,skipped
+            fields: 逗号分隔的字段路径, 如 name,status,meta_data.response.status_code, 默认返回全部
+        """
+        pk = kwargs["pk"]
+        try:
+            page = max(int(request.query_params.get("page", 1)), 1)
+            size = min(max(int(request.query_params.get("size", self.record_page_size)), 1),
+                       self.max_record_page_size)
+        except ValueError:
+            return Response(response.KEY_MISS)
+
+        fields = request.query_params.get("fields")
+        if fields:
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+
+        try:
+            count, records = report_store.query_records(
+                pk, status=report_store.parse_status(request.query_params.get("status")),
+                fields=fields or None, offset=(page - 1) * size, limit=size)
+        except ObjectDoesNotExist:
+            return Response(response.REPORT_NOT_EXISTS)
+
+        def stream():
+            yield '{{"count": {count}, "page": {page}, "size": {size}, "results": ['.format(
+                count=count, page=page, size=size)
+            for index, record in enumerate(records):
+                yield (',' if index else '') + json.dumps(record, ensure_ascii=False, default=str)
+            yield ']}'
 
-        return render(request,template_name='report_template.html',context=summary)
+        return StreamingHttpResponse(stream(), content_type='application/json; charset=utf-8')
 
     def download(self, request, **kwargs):
         """下载报告
@@ -3,13 +3,16 @@ import datetime
 
 from django.core.exceptions import ObjectDoesNotExist
 from rest_framework.decorators import api_view, authentication_classes
-from fastrunner.utils import loader, response
+from fastrunner.utils import loader, relation_tree, response
+from fastrunner.utils.concurrency import get_concurrency
 from fastrunner import tasks
 from rest_framework.response import Response
 from fastrunner.utils.decorator import request_log
 from fastrunner.utils.ding_message import DingMessage
 from fastrunner.utils.host import *
 from fastrunner.utils.parser import Format
+from fastrunner.utils.suite import IncompleteURL, assemble_api_by_relation, assemble_suite, assemble_suite_by_relation, \
+    load_config
 from fastrunner import models
 from FasterRunner.settings.dev import log_file
 import os
@@ -56,7 +59,7 @@ def run_api(request):
     config = None
     if name != '请选择':
         try:
-            config = eval(models.Config.objects.get(name=name, project__id=api.project).body)
+            config = models.Config.objects.get(name=name, project__id=api.project).body
 
         except ObjectDoesNotExist:
             logger.error("指定配置文件不存在:{name}".format(name=name))
@@ -93,11 +96,11 @@ def run_api_pk(request, **kwargs):
     name = request.query_params["config"]
     timestamp = request.query_params["timestamp"]
 
-    config = None if name == '请选择' else eval(models.Config.objects.get(name=name, project=api.project).body)
+    config = None if name == '请选择' else models.Config.objects.get(name=name, project=api.project).body
 
     logger_file = log_file + '/' + str(timestamp) + '.log'
 
-    test_case = eval(api.body)
+    test_case = api.body
     if host == '请选择' and "base_url" not in test_case["request"].keys() and "http" not in test_case["request"]["url"]:
         return Response({"status": "500", "tips": "请完善请求URL"})
     if host != "请选择":
@@ -129,8 +132,8 @@ def auto_run_api_pk(**kwargs):
     env = kwargs['config']
     config_name = 'rig_prod' if env == 1 else 'rig_test'
     api = models.API.objects.get(id=id)
-    config = eval(models.Config.objects.get(name=config_name, project=api.project).body)
-    test_case = eval(api.body)
+    config = models.Config.objects.get(name=config_name, project=api.project).body
+    test_case = api.body
 
     summary = loader.debug_api(test_case, api.project.id, config=config)
     api_request = summary['details'][0]['records'][0]['meta_data']['request']
@@ -195,6 +198,7 @@ def run_api_tree(request):
         name: str
         async: bool
         host: str
+        concurrency: int, optional
     }
     """
     # order by id default
@@ -204,29 +208,28 @@ def run_api_tree(request):
     back_async = request.data["async"]
     name = request.data["name"]
     config = request.data["config"]
+    try:
+        concurrency = get_concurrency(project, request.data.get("concurrency"))
+    except ValueError:
+        return Response(response.KEY_MISS)
 
 
     timestamp = request.data["timestamp"]
     logger_file = log_file + '/' + str(timestamp) + '.log'
 
-    config = None if config == '请选择' else eval(models.Config.objects.get(name=config, project__id=project).body)
-    test_case = []
+    config = None if config == '请选择' else models.Config.objects.get(name=config, project__id=project).body
 
     if host != "请选择":
         host = models.HostIP.objects.get(name=host, project=project).value.splitlines()
 
-    for relation_id in relation:
-        api = models.API.objects.filter(project__id=project, relation=relation_id, delete=0).order_by('id').values(
-            'body')
-        for content in api:
-            api = eval(content['body'])
-            if host == '请选择' and "base_url" not in api["request"].keys() and "http" not in api["request"][
-                "url"]:
-                return Response({"status": "500", "tips": "请完善请求URL"})
-            test_case.append(parse_host(host, api))
+    try:
+        test_case = assemble_api_by_relation(project, relation, host=host)
+    except IncompleteURL:
+        return Response({"status": "500", "tips": "请完善请求URL"})
 
     if back_async:
-        tasks.async_debug_api.delay(test_case, project, name, config=parse_host(host, config),log_file=logger_file)
+        tasks.async_debug_api.delay(test_case, project, name, config=parse_host(host, config),log_file=logger_file,
+                                    concurrency=concurrency)
         summary = loader.TEST_NOT_EXISTS
         summary["msg"] = "接口运行中，请稍后查看报告"
         return Response(summary)
@@ -234,7 +237,7 @@ def run_api_tree(request):
         try:
             summary = loader.debug_api(test_case, project, name=f'批量运行{len(test_case)}条API', config=parse_host(host, config),
                                        user=request.user,
-                                       log_file=logger_file)
+                                       log_file=logger_file, concurrency=concurrency)
             if summary is None:
                 with open(logger_file, 'r') as r:
                     msg = r.readlines()
@@ -311,9 +314,6 @@ def run_testsuite_pk(request, **kwargs):
     """
     pk = kwargs["pk"]
 
-    test_list = models.CaseStep.objects. \
-        filter(case__id=pk).order_by("step").values("body")
-
     project = request.query_params["project"]
     name = request.query_params["name"]
     host = request.query_params["host"]
@@ -323,24 +323,16 @@ def run_testsuite_pk(request, **kwargs):
     timestamp = request.query_params["timestamp"]
     logger_file = log_file + '/' + str(timestamp) + '.log'
 
-    test_case = []
-    config = None
-
-
     if host != "请选择":
         host = models.HostIP.objects.get(name=host, project=project).value.splitlines()
 
-    for content in test_list:
-        body = eval(content["body"])
-
-        if "base_url" in body["request"].keys():
-            config = eval(models.Config.objects.get(name=body["name"], project__id=project).body)
-            continue
-        if host == '请选择' and "base_url" not in body["request"].keys() and "http" not in body["request"]["url"]:
-            return Response({"status":"500","tips":"请完善请求URL"})
-        test_case.append(parse_host_suite_tree(host, body))
+    try:
+        suite, test_sets, config_list = assemble_suite(project, [pk], host=host)
+    except IncompleteURL:
+        return Response({"status": "500", "tips": "请完善请求URL"})
 
-    suite = list(models.Case.objects.filter(id=pk).order_by('id').values('id', 'name'))
+    test_case = test_sets[0] if test_sets else []
+    config = config_list[0] if config_list else None
 
 
     if back_async:
@@ -390,10 +382,10 @@ def run_testsuite_pk_origin(request, **kwargs):
         host = models.HostIP.objects.get(name=host, project=project).value.splitlines()
 
     for content in test_list:
-        body = eval(content["body"])
+        body = content["body"]
 
         if "base_url" in body["request"].keys():
-            config = eval(models.Config.objects.get(name=body["name"], project__id=project).body)
+            config = models.Config.objects.get(name=body["name"], project__id=project).body
             continue
 
         test_case.append(parse_host(host, body))
@@ -418,6 +410,7 @@ def run_suite_tree(request):
         name: str
         async: bool
         host: str
+        concurrency: int, optional
     }
     """
     # order by id default
@@ -427,6 +420,10 @@ def run_suite_tree(request):
     report = request.data["name"]
     host = request.data["host"]
     timestamp = request.data.pop("timestamp")
+    try:
+        concurrency = get_concurrency(project, request.data.get("concurrency"))
+    except ValueError:
+        return Response(response.KEY_MISS)
 
     logger_file = log_file + '/' + str(timestamp) + '.log'
 
@@ -436,41 +433,21 @@ def run_suite_tree(request):
 
 
 
-    test_sets = []
-    suite_list = []
-    config_list = []
-    for relation_id in relation:
-        suite = list(models.Case.objects.filter(project__id=project,
-                                                relation=relation_id).order_by('id').values('id', 'name'))
-
-
-        for content in suite:
-            test_list = models.CaseStep.objects. \
-                filter(case__id=content["id"]).order_by("step").values("body")
-
-            testcase_list = []
-            config = None
-            for content in test_list:
-                body = eval(content["body"])
-                if "base_url" in body["request"].keys():
-
-                    config = eval(models.Config.objects.get(name=body["name"], project__id=project).body)
-                    continue
-                if host == '请选择' and "base_url" not in body["request"].keys() and "http" not in body["request"]["url"]:
-                    return Response({"status": "500", "tips": "请完善请求URL"})
-                testcase_list.append(parse_host_suite_tree(host, body))
-            # [[{scripts}, {scripts}], [{scripts}, {scripts}]]
-            config_list.append(parse_host_suite_tree(host, config))
-            test_sets.append(testcase_list)
-            suite_list = suite_list + suite
+    # 选中节点的子节点一并运行
+    relation = relation_tree.subtree_ids(project, relation_tree.CASE_TREE, relation)
+    try:
+        suite_list, test_sets, config_list = assemble_suite_by_relation(project, relation, host=host)
+    except IncompleteURL:
+        return Response({"status": "500", "tips": "请完善请求URL"})
 
     if back_async:
-        tasks.async_debug_suite.delay(test_sets, project, suite_list, report, config_list)
+        tasks.async_debug_suite.delay(test_sets, project, suite_list, report, config_list, concurrency=concurrency)
         summary = loader.TEST_NOT_EXISTS
         summary["msg"] = "用例运行中，请稍后查看报告"
     else:
         try:
-            summary = loader.debug_suite_tree(test_sets, project, suite_list, config_list, save=True, user=request.user,log_file=logger_file)
+            summary = loader.debug_suite_tree(test_sets, project, suite_list, config_list, save=True, user=request.user,
+                                              log_file=logger_file, concurrency=concurrency)
             if summary is None:
                 with open(logger_file, 'r') as r:
                     msg = r.readlines()
@@ -511,7 +488,7 @@ def run_test(request):
 
     if config:
 
-        config = eval(models.Config.objects.get(project=project, name=config["name"]).body)
+        config = load_config(project, config["name"])
 
     try:
 
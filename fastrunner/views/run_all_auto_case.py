@@ -30,8 +30,8 @@ def run_all_auto_case(request):
 
     task_args_kwargs = query.values('args', 'kwargs')
     for i in task_args_kwargs:
-        args = eval(i.get('args'))
-        kwargs = eval(i.get('kwargs'))
+        args = json.loads(i.get('args'))
+        kwargs = json.loads(i.get('kwargs'))
         kwargs['run_type'] = run_type
         app.send_task(task_name, args=args, kwargs=kwargs)
 
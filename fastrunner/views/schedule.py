@@ -42,6 +42,8 @@ class ScheduleView(GenericViewSet):
             receiver: str
             copy: str
             project: int
+            smart: bool, optional, 跳过未变更且上次成功的用例
+            full_run_interval: int, optional, 每条用例在该次数的调度中至少执行一次
         }
         """
         request.data.update({"creator": request.user.username})
@@ -88,8 +90,10 @@ class ScheduleView(GenericViewSet):
     def run(self, request, **kwargs):
         task = models.PeriodicTask.objects.get(id=kwargs["pk"])
         task_name = 'fastrunner.tasks.schedule_debug_suite'
-        args = eval(task.args)
-        kwargs = eval(task.kwargs)
+        args = json.loads(task.args)
+        kwargs = json.loads(task.kwargs)
+        # 手动触发时智能定时任务也执行全部用例
+        kwargs['force'] = True
         app.send_task(name=task_name, args=args, kwargs=kwargs)
         return Response(response.TASK_RUN_SUCCESS)
 
@@ -12,6 +12,7 @@ from fastrunner import models, serializers
 from rest_framework.response import Response
 from fastrunner.utils import response
 from fastrunner.utils import prepare
+from fastrunner.utils import search as search_index
 from fastrunner.utils.decorator import request_log
 
 
@@ -30,10 +31,8 @@ class TestCaseView(GenericViewSet):
         搜索case_step的url或者name
         返回对应的case_id
         """
-        case_id = models.CaseStep.objects.filter(Q(name__contains=search) | Q(url__contains=search)).values('case_id')
-
-        case_id = set([item['case_id'] for _, item in enumerate(case_id)])
-        return case_id
+        steps, _ = search_index.search_queryset(models.CaseStep.objects.all(), search, split=False)
+        return set(steps.values_list('case_id', flat=True))
 
     @method_decorator(request_log(level='INFO'))
     def get(self, request):
@@ -69,7 +68,7 @@ class TestCaseView(GenericViewSet):
             if search != '':
                 # 用例名称搜索
                 if search_type == '1':
-                    queryset = queryset.filter(name__contains=search)
+                    queryset, _ = search_index.search_queryset(queryset, search, split=False)
                 # API名称或者API URL搜索
                 elif search_type == '2':
                     case_id = self.case_step_search(search)
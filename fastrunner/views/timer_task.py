@@ -35,10 +35,10 @@ def auto_run_testsuite_pk(**kwargs):
     # 把用例加入列表
     testcase_list = []
     for content in test_list:
-        body = eval(content["body"])
+        body = content["body"]
 
         if "base_url" in body["request"].keys():
-            config = eval(models.Config.objects.get(name=body["name"], project__id=project_id).body)
+            config = models.Config.objects.get(name=body["name"], project__id=project_id).body
             continue
         testcase_list.append(body)
 